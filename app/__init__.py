@@ -5,10 +5,13 @@ from flask_cors import CORS
 from dotenv import load_dotenv
 from flask_jwt_extended import JWTManager
 import os  # You'll need this for the environment check
+from .cache import result_cache
+from .db_routing import RoutingSession, init_replica_routing
+from .sql_instrumentation import init_sql_instrumentation
 
 load_dotenv()
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 migrate = Migrate()
 
 def create_app():
@@ -19,6 +22,9 @@ def create_app():
 
     db.init_app(app)
     migrate.init_app(app, db)
+    result_cache.init_app(app)
+    init_sql_instrumentation(app)  # before the replica check, so its queries count
+    init_replica_routing(app, db)
 
     # Enhanced CORS configuration
     if os.environ.get('FLASK_ENV') == 'development':
@@ -32,9 +38,28 @@ def create_app():
     # ✅ REGISTER ROUTES
     from .routes import routes
     from .dashboard_routes import dashboard_routes
+    from .data_routes import data_routes
 
     app.register_blueprint(routes)
     app.register_blueprint(dashboard_routes)
+    app.register_blueprint(data_routes)
+
+    # ✅ TRACK DATA CHANGES FOR RESULT CACHE & ETAGS
+    from .models import User, Bank, Saving, Asset, CreditCard, Transaction
+    from .http_cache import watch_data_versions
+
+    watched_models = (User, Bank, Saving, Asset, CreditCard, Transaction)
+    result_cache.watch_session(db.session, watched_models)
+    watch_data_versions(db.session, watched_models)
+
+    # ✅ REGISTER CLI COMMANDS
+    from .commands import billing_cli, analytics_cli, data_cli, journal_cli, ledger_cli
+
+    app.cli.add_command(billing_cli)
+    app.cli.add_command(analytics_cli)
+    app.cli.add_command(data_cli)
+    app.cli.add_command(journal_cli)
+    app.cli.add_command(ledger_cli)
 
     # ✅ ADD HEADERS FOR SECURITY & CACHING
     @app.after_request
@@ -43,7 +68,8 @@ def create_app():
             if response.content_type.startswith('text/html'):
                 response.headers['Content-Type'] = 'text/html; charset=utf-8'
 
-            elif response.content_type.startswith('application/json'):
+            # Routes with @etag_cached declare their own policy
+            elif response.content_type.startswith('application/json') and 'Cache-Control' not in response.headers:
                 response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
                 response.headers['Pragma'] = 'no-cache'
                 response.headers['Expires'] = '0'
@@ -0,0 +1,301 @@
+import csv
+import io
+import json
+import zipfile
+from datetime import date, datetime, timezone
+
+from sqlalchemy import insert, select, text
+
+from . import db
+from .dashboard_service import rebuild_net_worth_history, rebuild_spending_rollup
+from .journal import rebuild_checkpoints
+from .money import Money, to_paise
+from .models import (User, Bank, CreditCard, CreditCardStatement, Asset, Saving,
+                     Transaction, TransferTransaction, JournalEntry, JournalPosting)
+
+ARCHIVE_FORMAT_VERSION = 1
+ARCHIVE_FORMATS = ("ndjson", "csv")
+
+# Parents before children so a restore never violates a foreign key.
+# spending_rollup, balance_checkpoint and net_worth_snapshot are derived
+# data and are rebuilt after a restore instead.
+ARCHIVE_TABLES = [
+    User.__table__,
+    Bank.__table__,
+    CreditCard.__table__,
+    Asset.__table__,
+    Saving.__table__,
+    Transaction.__table__,
+    TransferTransaction.__table__,
+    CreditCardStatement.__table__,
+    JournalEntry.__table__,
+    JournalPosting.__table__,
+]
+
+# Ids into the shared category table differ between databases; restores
+# re-derive them from the category text while rebuilding the rollup
+DATABASE_LOCAL_COLUMNS = {Transaction.__table__.c.category_id}
+
+# Only `flask data export` writes these; an HTTP export must not hand out
+# anything that can be cracked offline
+SECRET_COLUMNS = {User.__table__.c.password_hash}
+
+# password_hash of users restored from an archive without one: it never
+# matches a password, so they cannot log in until `flask data set-password`
+PASSWORD_RESET_REQUIRED = "!reset-required"
+
+# CSV has no NULL; use the same marker Postgres COPY is told about
+CSV_NULL = "\\N"
+
+STREAM_CHUNK_ROWS = 1000
+
+
+class _ChunkSink:
+    """Write-only file object that zipfile streams into; drained by the generator."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def archived_columns(table, include_secrets=True):
+    excluded = DATABASE_LOCAL_COLUMNS if include_secrets else DATABASE_LOCAL_COLUMNS | SECRET_COLUMNS
+    return [column for column in table.columns if column not in excluded]
+
+
+def owner_column(table):
+    return table.c.id if table is User.__table__ else table.c.user_id
+
+
+def encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def decode_value(column, value):
+    """Turn an archived (JSON or CSV text) value back into the column's Python type."""
+
+    if value is None:
+        return None
+
+    python_type = column.type.python_type
+
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    if python_type is bool:
+        return value if isinstance(value, bool) else value in ("True", "true", "1", "t")
+    if python_type is int:
+        return int(value)
+    if python_type is float:
+        return float(value)
+    return str(value)
+
+
+def iter_archive(user_ids=None, fmt="ndjson", include_secrets=False):
+    """
+    Yields a zip archive of the given users' rows (all users when None),
+    one member per table plus manifest.json. Password hashes are left
+    out unless include_secrets (the CLI export only).
+
+    Rows are read with yield_per, which streams from a server-side cursor
+    on Postgres, and compressed bytes are yielded as they are produced,
+    so memory stays flat however long the history is.
+    """
+
+    sink = _ChunkSink()
+    manifest = {
+        "format_version": ARCHIVE_FORMAT_VERSION,
+        "format": fmt,
+        "exported_at": datetime.now(timezone.utc).isoformat(),
+        "tables": {}
+    }
+
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for table in ARCHIVE_TABLES:
+            exported = archived_columns(table, include_secrets)
+            columns = [column.name for column in exported]
+            member_name = f"{table.name}.{fmt}"
+
+            statement = select(*exported).order_by(*table.primary_key.columns)
+            if user_ids is not None:
+                statement = statement.where(owner_column(table).in_(user_ids))
+
+            rows = db.session.execute(statement, execution_options={"yield_per": STREAM_CHUNK_ROWS})
+            row_count = 0
+
+            with io.TextIOWrapper(archive.open(member_name, "w", force_zip64=True),
+                                  encoding="utf-8", newline="") as member:
+                writer = None
+                if fmt == "csv":
+                    writer = csv.writer(member)
+                    writer.writerow(columns)
+
+                for row in rows:
+                    values = [encode_value(value) for value in row]
+
+                    if writer:
+                        writer.writerow([CSV_NULL if value is None else value for value in values])
+                    else:
+                        member.write(json.dumps(dict(zip(columns, values))) + "\n")
+
+                    row_count += 1
+                    if row_count % STREAM_CHUNK_ROWS == 0:
+                        member.flush()
+                        yield sink.drain()
+
+            manifest["tables"][table.name] = {
+                "file": member_name,
+                "columns": columns,
+                "rows": row_count
+            }
+            yield sink.drain()
+
+        archive.writestr("manifest.json", json.dumps(manifest, indent=2))
+
+    yield sink.drain()
+
+
+def iter_member_rows(archive, entry, fmt):
+    """Yields archived rows of one table as {column: raw value} dicts."""
+
+    with io.TextIOWrapper(archive.open(entry["file"]), encoding="utf-8", newline="") as member:
+        if fmt == "csv":
+            for row in csv.DictReader(member):
+                yield {key: None if value == CSV_NULL else value for key, value in row.items()}
+        else:
+            for line in member:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _copy_batch(table, columns, batch):
+    """Load a batch on Postgres with COPY FROM STDIN."""
+
+    # COPY skips SQLAlchemy bind processing, so convert rupees to paise here
+    money_columns = {name for name in columns if isinstance(table.c[name].type, Money)}
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in batch:
+        writer.writerow([
+            CSV_NULL if row[name] is None
+            else to_paise(row[name]) if name in money_columns
+            else encode_value(row[name])
+            for name in columns
+        ])
+    buffer.seek(0)
+
+    column_list = ", ".join(f'"{name}"' for name in columns)
+    dbapi_connection = db.session.connection().connection
+
+    with dbapi_connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY \"{table.name}\" ({column_list}) FROM STDIN WITH (FORMAT csv, NULL '{CSV_NULL}')",
+            buffer
+        )
+
+
+def _load_batch(table, columns, batch):
+    if not batch:
+        return
+
+    if db.engine.dialect.name == "postgresql":
+        _copy_batch(table, columns, batch)
+    else:
+        db.session.execute(insert(table), batch)
+
+    batch.clear()
+
+
+def _reset_sequence(table):
+    """Explicit ids bypass Postgres sequences; move them past the restored rows."""
+
+    if db.engine.dialect.name != "postgresql" or "id" not in table.c:
+        return
+
+    db.session.execute(
+        text(
+            "SELECT setval(pg_get_serial_sequence(:table_name, 'id'), "
+            "COALESCE((SELECT MAX(id) FROM \"" + table.name + "\"), 0) + 1, false)"
+        ),
+        {"table_name": f'"{table.name}"'}
+    )
+
+
+def restore_archive(path, batch_size=5000):
+    """
+    Bulk-load an archive written by iter_archive into the current database
+    in one transaction: COPY on Postgres, batched multi-row INSERTs elsewhere.
+
+    Rows keep their ids, so the target must not already contain them.
+    Columns missing from the archive fall back to their defaults; users
+    without a password hash (HTTP exports) get PASSWORD_RESET_REQUIRED.
+    Returns ({table_name: rows_loaded}, names of users needing a new
+    password); the caller commits.
+    """
+
+    loaded = {}
+    restored_user_ids = []
+    password_resets = []
+
+    with zipfile.ZipFile(path) as archive:
+        manifest = json.loads(archive.read("manifest.json"))
+
+        if manifest.get("format_version") != ARCHIVE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported archive format version: {manifest.get('format_version')}")
+
+        fmt = manifest["format"]
+
+        for table in ARCHIVE_TABLES:
+            entry = manifest["tables"].get(table.name)
+            if not entry:
+                continue
+
+            archived = {column.name for column in archived_columns(table)}
+            columns = [name for name in entry["columns"] if name in archived]
+            reset_passwords = table is User.__table__ and "password_hash" not in columns
+            if reset_passwords:
+                columns.append("password_hash")
+
+            batch = []
+            count = 0
+
+            for raw in iter_member_rows(archive, entry, fmt):
+                row = {name: decode_value(table.c[name], raw.get(name)) for name in columns}
+                if reset_passwords:
+                    row["password_hash"] = PASSWORD_RESET_REQUIRED
+                    password_resets.append(row["name"])
+                batch.append(row)
+                count += 1
+
+                if table is User.__table__:
+                    restored_user_ids.append(row["id"])
+
+                if len(batch) >= batch_size:
+                    _load_batch(table, columns, batch)
+
+            _load_batch(table, columns, batch)
+            _reset_sequence(table)
+            loaded[table.name] = count
+
+    for user_id in restored_user_ids:
+        rebuild_spending_rollup(user_id)
+        rebuild_checkpoints(user_id)
+        rebuild_net_worth_history((user_id, user_id))
+
+    return loaded, password_resets
+
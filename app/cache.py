@@ -0,0 +1,220 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import g, has_request_context
+from sqlalchemy import event
+
+
+def flushed_owners(session, models):
+    """User ids owning the new, dirty or deleted rows of the given models in a flush."""
+
+    owners = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, models):
+            owner = obj.user_id if hasattr(obj, "user_id") else getattr(obj, "id", None)
+            if owner is not None:
+                owners.add(owner)
+    return owners
+
+
+class LRUCacheBackend:
+    """In-process LRU with per-entry TTL. Each worker keeps its own copy."""
+
+    def __init__(self, max_entries=1024, ttl=30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._keys_by_user = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id, key):
+        with self._lock:
+            entry = self._entries.get((user_id, key))
+            if entry is None:
+                return False, None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                self._drop((user_id, key))
+                return False, None
+
+            self._entries.move_to_end((user_id, key))
+            return True, value
+
+    def set(self, user_id, key, value):
+        with self._lock:
+            self._entries[(user_id, key)] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end((user_id, key))
+            self._keys_by_user.setdefault(user_id, set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for key in self._keys_by_user.pop(user_id, ()):
+                self._entries.pop((user_id, key), None)
+
+    def _drop(self, entry_key):
+        self._entries.pop(entry_key, None)
+        user_id, key = entry_key
+        keys = self._keys_by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[user_id]
+
+
+class RedisCacheBackend:
+    """
+    Shared backend for multiple workers/instances.
+
+    Invalidation bumps a per-user generation number, so stale entries
+    are never read again and simply expire with their TTL.
+    """
+
+    def __init__(self, url, ttl=30, prefix="ppa:cache"):
+        import redis  # optional dependency, only needed for this backend
+
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def _generation(self, user_id):
+        return int(self.client.get(f"{self.prefix}:gen:{user_id}") or 0)
+
+    def get(self, user_id, key):
+        raw = self.client.get(f"{self.prefix}:{user_id}:{self._generation(user_id)}:{key}")
+        if raw is None:
+            return False, None
+        return True, json.loads(raw)
+
+    def set(self, user_id, key, value):
+        self.client.setex(
+            f"{self.prefix}:{user_id}:{self._generation(user_id)}:{key}",
+            self.ttl,
+            json.dumps(value)
+        )
+
+    def invalidate_user(self, user_id):
+        self.client.incr(f"{self.prefix}:gen:{user_id}")
+
+
+class ResultCache:
+    """
+    Per-user memoization of read-only service results.
+
+    Keys include the user's data_version, which every write bumps in its
+    own transaction, so a commit in one worker makes the entries of all
+    workers miss. The local entries are also dropped after a commit that
+    touched any row owned by the user (see watch_session), and the rest
+    age out with their TTL.
+    """
+
+    def __init__(self):
+        self.backend = LRUCacheBackend()
+        self.enabled = True
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._watched = set()
+
+    def init_app(self, app):
+        self.enabled = app.config.get("RESULT_CACHE_ENABLED", True)
+        ttl = app.config.get("RESULT_CACHE_TTL", 30)
+
+        if app.config.get("RESULT_CACHE_URL"):
+            self.backend = RedisCacheBackend(app.config["RESULT_CACHE_URL"], ttl=ttl)
+        else:
+            self.backend = LRUCacheBackend(
+                max_entries=app.config.get("RESULT_CACHE_MAX_ENTRIES", 1024),
+                ttl=ttl
+            )
+
+    def memoize(self, name, daily=False):
+        """
+        Caches fn(user_id, *args) under (user_id, name, data_version, args),
+        plus today's IST date for `daily` (range-relative) results.
+        """
+
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(user_id, *args):
+                if not self.enabled:
+                    return fn(user_id, *args)
+
+                # http_cache imports this module
+                from .http_cache import cache_day, current_data_version
+
+                parts = [name, f"v{current_data_version(user_id)}"]
+                if daily:
+                    parts.append(cache_day().isoformat())
+                key = ":".join([*parts, *map(str, args)])
+                hit, value = self.backend.get(user_id, key)
+                if hit:
+                    self.hits += 1
+                    return value
+
+                self.misses += 1
+                value = fn(user_id, *args)
+                self.backend.set(user_id, key, value)
+                return value
+
+            return wrapper
+
+        return decorator
+
+    def invalidate_user(self, user_id):
+        self.invalidations += 1
+        self.backend.invalidate_user(user_id)
+
+    def invalidate_on_commit(self, session, user_ids):
+        """For writes the flush hook cannot see, e.g. Core UPDATE/INSERT statements."""
+
+        session.info.setdefault("result_cache_owners", set()).update(user_ids)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+    def watch_session(self, session, models):
+        """
+        Collect the owners of flushed rows of the given models and
+        invalidate them once the transaction commits.
+        """
+
+        if id(session) in self._watched:
+            return
+        self._watched.add(id(session))
+
+        @event.listens_for(session, "after_flush")
+        def collect_owners(sess, flush_context):
+            owners = sess.info.setdefault("result_cache_owners", set())
+            owners.update(flushed_owners(sess, models))
+
+        @event.listens_for(session, "after_commit")
+        def invalidate_owners(sess):
+            for user_id in sess.info.pop("result_cache_owners", ()):
+                self.invalidate_user(user_id)
+
+            # Reads after the commit must see the bumped data_version
+            if has_request_context():
+                g.pop("data_versions", None)
+
+        @event.listens_for(session, "after_rollback")
+        def discard_owners(sess):
+            sess.info.pop("result_cache_owners", None)
+
+
+result_cache = ResultCache()
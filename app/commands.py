@@ -0,0 +1,308 @@
+import fcntl
+import os
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import Date, Integer, func, literal, select, text, union_all, update
+
+from . import db
+from .models import CreditCard, User
+from .archive import ARCHIVE_FORMATS, iter_archive, restore_archive
+from .cache import result_cache
+from .dashboard_service import IST, rebuild_net_worth_history, rebuild_spending_rollup, snapshot_net_worth
+from .http_cache import bump_data_versions
+from .journal import CHECKPOINT_INTERVAL, rebuild_checkpoints
+from .ledger import USERS_PER_TASK, user_ranges, verify_ledger
+from .routes import get_billing_cycle_range
+
+billing_cli = AppGroup("billing", help="Credit card billing jobs.")
+analytics_cli = AppGroup("analytics", help="Analytics maintenance jobs.")
+data_cli = AppGroup("data", help="Export and restore archives.")
+journal_cli = AppGroup("journal", help="Double-entry journal maintenance.")
+ledger_cli = AppGroup("ledger", help="Ledger integrity checks.")
+
+# Arbitrary keys for pg_try_advisory_lock, one per job
+BILLING_ROLLOVER_LOCK_ID = 7201001
+NET_WORTH_SNAPSHOT_LOCK_ID = 7201002
+
+
+def mark_changed(owners):
+    """Bump the owners' data_version and drop their cached results once the job commits."""
+
+    owners = set(owners)
+    bump_data_versions(db.session.connection(), owners)
+    result_cache.invalidate_on_commit(db.session, owners)
+
+
+@contextmanager
+def exclusive_job_lock(name, lock_id):
+    """
+    Yields True if this process holds the job lock, False if another
+    instance is already running the job.
+
+    Postgres uses a session advisory lock; SQLite falls back to an
+    flock on a file next to the database.
+    """
+
+    if db.engine.dialect.name == "postgresql":
+        with db.engine.connect() as conn:
+            acquired = conn.execute(
+                text("SELECT pg_try_advisory_lock(:lock_id)"),
+                {"lock_id": lock_id}
+            ).scalar()
+
+            try:
+                yield bool(acquired)
+            finally:
+                if acquired:
+                    conn.execute(
+                        text("SELECT pg_advisory_unlock(:lock_id)"),
+                        {"lock_id": lock_id}
+                    )
+        return
+
+    database = db.engine.url.database
+    if database and database != ":memory:":
+        lock_path = f"{database}.{name}.lock"
+    else:
+        lock_path = os.path.join(tempfile.gettempdir(), f"ppa.{name}.lock")
+
+    with open(lock_path, "w") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def rollover_billing_cycles(today, chunk_size=500):
+    """
+    Moves unbilled_spends to billed_unpaid for every card whose
+    current billing cycle started after its last rollover.
+
+    Runs one UPDATE ... FROM per id chunk, joining each card to the
+    current cycle start of its billing day, bumps the owners' data
+    versions and commits per chunk. Returns the number of cards rolled over.
+    """
+
+    # One row per billing day; a SELECT ... UNION ALL instead of VALUES
+    # because SQLite cannot alias VALUES columns
+    cycles = union_all(*[
+        select(
+            literal(day, Integer).label("billing_day"),
+            literal(get_billing_cycle_range(today, day)[0], Date).label("cycle_start")
+        )
+        for day in range(1, 32)
+    ]).subquery("cycles")
+
+    first_id, last_id = db.session.query(
+        func.min(CreditCard.id),
+        func.max(CreditCard.id)
+    ).one()
+
+    if first_id is None:
+        return 0
+
+    rolled_over = 0
+
+    for chunk_start in range(first_id, last_id + 1, chunk_size):
+        statement = (
+            update(CreditCard)
+            .where(
+                CreditCard.billing_cycle_start == cycles.c.billing_day,
+                CreditCard.last_billed_on < cycles.c.cycle_start,
+                CreditCard.id >= chunk_start,
+                CreditCard.id < chunk_start + chunk_size
+            )
+            .values(
+                # Integer paise, so no rounding is needed
+                billed_unpaid=func.coalesce(CreditCard.billed_unpaid, 0)
+                + func.coalesce(CreditCard.unbilled_spends, 0),
+                unbilled_spends=0,
+                last_billed_on=cycles.c.cycle_start
+            )
+            .returning(CreditCard.user_id)
+            .execution_options(synchronize_session=False)
+        )
+
+        owners = db.session.execute(statement).scalars().all()
+        mark_changed(owners)
+        rolled_over += len(owners)
+        db.session.commit()
+
+    return rolled_over
+
+
+@billing_cli.command("rollover")
+@click.option("--chunk-size", default=500, show_default=True, help="Cards updated per statement.")
+def billing_rollover(chunk_size):
+    """Roll unbilled spends into billed_unpaid for all due cards."""
+
+    with exclusive_job_lock("billing-rollover", BILLING_ROLLOVER_LOCK_ID) as acquired:
+        if not acquired:
+            click.echo("Another billing rollover is already running, skipping.")
+            return
+
+        today = datetime.now(timezone.utc).date()
+        rolled_over = rollover_billing_cycles(today, chunk_size)
+
+        click.echo(f"✅ Rolled over {rolled_over} credit card(s).")
+
+
+@analytics_cli.command("rebuild-spending")
+@click.option("--user-id", type=int, default=None, help="Only rebuild this user's rows.")
+def analytics_rebuild_spending(user_id):
+    """Recompute the spending rollup from the raw transaction ledger."""
+
+    rebuild_spending_rollup(user_id)
+
+    ranges = [(user_id, user_id)] if user_id is not None else user_ranges()
+    for users in ranges:
+        mark_changed(db.session.execute(select(User.id).where(User.id.between(*users))).scalars())
+    db.session.commit()
+
+    click.echo("✅ Spending rollup rebuilt.")
+
+
+@analytics_cli.command("snapshot-net-worth")
+@click.option("--chunk-size", default=500, show_default=True, help="Users snapshotted per statement.")
+def analytics_snapshot_net_worth(chunk_size):
+    """Write today's (IST) net worth snapshot for every user. Schedule daily, late in the IST day."""
+
+    with exclusive_job_lock("net-worth-snapshot", NET_WORTH_SNAPSHOT_LOCK_ID) as acquired:
+        if not acquired:
+            click.echo("Another net worth snapshot is already running, skipping.")
+            return
+
+        today = datetime.now(IST).date()
+        snapshotted = 0
+
+        for users in user_ranges(chunk_size):
+            owners = snapshot_net_worth(today, users)
+            mark_changed(owners)
+            snapshotted += len(owners)
+            db.session.commit()
+
+        click.echo(f"✅ Snapshotted net worth of {snapshotted} user(s) for {today}.")
+
+
+@analytics_cli.command("rebuild-net-worth")
+@click.option("--user-id", type=int, default=None, help="Only rebuild this user's snapshots.")
+def analytics_rebuild_net_worth(user_id):
+    """Backfill daily net worth snapshots from the *_balance_after ledger columns."""
+
+    ranges = [(user_id, user_id)] if user_id is not None else user_ranges()
+
+    for users in ranges:
+        owners = rebuild_net_worth_history(users)
+        mark_changed(owners)
+        db.session.commit()
+
+    click.echo("✅ Net worth history rebuilt.")
+
+
+@data_cli.command("export")
+@click.argument("output", type=click.Path(dir_okay=False, writable=True))
+@click.option("--user-id", type=int, multiple=True, help="Only export these users (default: everyone).")
+@click.option("--format", "fmt", type=click.Choice(ARCHIVE_FORMATS), default="ndjson", show_default=True)
+def data_export(output, user_id, fmt):
+    """Write the same zip archive as GET /export, plus password hashes, to OUTPUT."""
+
+    with open(output, "wb") as archive_file:
+        for chunk in iter_archive(list(user_id) or None, fmt, include_secrets=True):
+            archive_file.write(chunk)
+
+    click.echo(f"✅ Exported to {output}.")
+
+
+@data_cli.command("restore")
+@click.argument("archive", type=click.Path(exists=True, dir_okay=False))
+@click.option("--batch-size", default=5000, show_default=True, help="Rows per COPY/INSERT batch.")
+def data_restore(archive, batch_size):
+    """Bulk-load an export archive into this database (ids are kept)."""
+
+    try:
+        loaded, password_resets = restore_archive(archive, batch_size)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        # Report the driver error only; the full message echoes row values
+        error = getattr(e, "orig", e)
+        raise click.ClickException(f"Restore failed, nothing was loaded: {error!r}")
+
+    for table_name, count in loaded.items():
+        click.echo(f"  {table_name}: {count}")
+
+    click.echo("✅ Restore completed.")
+
+    if password_resets:
+        click.echo(
+            f"⚠️  No password hash in the archive (HTTP export) for: {', '.join(password_resets)}. "
+            "They cannot log in until `flask data set-password NAME`."
+        )
+
+
+@data_cli.command("set-password")
+@click.argument("name")
+@click.password_option()
+def data_set_password(name, password):
+    """Set a user's password, e.g. after restoring an HTTP export."""
+
+    user = User.query.filter_by(name=name).first()
+    if not user:
+        raise click.ClickException(f"No user named {name!r}.")
+
+    user.set_password(password)
+    db.session.commit()
+
+    click.echo(f"✅ Password set for {name}.")
+
+
+@journal_cli.command("checkpoint")
+@click.option("--user-id", type=int, default=None, help="Only rebuild this user's checkpoints.")
+@click.option("--every", type=click.IntRange(min=1), default=CHECKPOINT_INTERVAL, show_default=True,
+              help="Postings between two checkpoints of an account.")
+def journal_checkpoint(user_id, every):
+    """Recompute balance checkpoints from the journal postings."""
+
+    rebuild_checkpoints(user_id, every)
+    db.session.commit()
+
+    click.echo("✅ Balance checkpoints rebuilt.")
+
+
+@ledger_cli.command("verify")
+@click.option("--workers", type=click.IntRange(min=1), default=os.cpu_count() or 1, show_default="CPU count",
+              help="Processes checking user ranges in parallel.")
+@click.option("--users-per-task", type=click.IntRange(min=1), default=USERS_PER_TASK, show_default=True)
+def ledger_verify(workers, users_per_task):
+    """
+    Check balance-after chains, account balances, card totals and the
+    journal for every user. Prints the first divergent row per account
+    and exits with status 1 if there is any.
+    """
+
+    divergent = 0
+
+    for divergence in verify_ledger(workers, users_per_task):
+        divergent += 1
+        transaction = divergence["transaction_id"]
+        click.echo(
+            f"{divergence['check']}: {divergence['account_type']} {divergence['account_id']} "
+            f"(user {divergence['user_id']})"
+            + (f" at transaction {transaction}" if transaction else "")
+            + f": expected {divergence['expected']}, found {divergence['actual']}"
+        )
+
+    if divergent:
+        raise click.ClickException(f"{divergent} divergence(s) found.")
+
+    click.echo("✅ Ledger is consistent.")
@@ -1,10 +1,17 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
+from .cache import result_cache
+from .http_cache import etag_cached
 from .dashboard_service import (
     get_dashboard_summary,
     get_spending_by_category,
-    get_asset_allocation
+    get_asset_allocation,
+    get_dashboard_bundle,
+    get_spending_trends,
+    get_net_worth_history,
+    TREND_GRANULARITIES,
+    TREND_TOP_CATEGORIES
 )
 
 dashboard_routes = Blueprint(
@@ -12,9 +19,20 @@ dashboard_routes = Blueprint(
     __name__
 )
 
+VALID_RANGES = {
+    "30d",
+    "3m",
+    "6m",
+    "1y",
+    "all"
+}
+
+MAX_TREND_CATEGORIES = 20
+
 
 @dashboard_routes.route("/dashboard/summary", methods=["GET"])
 @jwt_required()
+@etag_cached()
 def dashboard_summary():
 
     user_id = int(get_jwt_identity())
@@ -26,6 +44,7 @@ def dashboard_summary():
 
 @dashboard_routes.route("/dashboard/spending", methods=["GET"])
 @jwt_required()
+@etag_cached(daily=True)
 def dashboard_spending():
 
     user_id = int(get_jwt_identity())
@@ -35,15 +54,7 @@ def dashboard_spending():
         "30d"
     )
 
-    valid_ranges = {
-        "30d",
-        "3m",
-        "6m",
-        "1y",
-        "all"
-    }
-
-    if range_key not in valid_ranges:
+    if range_key not in VALID_RANGES:
         return jsonify({
             "error": (
                 "Invalid range. "
@@ -59,8 +70,92 @@ def dashboard_spending():
 
     return jsonify(spending), 200
 
+@dashboard_routes.route("/dashboard/trends", methods=["GET"])
+@jwt_required()
+@etag_cached(daily=True)
+def dashboard_trends():
+
+    user_id = int(get_jwt_identity())
+
+    range_key = request.args.get(
+        "range",
+        "1y"
+    )
+
+    if range_key not in VALID_RANGES:
+        return jsonify({
+            "error": (
+                "Invalid range. "
+                "Allowed values: "
+                "30d, 3m, 6m, 1y, all"
+            )
+        }), 400
+
+    granularity = request.args.get(
+        "granularity",
+        "month"
+    )
+
+    if granularity not in TREND_GRANULARITIES:
+        return jsonify({
+            "error": (
+                "Invalid granularity. "
+                "Allowed values: month, week"
+            )
+        }), 400
+
+    try:
+        top_n = int(request.args.get("top", TREND_TOP_CATEGORIES))
+    except ValueError:
+        return jsonify({"error": "top must be an integer"}), 400
+
+    if not 1 <= top_n <= MAX_TREND_CATEGORIES:
+        return jsonify({
+            "error": f"top must be between 1 and {MAX_TREND_CATEGORIES}"
+        }), 400
+
+    trends = get_spending_trends(
+        user_id,
+        range_key,
+        granularity,
+        top_n
+    )
+
+    return jsonify(trends), 200
+
+
+@dashboard_routes.route("/dashboard/net-worth-history", methods=["GET"])
+@jwt_required()
+@etag_cached(daily=True)
+def dashboard_net_worth_history():
+
+    user_id = int(get_jwt_identity())
+
+    range_key = request.args.get(
+        "range",
+        "1y"
+    )
+
+    if range_key not in VALID_RANGES:
+        return jsonify({
+            "error": (
+                "Invalid range. "
+                "Allowed values: "
+                "30d, 3m, 6m, 1y, all"
+            )
+        }), 400
+
+    history = get_net_worth_history(
+        user_id,
+        range_key
+    )
+
+    return jsonify(history), 200
+
+
 @dashboard_routes.route("/dashboard/asset-allocation",methods=["GET"])
 @jwt_required()
+@etag_cached()
 def dashboard_asset_allocation():
 
     user_id = int(
@@ -73,4 +168,46 @@ def dashboard_asset_allocation():
 
     return jsonify(
         allocation
-    ), 200
\ No newline at end of file
+    ), 200
+
+
+@dashboard_routes.route("/dashboard/bundle", methods=["GET"])
+@jwt_required()
+@etag_cached(daily=True)
+def dashboard_bundle():
+
+    user_id = int(get_jwt_identity())
+
+    range_key = request.args.get(
+        "range",
+        "30d"
+    )
+
+    if range_key not in VALID_RANGES:
+        return jsonify({
+            "error": (
+                "Invalid range. "
+                "Allowed values: "
+                "30d, 3m, 6m, 1y, all"
+            )
+        }), 400
+
+    bundle = get_dashboard_bundle(
+        user_id,
+        range_key
+    )
+
+    return jsonify(bundle), 200
+
+
+@dashboard_routes.route("/dashboard/cache-stats", methods=["GET"])
+@jwt_required()
+def dashboard_cache_stats():
+
+    # Counters are process-wide, not per user: only exposed when enabled
+    if not current_app.config.get("RESULT_CACHE_STATS_ENABLED"):
+        return jsonify({"error": "Not found"}), 404
+
+    return jsonify(
+        result_cache.stats()
+    ), 200
@@ -1,16 +1,37 @@
-from sqlalchemy import func
+from sqlalchemy import (func, select, literal, literal_column, union_all, case, cast, update, delete,
+                        type_coerce, BigInteger, Date)
+from sqlalchemy.dialects import postgresql, sqlite
 from datetime import datetime, timedelta, timezone
 from dateutil.relativedelta import relativedelta
+from types import SimpleNamespace
+import pytz
 
+from . import db
+from .cache import result_cache
+from .money import to_paise, from_paise
 from .models import (
+    User,
     Asset,
     Bank,
     Saving,
     CreditCard,
-    Transaction
+    Transaction,
+    Category,
+    SpendingRollup,
+    NetWorthSnapshot
 )
+from .ledger import signed_amount
 
+IST = pytz.timezone("Asia/Kolkata")
 
+# Transaction subtypes folded into the spending rollup
+ROLLUP_ACCOUNT_TYPES = {
+    "bank_transaction": "bank",
+    "credit_card_transaction": "credit_card"
+}
+
+
+@result_cache.memoize("summary")
 def get_dashboard_summary(user_id):
     total_assets = (
         func.coalesce(
@@ -89,84 +110,254 @@ def get_dashboard_summary(user_id):
 
 
 
-def get_spending_by_category(user_id, range_key="30d"):
+def get_range_cutoff(range_key):
     """
-    Returns spending grouped by category.
-
-    Matches current dashboard behavior:
-    - Includes only expense transactions
-    - Includes both bank and credit card expenses
-    - Excludes payments, income, savings transactions,
-      asset transactions, transfers, etc.
+    Returns the UTC cutoff datetime for a dashboard range key,
+    or None for "all".
     """
 
     now = datetime.now(timezone.utc)
 
-    cutoff_date = None
-
     if range_key == "30d":
-        cutoff_date = now - timedelta(days=30)
+        return now - timedelta(days=30)
 
     elif range_key == "3m":
-        cutoff_date = now - relativedelta(months=3)
+        return now - relativedelta(months=3)
 
     elif range_key == "6m":
-        cutoff_date = now - relativedelta(months=6)
+        return now - relativedelta(months=6)
 
     elif range_key == "1y":
-        cutoff_date = now - relativedelta(years=1)
+        return now - relativedelta(years=1)
 
-    elif range_key == "all":
-        cutoff_date = None
+    return None
 
-    query = Transaction.query.filter(
-        Transaction.user_id == user_id,
-        Transaction.transaction_type == "expense"
-    )
 
-    if cutoff_date:
-        query = query.filter(
-            Transaction.date >= cutoff_date
-        )
+@result_cache.memoize("spending", daily=True)
+def get_spending_by_category(user_id, range_key="30d"):
+    """
+    Returns spending grouped by category.
 
-    results = (
-        query.with_entities(
-            func.coalesce(
-                func.lower(
-                    func.trim(Transaction.category)
-                ),
-                "uncategorized"
-            ).label("category"),
+    Matches current dashboard behavior:
+    - Includes only expense transactions
+    - Includes both bank and credit card expenses
+    - Excludes payments, income, savings transactions,
+      asset transactions, transfers, etc.
+
+    Reads the pre-aggregated spending_rollup table,
+    not the raw transaction ledger.
+    """
+
+    cutoff_date = get_range_cutoff(range_key)
+
+    # Aggregate on the integer category_id; names are joined to the top rows only
+    totals = (
+        select(
+            SpendingRollup.category_id,
             func.sum(
-                func.abs(Transaction.amount)
+                SpendingRollup.total
             ).label("total")
         )
-        .group_by(
-            func.lower(
-                func.trim(Transaction.category)
-            )
+        .where(
+            SpendingRollup.user_id == user_id,
+            SpendingRollup.transaction_type == "expense"
         )
-        .order_by(
-            func.sum(
-                func.abs(Transaction.amount)
-            ).desc()
+        .group_by(
+            SpendingRollup.category_id
         )
-        .all()
     )
 
+    if cutoff_date:
+        totals = totals.where(
+            SpendingRollup.day >= cutoff_date.astimezone(IST).date()
+        )
+
+    totals = totals.subquery()
+
+    results = db.session.execute(
+        select(
+            Category.name,
+            totals.c.total
+        )
+        .join(totals, totals.c.category_id == Category.id)
+        .order_by(totals.c.total.desc())
+        .limit(12)
+    ).all()
+
     return [
         {
-            "name": (
-                row.category.title()
-                if row.category
-                else "Uncategorized"
-            ),
+            "name": format_category(row.name),
             "value": float(row.total or 0)
         }
-        for row in results[:12]
+        for row in results
     ]
 
 
+# ========== TRENDS ==========
+
+TREND_GRANULARITIES = {"month", "week"}
+TREND_TRANSACTION_TYPES = ("income", "expense")
+TREND_TOP_CATEGORIES = 8
+
+# Label of the folded remainder. Its bucket key is NULL (None), which no
+# category name can be, so a real "other" category keeps its own series.
+OTHER_LABEL = "Other"
+
+
+def period_start(column, granularity):
+    """SQL expression truncating an (IST) date column to its month or ISO week."""
+
+    if db.session.get_bind().dialect.name == "postgresql":
+        # Inlined (granularity is one of TREND_GRANULARITIES) so the
+        # SELECT and GROUP BY expressions are identical
+        return cast(
+            func.date_trunc(literal_column(f"'{granularity}'"), column),
+            Date
+        )
+
+    if granularity == "month":
+        return type_coerce(func.date(column, "start of month"), Date)
+
+    # Back to the Monday of the week, like date_trunc('week')
+    return type_coerce(func.date(column, "-6 days", "weekday 1"), Date)
+
+
+def _trend_periods(first, last, granularity):
+    if granularity == "month":
+        first, step = first.replace(day=1), relativedelta(months=1)
+    else:
+        first, step = first - timedelta(days=first.weekday()), timedelta(weeks=1)
+
+    periods = []
+    while first <= last:
+        periods.append(first)
+        first += step
+
+    return periods
+
+
+@result_cache.memoize("trends", daily=True)
+def get_spending_trends(user_id, range_key="1y", granularity="month", top_n=TREND_TOP_CATEGORIES):
+    """
+    Returns income and expense totals per month or week, split by
+    category. Per transaction type, the top_n categories of the range
+    keep their own series and the rest are folded into "Other".
+
+    Reads spending_rollup, whose days are already IST, in one statement:
+    the categories are ranked with a window function and bucketed in SQL.
+    """
+
+    cutoff_date = get_range_cutoff(range_key)
+
+    filters = [
+        SpendingRollup.user_id == user_id,
+        SpendingRollup.transaction_type.in_(TREND_TRANSACTION_TYPES)
+    ]
+
+    if cutoff_date:
+        filters.append(
+            SpendingRollup.day >= cutoff_date.astimezone(IST).date()
+        )
+
+    period = period_start(SpendingRollup.day, granularity).label("period")
+
+    # One pass over the rollup; ranking and bucketing work on these sums
+    totals = (
+        select(
+            period,
+            SpendingRollup.transaction_type,
+            SpendingRollup.category_id,
+            func.sum(SpendingRollup.total).label("total")
+        )
+        .where(*filters)
+        .group_by(period, SpendingRollup.transaction_type, SpendingRollup.category_id)
+        .cte("period_totals")
+    )
+
+    category_rank = func.row_number().over(
+        partition_by=totals.c.transaction_type,
+        order_by=(func.sum(totals.c.total).desc(), totals.c.category_id)
+    )
+
+    ranked = (
+        select(
+            totals.c.transaction_type,
+            totals.c.category_id,
+            case(
+                (category_rank <= top_n, Category.name),
+                else_=None
+            ).label("bucket")
+        )
+        .join(Category, Category.id == totals.c.category_id)
+        .group_by(totals.c.transaction_type, totals.c.category_id, Category.name)
+        .subquery()
+    )
+
+    rows = db.session.execute(
+        select(
+            totals.c.period,
+            totals.c.transaction_type,
+            ranked.c.bucket,
+            func.sum(totals.c.total).label("total")
+        )
+        .join(
+            ranked,
+            (ranked.c.transaction_type == totals.c.transaction_type)
+            & (ranked.c.category_id == totals.c.category_id)
+        )
+        .group_by(totals.c.period, totals.c.transaction_type, ranked.c.bucket)
+    ).all()
+
+    bounds = [row.period for row in rows]
+    if cutoff_date:
+        bounds.append(cutoff_date.astimezone(IST).date())
+
+    periods = _trend_periods(
+        min(bounds),
+        max(datetime.now(IST).date(), *bounds),
+        granularity
+    ) if bounds else []
+    index = {period: position for position, period in enumerate(periods)}
+
+    series = {
+        transaction_type: {}
+        for transaction_type in TREND_TRANSACTION_TYPES
+    }
+
+    for row in rows:
+        values = series[row.transaction_type].setdefault(row.bucket, [0.0] * len(periods))
+        values[index[row.period]] = float(row.total or 0)
+
+    result = {
+        "granularity": granularity,
+        "periods": [period.isoformat() for period in periods]
+    }
+
+    for transaction_type, buckets in series.items():
+        # Largest first, with the folded remainder last
+        names = sorted(
+            buckets,
+            key=lambda name: (name is None, -sum(buckets[name]))
+        )
+
+        result[transaction_type] = {
+            "total": [
+                round(sum(values[position] for values in buckets.values()), 2)
+                for position in range(len(periods))
+            ],
+            "categories": [
+                {
+                    "name": OTHER_LABEL if name is None else format_category(name),
+                    "values": buckets[name]
+                }
+                for name in names
+            ]
+        }
+
+    return result
+
+
+@result_cache.memoize("asset_allocation")
 def get_asset_allocation(user_id):
     """
     Returns asset allocation grouped by category.
@@ -204,4 +395,618 @@ def get_asset_allocation(user_id):
             "value": float(row.total or 0)
         }
         for row in results
-    ]
\ No newline at end of file
+    ]
+
+
+@result_cache.memoize("bundle", daily=True)
+def get_dashboard_bundle(user_id, range_key="30d"):
+    """
+    Returns summary, spending by category and asset allocation
+    in one response, fetched with a single UNION ALL statement.
+
+    Every row is (section, name, value), so the whole dashboard
+    costs one database roundtrip instead of six.
+    """
+
+    def section_total(section, name, column, model):
+        return (
+            select(
+                literal(section).label("section"),
+                literal(name).label("name"),
+                func.coalesce(func.sum(column), 0).label("value")
+            )
+            .where(model.user_id == user_id)
+        )
+
+    spending = (
+        select(
+            literal("spending").label("section"),
+            Category.name.label("name"),
+            func.sum(SpendingRollup.total).label("value")
+        )
+        .join(Category, Category.id == SpendingRollup.category_id)
+        .where(
+            SpendingRollup.user_id == user_id,
+            SpendingRollup.transaction_type == "expense"
+        )
+        .group_by(SpendingRollup.category_id, Category.name)
+    )
+
+    cutoff_date = get_range_cutoff(range_key)
+
+    if cutoff_date:
+        spending = spending.where(
+            SpendingRollup.day >= cutoff_date.astimezone(IST).date()
+        )
+
+    allocation = (
+        select(
+            literal("allocation").label("section"),
+            func.coalesce(
+                Asset.category,
+                "Uncategorized"
+            ).label("name"),
+            func.sum(Asset.balance).label("value")
+        )
+        .where(Asset.user_id == user_id)
+        .group_by(Asset.category)
+    )
+
+    statement = union_all(
+        section_total("summary", "total_assets", Asset.balance, Asset),
+        section_total("summary", "total_bank_balance", Bank.balance, Bank),
+        section_total("summary", "total_savings", Saving.balance, Saving),
+        section_total("summary", "total_credit_card_debt", CreditCard.used, CreditCard),
+        spending,
+        allocation
+    )
+
+    rows = db.session.execute(statement).all()
+
+    summary = {}
+    spending_rows = []
+    allocation_rows = []
+
+    for row in rows:
+        value = float(row.value or 0)
+
+        if row.section == "summary":
+            summary[row.name] = value
+
+        elif row.section == "spending":
+            spending_rows.append({
+                "name": format_category(row.name),
+                "value": value
+            })
+
+        else:
+            allocation_rows.append({
+                "name": row.name or "Uncategorized",
+                "value": value
+            })
+
+    summary["net_worth"] = (
+        summary["total_assets"]
+        + summary["total_bank_balance"]
+        + summary["total_savings"]
+        - summary["total_credit_card_debt"]
+    )
+
+    spending_rows.sort(key=lambda item: item["value"], reverse=True)
+    allocation_rows.sort(key=lambda item: item["value"], reverse=True)
+
+    return {
+        "summary": summary,
+        "spending": spending_rows[:12],
+        "asset_allocation": allocation_rows
+    }
+
+
+# ========== CATEGORIES ==========
+
+UNCATEGORIZED = "uncategorized"
+
+
+def normalize_category(category):
+    return (category or "").strip().lower() or UNCATEGORIZED
+
+
+def normalized_category_sql(column):
+    """SQL twin of normalize_category, for backfills."""
+
+    return func.coalesce(
+        func.nullif(
+            func.lower(
+                func.trim(column)
+            ),
+            ""
+        ),
+        UNCATEGORIZED
+    )
+
+
+def format_category(category):
+    if not category or category == UNCATEGORIZED:
+        return "Uncategorized"
+
+    return category.title()
+
+
+def category_ids(categories):
+    """
+    Maps each normalized category of `categories` (raw text) to its id,
+    creating missing ones. Runs in the caller's transaction: one SELECT,
+    plus one INSERT ... ON CONFLICT DO NOTHING for new names.
+    """
+
+    names = {normalize_category(category) for category in categories}
+    if not names:
+        return {}
+
+    def lookup(wanted):
+        return dict(
+            db.session.execute(
+                select(Category.name, Category.id).where(Category.name.in_(wanted))
+            ).all()
+        )
+
+    ids = lookup(names)
+    missing = names - ids.keys()
+
+    if missing:
+        db.session.execute(
+            _dialect_insert(Category).on_conflict_do_nothing(index_elements=[Category.name]),
+            [{"name": name} for name in sorted(missing)]
+        )
+        ids.update(lookup(missing))
+
+    return ids
+
+
+def category_id(category):
+    return category_ids([category])[normalize_category(category)]
+
+
+def assign_category_ids(user_id=None):
+    """
+    Set category_id on transactions that lack one (rows restored from
+    an archive or written before categories existed). Does not commit.
+    """
+
+    pending = Transaction.category_id.is_(None)
+    if user_id is not None:
+        pending = pending & (Transaction.user_id == user_id)
+
+    names = db.session.execute(
+        select(normalized_category_sql(Transaction.category)).where(pending).distinct()
+    ).scalars().all()
+    category_ids(names)
+
+    db.session.execute(
+        update(Transaction.__table__)
+        .where(pending)
+        .values(
+            category_id=select(Category.id)
+            .where(Category.name == normalized_category_sql(Transaction.category))
+            .scalar_subquery()
+        )
+    )
+
+
+# ========== SPENDING ROLLUP ==========
+
+
+def ist_day(column):
+    """SQL expression for the IST calendar day of a UTC timestamp column."""
+
+    if db.session.get_bind().dialect.name == "postgresql":
+        return cast(
+            func.timezone(
+                "Asia/Kolkata",
+                func.timezone("UTC", column)
+            ),
+            Date
+        )
+
+    return func.date(column, "+330 minutes")
+
+
+def _dialect_insert(model):
+    if db.session.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(model)
+
+    return sqlite.insert(model)
+
+
+def record_spending(transaction, account_type):
+    """
+    Adds one bank or credit card transaction to the rollup.
+    Runs inside the caller's transaction, so it commits with it.
+    """
+
+    record_spending_batch(
+        transaction.user_id,
+        account_type,
+        [transaction]
+    )
+
+
+def record_spending_batch(user_id, account_type, transactions):
+    """
+    Adds many transactions (objects or dicts) of one account type to
+    the rollup, pre-summed per rollup row so each row is upserted once.
+    Rows without a category_id are resolved from their category text.
+    """
+
+    transactions = [
+        SimpleNamespace(**transaction) if isinstance(transaction, dict) else transaction
+        for transaction in transactions
+    ]
+
+    unresolved = category_ids(
+        transaction.category for transaction in transactions
+        if getattr(transaction, "category_id", None) is None
+    )
+
+    totals = {}
+
+    for transaction in transactions:
+        posted_at = transaction.date
+
+        if posted_at.tzinfo is None:
+            posted_at = pytz.utc.localize(posted_at)
+
+        key = (
+            posted_at.astimezone(IST).date(),
+            getattr(transaction, "category_id", None)
+            or unresolved[normalize_category(transaction.category)],
+            transaction.transaction_type
+        )
+
+        total, count = totals.get(key, (0, 0))
+        totals[key] = (total + abs(to_paise(transaction.amount)), count + 1)
+
+    if not totals:
+        return
+
+    statement = _dialect_insert(SpendingRollup)
+
+    statement = statement.on_conflict_do_update(
+        index_elements=[
+            SpendingRollup.user_id,
+            SpendingRollup.day,
+            SpendingRollup.category_id,
+            SpendingRollup.account_type,
+            SpendingRollup.transaction_type
+        ],
+        set_={
+            "total": SpendingRollup.total + statement.excluded.total,
+            "txn_count": SpendingRollup.txn_count + statement.excluded.txn_count
+        }
+    )
+
+    db.session.execute(
+        statement,
+        [
+            {
+                "user_id": user_id,
+                "day": day,
+                "category_id": category,
+                "account_type": account_type,
+                "transaction_type": transaction_type,
+                "total": from_paise(total),
+                "txn_count": count
+            }
+            for (day, category, transaction_type), (total, count) in totals.items()
+        ]
+    )
+
+
+def rebuild_spending_rollup(user_id=None):
+    """
+    Recomputes the rollup from the raw ledger with one
+    DELETE and one INSERT ... SELECT. Does not commit.
+    """
+
+    assign_category_ids(user_id)
+
+    delete = SpendingRollup.__table__.delete()
+
+    if user_id is not None:
+        delete = delete.where(SpendingRollup.user_id == user_id)
+
+    db.session.execute(delete)
+
+    day = ist_day(Transaction.date)
+    category = Transaction.category_id
+
+    account_type = case(
+        ROLLUP_ACCOUNT_TYPES,
+        value=Transaction.type
+    )
+
+    source = (
+        select(
+            Transaction.user_id,
+            day,
+            category,
+            account_type,
+            Transaction.transaction_type,
+            func.sum(func.abs(Transaction.amount)),
+            func.count()
+        )
+        .where(
+            Transaction.type.in_(ROLLUP_ACCOUNT_TYPES),
+            Transaction.transaction_type.isnot(None)
+        )
+        .group_by(
+            Transaction.user_id,
+            day,
+            category,
+            account_type,
+            Transaction.transaction_type
+        )
+    )
+
+    if user_id is not None:
+        source = source.where(Transaction.user_id == user_id)
+
+    db.session.execute(
+        SpendingRollup.__table__.insert().from_select(
+            [
+                "user_id",
+                "day",
+                "category_id",
+                "account_type",
+                "transaction_type",
+                "total",
+                "txn_count"
+            ],
+            source
+        )
+    )
+
+
+# ========== NET WORTH SNAPSHOTS ==========
+
+# Account type -> (balance column, ledger foreign key, balance-after column, snapshot column)
+NET_WORTH_ACCOUNTS = {
+    "asset": (Asset.balance, "asset_id", "asset_balance_after", "assets"),
+    "bank": (Bank.balance, "bank_id", "bank_balance_after", "bank"),
+    "saving": (Saving.balance, "saving_id", "saving_balance_after", "savings"),
+    "credit_card": (CreditCard.used, "credit_card_id", "card_balance_after", "card_debt"),
+}
+
+SNAPSHOT_COLUMNS = [snapshot_column for *_, snapshot_column in NET_WORTH_ACCOUNTS.values()]
+
+
+def _paise(column):
+    return type_coerce(column, BigInteger)
+
+
+def _next_day(column):
+    if db.session.get_bind().dialect.name == "postgresql":
+        return column + 1
+
+    return func.date(column, "+1 day")
+
+
+def _current_totals(users):
+    """(user_id, assets, bank, savings, card_debt) in paise from the live balances."""
+
+    source = select(User.id.label("user_id"))
+
+    for balance, _, _, snapshot_column in NET_WORTH_ACCOUNTS.values():
+        model = balance.class_
+        totals = (
+            select(
+                model.user_id,
+                func.sum(_paise(balance)).label("total")
+            )
+            .where(model.user_id.between(*users))
+            .group_by(model.user_id)
+            .subquery(snapshot_column)
+        )
+
+        source = (
+            source
+            .add_columns(func.coalesce(totals.c.total, 0).label(snapshot_column))
+            .outerjoin(totals, totals.c.user_id == User.id)
+        )
+
+    return source.where(User.id.between(*users))
+
+
+def snapshot_net_worth(day, users):
+    """
+    Writes the `day` snapshot of every user in the inclusive id range
+    `users` from the live account balances, with one DELETE and one
+    INSERT ... SELECT. Returns the user ids. Does not commit.
+    """
+
+    db.session.execute(
+        delete(NetWorthSnapshot).where(
+            NetWorthSnapshot.day == day,
+            NetWorthSnapshot.user_id.between(*users)
+        )
+    )
+
+    current = _current_totals(users).subquery()
+
+    return db.session.execute(
+        NetWorthSnapshot.__table__.insert()
+        .from_select(
+            ["user_id", "day", *SNAPSHOT_COLUMNS],
+            select(
+                current.c.user_id,
+                literal(day, Date),
+                *(current.c[column] for column in SNAPSHOT_COLUMNS)
+            )
+        )
+        .returning(NetWorthSnapshot.user_id)
+    ).scalars().all()
+
+
+def _daily_changes(users):
+    """
+    (user_id, day, assets, bank, savings, card_debt): how much each
+    total moved on every IST day with ledger rows, in paise: the sum of
+    the signed amounts of that day's rows, whatever order their ids are
+    in (backdated rows interleave dates).
+    """
+
+    ledger = Transaction.__table__
+    day = ist_day(ledger.c.date)
+    changes = []
+
+    for account_type, (_, account_column, balance_after, snapshot_column) in NET_WORTH_ACCOUNTS.items():
+        change = func.sum(signed_amount(account_type, ledger))
+
+        changes.append(
+            select(
+                ledger.c.user_id,
+                day.label("day"),
+                *(
+                    (change if column == snapshot_column else literal(0)).label(column)
+                    for column in SNAPSHOT_COLUMNS
+                )
+            )
+            .where(
+                ledger.c[account_column].isnot(None),
+                ledger.c[balance_after].isnot(None),
+                ledger.c.user_id.between(*users)
+            )
+            .group_by(ledger.c.user_id, day)
+        )
+
+    changes = union_all(*changes).subquery()
+
+    return (
+        select(
+            changes.c.user_id,
+            changes.c.day,
+            *(func.sum(changes.c[column]).label(column) for column in SNAPSHOT_COLUMNS)
+        )
+        .group_by(changes.c.user_id, changes.c.day)
+        .cte("daily_changes")
+    )
+
+
+def rebuild_net_worth_history(users, today=None):
+    """
+    Replaces the snapshots of the users in the inclusive id range
+    `users` with one per IST day from their first ledger row to today,
+    with one DELETE and one INSERT ... SELECT.
+
+    The day-to-day changes are the summed signed amounts of each day's
+    ledger rows (rows without a balance-after are skipped), anchored on
+    the live balances: a day's total is the current one minus every
+    change after that day. Accounts without ledger rows count at their
+    current balance throughout. Returns the user ids. Does not commit.
+    """
+
+    today = literal(today or datetime.now(IST).date(), Date)
+
+    db.session.execute(
+        delete(NetWorthSnapshot).where(NetWorthSnapshot.user_id.between(*users))
+    )
+
+    # CTEs, so the ledger is aggregated once although read three times
+    current = _current_totals(users).cte("current_totals")
+    changes = _daily_changes(users)
+
+    overall = (
+        select(
+            changes.c.user_id,
+            func.min(changes.c.day).label("first_day"),
+            *(func.sum(changes.c[column]).label(column) for column in SNAPSHOT_COLUMNS)
+        )
+        .group_by(changes.c.user_id)
+        .cte("overall_changes")
+    )
+
+    first_day = func.coalesce(overall.c.first_day, today)
+
+    # One row per user and day, up to today
+    days = (
+        select(
+            current.c.user_id,
+            case((first_day > today, today), else_=first_day).label("day")
+        )
+        .outerjoin(overall, overall.c.user_id == current.c.user_id)
+        .cte("days", recursive=True)
+    )
+
+    days = days.union_all(
+        select(days.c.user_id, _next_day(days.c.day))
+        .where(days.c.day < today)
+    )
+
+    totals = [
+        (
+            current.c[column]
+            - func.coalesce(overall.c[column], 0)
+            + func.sum(func.coalesce(changes.c[column], 0)).over(
+                partition_by=days.c.user_id,
+                order_by=days.c.day
+            )
+        )
+        for column in SNAPSHOT_COLUMNS
+    ]
+
+    db.session.execute(
+        NetWorthSnapshot.__table__.insert()
+        .from_select(
+            ["user_id", "day", *SNAPSHOT_COLUMNS],
+            select(days.c.user_id, days.c.day, *totals)
+            .join(current, current.c.user_id == days.c.user_id)
+            .outerjoin(overall, overall.c.user_id == days.c.user_id)
+            .outerjoin(
+                changes,
+                (changes.c.user_id == days.c.user_id) & (changes.c.day == days.c.day)
+            )
+        )
+    )
+
+    return db.session.execute(
+        select(User.id).where(User.id.between(*users))
+    ).scalars().all()
+
+
+@result_cache.memoize("net_worth_history", daily=True)
+def get_net_worth_history(user_id, range_key="1y"):
+    """
+    Returns the daily net worth snapshots of the range, oldest first.
+    A primary key range scan on (user_id, day).
+    """
+
+    cutoff_date = get_range_cutoff(range_key)
+
+    query = (
+        select(
+            NetWorthSnapshot.day,
+            _paise(NetWorthSnapshot.assets).label("assets"),
+            _paise(NetWorthSnapshot.bank).label("bank"),
+            _paise(NetWorthSnapshot.savings).label("savings"),
+            _paise(NetWorthSnapshot.card_debt).label("card_debt")
+        )
+        .where(NetWorthSnapshot.user_id == user_id)
+        .order_by(NetWorthSnapshot.day)
+    )
+
+    if cutoff_date:
+        query = query.where(
+            NetWorthSnapshot.day >= cutoff_date.astimezone(IST).date()
+        )
+
+    return [
+        {
+            "date": day.isoformat(),
+            "assets": from_paise(assets),
+            "bank": from_paise(bank),
+            "savings": from_paise(savings),
+            "card_debt": from_paise(card_debt),
+            "net_worth": from_paise(assets + bank + savings - card_debt)
+        }
+        for day, assets, bank, savings, card_debt in db.session.execute(query)
+    ]
@@ -0,0 +1,412 @@
+import csv
+import io
+import json
+import math
+from datetime import datetime, timezone
+
+from flask import Blueprint, Response, jsonify, request, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import insert
+
+from . import db
+from .archive import ARCHIVE_FORMATS, iter_archive
+from .dashboard_service import category_ids, normalize_category, record_spending_batch
+from .journal import journal_entry, write_journal
+from .models import Bank, CreditCard, BankTransaction, CreditCardTransaction
+from .sql_instrumentation import UNLIMITED, query_budget
+from .routes import (IST, apply_bank_posting, apply_card_posting,
+                     get_last_statement)
+import pytz
+
+data_routes = Blueprint(
+    "data_routes",
+    __name__
+)
+
+IMPORT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 500
+# Rupees per row; keeps balances far inside BIGINT paise
+MAX_IMPORT_AMOUNT = 10 ** 12
+
+CSV_CONTENT_TYPE = "text/csv"
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/jsonl")
+
+
+def iter_import_rows():
+    """
+    Yields (row_number, dict) from a CSV or JSON-lines request body
+    without reading the whole upload into memory. The caller checks
+    import_content_type_error() first.
+    """
+
+    stream = io.TextIOWrapper(request.stream, encoding="utf-8", newline="")
+
+    if (request.mimetype or "").lower() == CSV_CONTENT_TYPE:
+        # Row 1 is the header line
+        for row_number, row in enumerate(csv.DictReader(stream), start=2):
+            yield row_number, row
+
+    else:
+        for row_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            if not isinstance(row, dict):
+                yield row_number, ValueError("Invalid JSON object")
+                continue
+            yield row_number, row
+
+
+def import_content_type_error():
+    """A 415 response unless the body is CSV or JSON lines, else None."""
+
+    if (request.mimetype or "").lower() in (CSV_CONTENT_TYPE, *NDJSON_CONTENT_TYPES):
+        return None
+    return jsonify({"error": "Content-Type must be text/csv or application/x-ndjson"}), 415
+
+
+def import_amount(row):
+    """
+    KeyError when missing; TypeError for nulls, lists and objects (JSON)
+    or short CSV rows; ValueError for nan, inf and out-of-range amounts.
+    """
+
+    try:
+        amount = float(row["amount"])
+    except TypeError:
+        raise TypeError("Amount must be a number")
+
+    if not math.isfinite(amount):
+        raise ValueError("Amount must be a finite number")
+    if abs(amount) > MAX_IMPORT_AMOUNT:
+        raise ValueError("Amount is too large")
+    return amount
+
+
+def import_text(row, column):
+    """The column's text, None when empty; TypeError for any other JSON value."""
+
+    value = row.get(column)
+    if value is None or value == "":
+        return None
+    if not isinstance(value, str):
+        raise TypeError(f"{column.capitalize()} must be text")
+    return value
+
+
+def parse_import_date(value):
+    """
+    YYYY-MM-DD is read as IST midnight, naive ISO datetimes as IST,
+    offset-aware ones as given. Returns an aware UTC datetime.
+    """
+
+    if not value:
+        return datetime.now(timezone.utc)
+
+    parsed = datetime.fromisoformat(str(value).strip())
+
+    if parsed.tzinfo is None:
+        parsed = IST.localize(parsed)
+
+    parsed = parsed.astimezone(pytz.utc)
+
+    if parsed > datetime.now(timezone.utc):
+        raise ValueError("Transaction date cannot be in the future")
+
+    return parsed
+
+
+class ImportReport:
+
+    def __init__(self):
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+
+    def fail(self, row_number, error):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row_number, "error": str(error)})
+
+    def as_dict(self):
+        return {
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors)
+        }
+
+
+def import_journal_entry(account_type, user_id, row):
+    if account_type == "bank":
+        account_id = row["bank_id"]
+        amount = -row["amount"] if row["transaction_type"] == "expense" else row["amount"]
+    else:
+        account_id, amount = row["credit_card_id"], row["amount"]
+
+    return journal_entry(
+        user_id, f"{account_type}_transaction", [(account_type, account_id, amount)],
+        row["date"], row["description"]
+    )
+
+
+def flush_import_batch(model, account_type, user_id, batch):
+    """One multi-row INSERT, one rollup upsert and one journal write per batch."""
+
+    if not batch:
+        return
+
+    ids = category_ids(row["category"] for row in batch)
+    for row in batch:
+        row["category_id"] = ids[normalize_category(row["category"])]
+
+    db.session.execute(insert(model), batch)
+    record_spending_batch(user_id, account_type, batch)
+    write_journal([import_journal_entry(account_type, user_id, row) for row in batch])
+    batch.clear()
+
+
+@data_routes.route("/banks/<int:bank_id>/transactions/import", methods=["POST"])
+@jwt_required()
+@query_budget(UNLIMITED, repeats=UNLIMITED)
+def import_bank_transactions(bank_id):
+    """
+    Columns: amount, type (income|expense), date, description, category.
+    Rows must be in chronological order, after the bank's latest
+    transaction, so balance_after follows the dated history. Valid rows
+    are posted in file order; invalid rows are reported and skipped.
+    """
+
+    content_type_error = import_content_type_error()
+    if content_type_error:
+        return content_type_error
+
+    user_id = int(get_jwt_identity())
+    bank = Bank.query.filter_by(id=bank_id, user_id=user_id).with_for_update().first()
+    if not bank:
+        return jsonify({"error": "Bank not found"}), 404
+
+    latest_txn = BankTransaction.query.filter_by(
+        bank_id=bank.id
+    ).order_by(BankTransaction.date.desc()).first()
+
+    latest_date = None
+    if latest_txn:
+        latest_date = latest_txn.date
+        if latest_date.tzinfo is None:
+            latest_date = pytz.utc.localize(latest_date)
+
+    report = ImportReport()
+    batch = []
+
+    try:
+        for row_number, row in iter_import_rows():
+            try:
+                if isinstance(row, Exception):
+                    raise row
+
+                amount = import_amount(row)
+                if amount <= 0:
+                    raise ValueError("Amount must be greater than zero")
+
+                transaction_type = (import_text(row, "type") or "income").strip()
+                description = import_text(row, "description") or ""
+                category = import_text(row, "category") or ""
+                transaction_date = parse_import_date(import_text(row, "date"))
+
+            except KeyError:
+                report.fail(row_number, "Amount is required")
+                continue
+
+            except (ValueError, TypeError, AttributeError) as e:
+                report.fail(row_number, e)
+                continue
+
+            if latest_date and transaction_date < latest_date:
+                report.fail(row_number, "Transaction date must be on or after the last transaction's date.")
+                continue
+
+            new_balance, error = apply_bank_posting(bank, amount, transaction_type)
+            if error:
+                report.fail(row_number, error)
+                continue
+
+            latest_date = transaction_date
+
+            batch.append({
+                "bank_id": bank.id,
+                "user_id": user_id,
+                "amount": amount,
+                "description": description,
+                "category": category,
+                "transaction_type": transaction_type,
+                "bank_balance_after": new_balance,
+                "date": transaction_date
+            })
+            report.imported += 1
+
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                flush_import_batch(BankTransaction, "bank", user_id, batch)
+
+        flush_import_batch(BankTransaction, "bank", user_id, batch)
+        db.session.commit()
+
+    except UnicodeDecodeError:
+        db.session.rollback()
+        return jsonify({"error": "File must be UTF-8 encoded"}), 400
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Server error: {str(e)}"}), 500
+
+    return jsonify({
+        "message": "Import completed",
+        "balance": bank.balance,
+        **report.as_dict()
+    }), 200
+
+
+@data_routes.route("/credit_cards/<int:card_id>/transactions/import", methods=["POST"])
+@jwt_required()
+@query_budget(UNLIMITED, repeats=UNLIMITED)
+def import_credit_card_transactions(card_id):
+    """
+    Columns: amount (negative = expense, positive = payment), date,
+    description, category. Rows must be in chronological order and
+    follow the same rules as a single card transaction.
+    """
+
+    content_type_error = import_content_type_error()
+    if content_type_error:
+        return content_type_error
+
+    user_id = int(get_jwt_identity())
+    card = CreditCard.query.filter_by(id=card_id, user_id=user_id).with_for_update().first()
+    if not card:
+        return jsonify({"error": "Credit card not found"}), 404
+
+    latest_txn = CreditCardTransaction.query.filter_by(
+        credit_card_id=card.id
+    ).order_by(CreditCardTransaction.date.desc()).first()
+
+    latest_date = None
+    if latest_txn:
+        latest_date = latest_txn.date
+        if latest_date.tzinfo is None:
+            latest_date = pytz.utc.localize(latest_date)
+
+    last_statement = get_last_statement(card.id)
+    today = datetime.now(timezone.utc).date()
+
+    report = ImportReport()
+    batch = []
+
+    try:
+        for row_number, row in iter_import_rows():
+            try:
+                if isinstance(row, Exception):
+                    raise row
+
+                amount = import_amount(row)
+                if amount == 0:
+                    raise ValueError("Amount cannot be zero")
+
+                date_text = import_text(row, "date")
+                if not date_text:
+                    raise ValueError("Transaction date is required")
+                transaction_date = parse_import_date(date_text)
+                description = import_text(row, "description")
+                category = import_text(row, "category")
+
+            except KeyError:
+                report.fail(row_number, "Amount is required")
+                continue
+
+            except (ValueError, TypeError, AttributeError) as e:
+                report.fail(row_number, e)
+                continue
+
+            if latest_date and transaction_date < latest_date:
+                report.fail(row_number, "Transaction date must be on or after the last transaction's date.")
+                continue
+
+            if last_statement and transaction_date.date() <= last_statement.cycle_end:
+                report.fail(row_number, "Transaction date falls in an already closed statement.")
+                continue
+
+            is_billed, error = apply_card_posting(card, amount, transaction_date, today)
+            if error:
+                report.fail(row_number, error)
+                continue
+
+            latest_date = transaction_date
+
+            batch.append({
+                "credit_card_id": card.id,
+                "user_id": user_id,
+                "amount": amount,
+                "date": transaction_date,
+                "description": description,
+                "category": category,
+                "transaction_type": "expense" if amount < 0 else "payment",
+                "is_payment": amount > 0,
+                "is_billed": is_billed,
+                "card_balance_after": card.used
+            })
+            report.imported += 1
+
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                flush_import_batch(CreditCardTransaction, "credit_card", user_id, batch)
+
+        flush_import_batch(CreditCardTransaction, "credit_card", user_id, batch)
+        db.session.commit()
+
+    except UnicodeDecodeError:
+        db.session.rollback()
+        return jsonify({"error": "File must be UTF-8 encoded"}), 400
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": f"Server error: {str(e)}"}), 500
+
+    return jsonify({
+        "message": "Import completed",
+        "card": {
+            "used": card.used,
+            "available_limit": card.available_limit,
+            "billed_unpaid": card.billed_unpaid,
+            "unbilled_spends": card.unbilled_spends,
+            "total_payable": card.total_payable
+        },
+        **report.as_dict()
+    }), 200
+
+
+@data_routes.route("/export", methods=["GET"])
+@jwt_required()
+def export_data():
+    """
+    Streams a zip of all the user's accounts, transactions, transfers and
+    statements, one ?format=ndjson (default) or csv member per table.
+    The same archive can be loaded with `flask data restore`; it has no
+    password hash, so restored users need `flask data set-password`.
+    """
+
+    user_id = int(get_jwt_identity())
+    fmt = request.args.get("format", "ndjson")
+    if fmt not in ARCHIVE_FORMATS:
+        return jsonify({"error": "format must be ndjson or csv"}), 400
+
+    filename = f"ppa-export-{user_id}-{datetime.now(timezone.utc):%Y%m%d}.zip"
+
+    return Response(
+        stream_with_context(iter_archive([user_id], fmt)),
+        mimetype="application/zip",
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "Cache-Control": "no-store"
+        }
+    )
@@ -0,0 +1,71 @@
+from flask import request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask_jwt_extended.exceptions import JWTExtendedException
+from flask_sqlalchemy.session import Session
+from jwt.exceptions import PyJWTError
+from sqlalchemy.sql.dml import UpdateBase
+
+# Bind key of the optional read replica in SQLALCHEMY_BINDS
+REPLICA_BIND_KEY = "replica"
+
+# session.info flag set for requests whose reads may go to the replica
+USE_REPLICA = "use_replica"
+
+
+class RoutingSession(Session):
+    """
+    Sends reads to the read replica while session.info[USE_REPLICA] is
+    set. Flushes and INSERT/UPDATE/DELETE statements always go to the
+    primary, and clear the flag so the rest of the session reads its
+    own writes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.info.get(USE_REPLICA):
+            if self._flushing or isinstance(clause, UpdateBase):
+                self.info[USE_REPLICA] = False
+            else:
+                return self._db.engines[REPLICA_BIND_KEY]
+
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def replica_configured(app):
+    return REPLICA_BIND_KEY in app.config.get("SQLALCHEMY_BINDS", {})
+
+
+def init_replica_routing(app, db):
+    """
+    Route authenticated GET requests (the @jwt_required reads, which
+    include every dashboard_service query) to the replica.
+
+    A replica that has not yet caught up with the user's latest commit
+    (user.data_version is behind the primary's) is skipped for that
+    request, so users always read their own writes and ETags never go
+    backwards. That costs one primary key lookup on the primary.
+    """
+
+    if not replica_configured(app):
+        return
+
+    from .models import User
+
+    def data_version(user_id):
+        return db.session.query(User.data_version).filter_by(id=user_id).scalar()
+
+    @app.before_request
+    def route_reads_to_replica():
+        if request.method != "GET" or "Authorization" not in request.headers:
+            return
+
+        try:
+            verify_jwt_in_request()
+        except (JWTExtendedException, PyJWTError):
+            return  # @jwt_required answers with the error
+
+        user_id = int(get_jwt_identity())
+        primary_version = data_version(user_id)
+
+        db.session.info[USE_REPLICA] = True
+        if data_version(user_id) != primary_version:
+            db.session.info[USE_REPLICA] = False
@@ -0,0 +1,116 @@
+import zlib
+from datetime import datetime
+from functools import wraps
+
+import pytz
+from flask import g, has_request_context, request, make_response
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import event, update
+
+from . import db
+from .cache import flushed_owners
+from .models import User
+
+IST = pytz.timezone("Asia/Kolkata")
+
+_watched_sessions = set()
+
+
+def cache_control(max_age=0, stale_while_revalidate=None):
+    if max_age == 0 and not stale_while_revalidate:
+        return "private, no-cache"
+
+    policy = f"private, max-age={max_age}"
+    if stale_while_revalidate:
+        policy += f", stale-while-revalidate={stale_while_revalidate}"
+    return policy
+
+
+def bump_data_versions(connection, user_ids):
+    if user_ids:
+        connection.execute(
+            update(User.__table__)
+            .where(User.__table__.c.id.in_(user_ids))
+            .values(data_version=User.__table__.c.data_version + 1)
+        )
+
+
+def current_data_version(user_id):
+    """
+    The user's data_version, read once per request (and again after a
+    commit): the ETag and the memoized results of a response are keyed
+    on the same value, so a body can never be older than its ETag.
+    """
+
+    versions = g.setdefault("data_versions", {}) if has_request_context() else {}
+    if user_id not in versions:
+        versions[user_id] = db.session.query(User.data_version).filter_by(id=user_id).scalar() or 0
+    return versions[user_id]
+
+
+def cache_day():
+    """
+    Today's IST date, fixed for the request. Range-relative results
+    ("last 30d", trends up to today) change with it even without writes.
+    """
+
+    if not has_request_context():
+        return datetime.now(IST).date()
+    if "cache_day" not in g:
+        g.cache_day = datetime.now(IST).date()
+    return g.cache_day
+
+
+def watch_data_versions(session, models):
+    """
+    Bump user.data_version inside the same transaction as any flush
+    that touches the user's rows, so every worker sees the new version
+    exactly when the data commits.
+    """
+
+    if id(session) in _watched_sessions:
+        return
+    _watched_sessions.add(id(session))
+
+    @event.listens_for(session, "after_flush")
+    def bump_owner_versions(sess, flush_context):
+        bump_data_versions(sess.connection(), flushed_owners(sess, models))
+
+
+def etag_cached(max_age=0, stale_while_revalidate=None, daily=False):
+    """
+    Strong ETag for a per-user GET route, derived from the user's
+    data_version (and for `daily` range-relative routes, today's IST
+    date, which moves the range's cutoff). A matching If-None-Match is
+    answered with 304 before the route runs, so nothing is queried or
+    serialized.
+
+    Must be applied below @jwt_required().
+    """
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            user_id = int(get_jwt_identity())
+            version = current_data_version(user_id)
+            if daily:
+                version = f"{version}-{cache_day().strftime('%Y%m%d')}"
+
+            etag = f"{user_id}-{version}-{zlib.crc32(request.full_path.encode()):x}"
+            policy = cache_control(max_age, stale_while_revalidate)
+
+            if request.if_none_match.contains(etag):
+                response = make_response("", 304)
+            else:
+                response = make_response(fn(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            response.headers["Cache-Control"] = policy
+            response.vary.add("Authorization")
+            return response
+
+        return wrapper
+
+    return decorator
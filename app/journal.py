@@ -0,0 +1,202 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import bindparam, delete, func, insert, select, tuple_, update
+
+from . import db
+from .models import Bank, Asset, Saving, CreditCard, JournalEntry, JournalPosting, BalanceCheckpoint
+from .money import to_paise, from_paise
+
+# Counterparty of income, expenses, card spends and fees
+EXTERNAL_ACCOUNT = "external"
+
+JOURNAL_ACCOUNTS = {
+    "asset": Asset,
+    "bank": Bank,
+    "credit_card": CreditCard,
+    "saving": Saving,
+}
+
+# Postings between two checkpoints of one account
+CHECKPOINT_INTERVAL = 500
+
+
+def journal_entry(user_id, kind, postings, posted_at=None, description=None):
+    """
+    An entry for write_journal. postings is a list of
+    (account_type, account_id, signed rupee amount); whatever they do
+    not balance is posted to the external account.
+    """
+
+    return {
+        "user_id": user_id,
+        "kind": kind,
+        "description": description,
+        "posted_at": posted_at or datetime.now(timezone.utc),
+        "postings": postings
+    }
+
+
+def write_journal(entries):
+    """
+    Insert entries and their postings with two executemany statements,
+    then drop checkpoints that a backdated posting made stale.
+    Runs in the caller's transaction.
+    """
+
+    if not entries:
+        return
+
+    entry_table = JournalEntry.__table__
+    entry_ids = db.session.execute(
+        insert(entry_table).returning(entry_table.c.id, sort_by_parameter_order=True),
+        [
+            {key: entry[key] for key in ("user_id", "kind", "description", "posted_at")}
+            for entry in entries
+        ]
+    ).scalars().all()
+
+    rows = []
+    earliest = {}
+
+    for entry_id, entry in zip(entry_ids, entries):
+        postings = list(entry["postings"])
+
+        residual = sum(to_paise(amount) for _, _, amount in postings)
+        if residual:
+            postings.append((EXTERNAL_ACCOUNT, None, from_paise(-residual)))
+
+        for account_type, account_id, amount in postings:
+            rows.append({
+                "entry_id": entry_id,
+                "user_id": entry["user_id"],
+                "account_type": account_type,
+                "account_id": account_id,
+                "amount": amount,
+                "posted_at": entry["posted_at"]
+            })
+
+            if account_id is not None:
+                key = (account_type, account_id)
+                earliest[key] = min(earliest.get(key, entry["posted_at"]), entry["posted_at"])
+
+    db.session.execute(insert(JournalPosting.__table__), rows)
+
+    if not earliest:
+        return
+
+    checkpoints = BalanceCheckpoint.__table__
+    db.session.execute(
+        delete(checkpoints).where(
+            checkpoints.c.account_type == bindparam("stale_type"),
+            checkpoints.c.account_id == bindparam("stale_id"),
+            checkpoints.c.posted_at > bindparam("stale_after")
+        ),
+        [
+            {"stale_type": account_type, "stale_id": account_id, "stale_after": posted_at}
+            for (account_type, account_id), posted_at in earliest.items()
+        ]
+    )
+
+
+def delete_account_journal(account_type, account_id):
+    """
+    Before deleting an account: move its postings to the external
+    account, so every entry still balances and the other legs (e.g. the
+    bank side of a transfer) keep their account's total, and drop its
+    checkpoints. A new account that reuses the id starts with no history.
+    """
+
+    db.session.execute(
+        update(JournalPosting.__table__)
+        .where(
+            JournalPosting.account_type == account_type,
+            JournalPosting.account_id == account_id
+        )
+        .values(account_type=EXTERNAL_ACCOUNT, account_id=None)
+    )
+
+    db.session.execute(delete(BalanceCheckpoint.__table__).where(
+        BalanceCheckpoint.account_type == account_type,
+        BalanceCheckpoint.account_id == account_id
+    ))
+
+
+def delete_user_journal(user_id):
+    for model in (BalanceCheckpoint, JournalPosting, JournalEntry):
+        db.session.execute(delete(model.__table__).where(model.user_id == user_id))
+
+
+def balance_at(account_type, account_id, at):
+    """
+    Balance of an account as of `at`: the newest checkpoint at or before
+    `at` (one index seek) plus the postings after it, which are at most
+    CHECKPOINT_INTERVAL rows while checkpoints are kept up to date.
+    """
+
+    account = (
+        JournalPosting.account_type == account_type,
+        JournalPosting.account_id == account_id,
+        JournalPosting.posted_at <= at
+    )
+
+    checkpoint = (
+        db.session.query(BalanceCheckpoint.posted_at, BalanceCheckpoint.posting_id, BalanceCheckpoint.balance)
+        .filter(
+            BalanceCheckpoint.account_type == account_type,
+            BalanceCheckpoint.account_id == account_id,
+            BalanceCheckpoint.posted_at <= at
+        )
+        .order_by(BalanceCheckpoint.posted_at.desc(), BalanceCheckpoint.posting_id.desc())
+        .first()
+    )
+
+    tail = db.session.query(func.coalesce(func.sum(JournalPosting.amount), 0)).filter(*account)
+    if checkpoint:
+        tail = tail.filter(
+            tuple_(JournalPosting.posted_at, JournalPosting.id)
+            > tuple_(checkpoint.posted_at, checkpoint.posting_id)
+        )
+
+    opening = checkpoint.balance if checkpoint else 0
+    return from_paise(to_paise(opening) + to_paise(tail.scalar()))
+
+
+def rebuild_checkpoints(user_id=None, every=CHECKPOINT_INTERVAL):
+    """
+    Recompute checkpoints with one window-function INSERT ... SELECT:
+    the running SUM() of every account's postings, kept at every
+    `every`-th posting. Does not commit.
+    """
+
+    clear = delete(BalanceCheckpoint.__table__)
+    if user_id is not None:
+        clear = clear.where(BalanceCheckpoint.user_id == user_id)
+    db.session.execute(clear)
+
+    window = {
+        "partition_by": (JournalPosting.account_type, JournalPosting.account_id),
+        "order_by": (JournalPosting.posted_at, JournalPosting.id)
+    }
+
+    numbered = select(
+        JournalPosting.account_type,
+        JournalPosting.account_id,
+        JournalPosting.id.label("posting_id"),
+        JournalPosting.user_id,
+        JournalPosting.posted_at,
+        func.sum(JournalPosting.amount).over(**window).label("balance"),
+        func.row_number().over(**window).label("position")
+    ).where(JournalPosting.account_id.isnot(None))
+
+    if user_id is not None:
+        numbered = numbered.where(JournalPosting.user_id == user_id)
+
+    numbered = numbered.subquery()
+    columns = ["account_type", "account_id", "posting_id", "user_id", "posted_at", "balance"]
+
+    db.session.execute(
+        insert(BalanceCheckpoint.__table__).from_select(
+            columns,
+            select(*[numbered.c[name] for name in columns]).where(numbered.c.position % every == 0)
+        )
+    )
@@ -0,0 +1,285 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy import BigInteger, case, func, select, type_coerce
+
+from . import db
+from .models import (User, Bank, Asset, Saving, CreditCard, Transaction,
+                     CreditCardTransaction, JournalPosting)
+from .money import from_paise
+
+# Account type -> (model, ledger foreign key, balance-after column)
+LEDGER_CHAINS = {
+    "bank": (Bank, "bank_id", "bank_balance_after"),
+    "asset": (Asset, "asset_id", "asset_balance_after"),
+    "saving": (Saving, "saving_id", "saving_balance_after"),
+}
+
+# Every other transaction_type adds its amount to the account
+DEBIT_TYPES = ("expense", "withdraw", "withdrawal", "transfer_out")
+
+# Users per task handed to a worker process
+USERS_PER_TASK = 2000
+
+
+def _paise(column):
+    return type_coerce(column, BigInteger)
+
+
+def signed_amount(account_type, ledger):
+    """Paise a ledger row adds to the balance-after of its account_type account (used, for cards)."""
+
+    if account_type == "credit_card":
+        return -_paise(ledger.c.amount)
+
+    sign = case((ledger.c.transaction_type.in_(DEBIT_TYPES), -1), else_=1)
+    return sign * _paise(ledger.c.amount)
+
+
+def _divergence(check, account_type, row):
+    return {
+        "check": check,
+        "account_type": account_type,
+        "account_id": row.account_id,
+        "user_id": row.user_id,
+        "transaction_id": getattr(row, "transaction_id", None),
+        # int(): Postgres SUM(bigint) is numeric
+        "expected": from_paise(int(row.expected)),
+        "actual": None if row.actual is None else from_paise(int(row.actual))
+    }
+
+
+def _first_divergent_rows(chain):
+    """Keep the lowest-id row per account among rows whose expected != actual."""
+
+    divergent = select(
+        chain,
+        func.row_number().over(
+            partition_by=chain.c.account_id,
+            order_by=chain.c.transaction_id
+        ).label("position")
+    ).where(chain.c.expected != chain.c.actual).subquery()
+
+    return db.session.execute(
+        select(divergent).where(divergent.c.position == 1).order_by(divergent.c.account_id)
+    ).all()
+
+
+def _ledger_chain(account_type, users):
+    """
+    Each ledger row's balance-after must equal the previous row's (LAG)
+    plus its signed amount. An account's first row has no predecessor
+    and is only covered by the final balance check.
+    """
+
+    _, account_column, balance_after = LEDGER_CHAINS[account_type]
+    ledger = Transaction.__table__
+
+    previous = func.lag(_paise(ledger.c[balance_after])).over(
+        partition_by=ledger.c[account_column],
+        order_by=ledger.c.id
+    )
+
+    chain = select(
+        ledger.c.id.label("transaction_id"),
+        ledger.c.user_id,
+        ledger.c[account_column].label("account_id"),
+        (previous + signed_amount(account_type, ledger)).label("expected"),
+        _paise(ledger.c[balance_after]).label("actual")
+    ).where(
+        ledger.c[account_column].isnot(None),
+        ledger.c.user_id.between(*users)
+    ).subquery()
+
+    return [_divergence("chain", account_type, row) for row in _first_divergent_rows(chain)]
+
+
+def _ledger_balance(account_type, users):
+    """The account balance must equal its newest ledger row's balance-after."""
+
+    model, account_column, balance_after = LEDGER_CHAINS[account_type]
+    ledger = Transaction.__table__
+
+    newest = select(
+        ledger.c[account_column].label("account_id"),
+        func.max(ledger.c.id).label("transaction_id")
+    ).where(
+        ledger.c[account_column].isnot(None),
+        ledger.c.user_id.between(*users)
+    ).group_by(ledger.c[account_column]).subquery()
+
+    rows = db.session.execute(
+        select(
+            model.id.label("account_id"),
+            model.user_id,
+            newest.c.transaction_id,
+            _paise(ledger.c[balance_after]).label("expected"),
+            _paise(model.balance).label("actual")
+        )
+        .join(newest, newest.c.account_id == model.id)
+        .join(ledger, ledger.c.id == newest.c.transaction_id)
+        .where(
+            model.user_id.between(*users),
+            ledger.c[balance_after] != model.balance
+        )
+        .order_by(model.id)
+    ).all()
+
+    return [_divergence("balance", account_type, row) for row in rows]
+
+
+def _card_chain(users):
+    """Cards open at zero, so card_balance_after is minus the running SUM() of amounts."""
+
+    ledger = Transaction.__table__
+    running_used = -func.sum(_paise(ledger.c.amount)).over(
+        partition_by=ledger.c.credit_card_id,
+        order_by=ledger.c.id
+    )
+
+    chain = select(
+        ledger.c.id.label("transaction_id"),
+        ledger.c.user_id,
+        ledger.c.credit_card_id.label("account_id"),
+        running_used.label("expected"),
+        _paise(ledger.c.card_balance_after).label("actual")
+    ).where(
+        ledger.c.type == CreditCardTransaction.__mapper__.polymorphic_identity,
+        ledger.c.user_id.between(*users)
+    ).subquery()
+
+    return [_divergence("chain", "credit_card", row) for row in _first_divergent_rows(chain)]
+
+
+def _card_balances(users):
+    """used must equal minus the sum of all card transactions, and billed_unpaid + unbilled_spends."""
+
+    totals = (
+        select(
+            CreditCardTransaction.credit_card_id.label("account_id"),
+            func.sum(_paise(CreditCardTransaction.amount)).label("total")
+        )
+        .where(CreditCardTransaction.user_id.between(*users))
+        .group_by(CreditCardTransaction.credit_card_id)
+        .subquery()
+    )
+
+    used = _paise(CreditCard.used)
+    from_transactions = -func.coalesce(totals.c.total, 0)
+    outstanding = func.coalesce(_paise(CreditCard.billed_unpaid), 0) + func.coalesce(_paise(CreditCard.unbilled_spends), 0)
+
+    divergences = []
+    for check, expected in (("used", from_transactions), ("outstanding", outstanding)):
+        rows = db.session.execute(
+            select(
+                CreditCard.id.label("account_id"),
+                CreditCard.user_id,
+                expected.label("expected"),
+                used.label("actual")
+            )
+            .outerjoin(totals, totals.c.account_id == CreditCard.id)
+            .where(CreditCard.user_id.between(*users), expected != used)
+            .order_by(CreditCard.id)
+        ).all()
+        divergences.extend(_divergence(check, "credit_card", row) for row in rows)
+
+    return divergences
+
+
+def _journal_balances(users):
+    """Every account balance must equal the sum of its journal postings (-used for cards)."""
+
+    accounts = [
+        (account_type, model, _paise(model.balance))
+        for account_type, (model, _, _) in LEDGER_CHAINS.items()
+    ] + [("credit_card", CreditCard, -_paise(CreditCard.used))]
+
+    divergences = []
+    for account_type, model, balance in accounts:
+        totals = (
+            select(
+                JournalPosting.account_id,
+                func.sum(_paise(JournalPosting.amount)).label("total")
+            )
+            .where(
+                JournalPosting.account_type == account_type,
+                JournalPosting.user_id.between(*users)
+            )
+            .group_by(JournalPosting.account_id)
+            .subquery()
+        )
+        journal = func.coalesce(totals.c.total, 0)
+
+        rows = db.session.execute(
+            select(
+                model.id.label("account_id"),
+                model.user_id,
+                journal.label("expected"),
+                balance.label("actual")
+            )
+            .outerjoin(totals, totals.c.account_id == model.id)
+            .where(model.user_id.between(*users), journal != balance)
+            .order_by(model.id)
+        ).all()
+        divergences.extend(_divergence("journal", account_type, row) for row in rows)
+
+    return divergences
+
+
+def verify_users(users):
+    """
+    Run every check for user ids in the inclusive range `users`.
+    Each check is one set-based query per account type.
+    """
+
+    divergences = []
+    for account_type in LEDGER_CHAINS:
+        divergences += _ledger_chain(account_type, users)
+        divergences += _ledger_balance(account_type, users)
+    divergences += _card_chain(users)
+    divergences += _card_balances(users)
+    divergences += _journal_balances(users)
+
+    db.session.rollback()
+    return divergences
+
+
+def user_ranges(per_task=USERS_PER_TASK):
+    """Split the user ids into inclusive (first, last) ranges of per_task users."""
+
+    user_ids = db.session.execute(select(User.id).order_by(User.id)).scalars().all()
+    return [
+        (user_ids[start], user_ids[min(start + per_task, len(user_ids)) - 1])
+        for start in range(0, len(user_ids), per_task)
+    ]
+
+
+def _init_worker():
+    from . import create_app
+
+    # Pushed for the lifetime of the worker process
+    create_app().app_context().push()
+
+
+def verify_ledger(workers=1, per_task=USERS_PER_TASK):
+    """
+    Yields divergences for all users. With workers > 1 the user ranges
+    are checked in parallel by a pool of processes, each with its own
+    app and database connection.
+    """
+
+    ranges = user_ranges(per_task)
+
+    if workers <= 1 or len(ranges) <= 1:
+        for users in ranges:
+            yield from verify_users(users)
+        return
+
+    # spawn, so no worker inherits the parent's open database connections
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker
+    ) as pool:
+        for divergences in pool.map(verify_users, ranges):
+            yield from divergences
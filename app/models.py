@@ -1,8 +1,9 @@
 from . import db
 from datetime import datetime, timedelta, timezone
-from sqlalchemy import event, Column, Integer, String, Float, Date, DateTime, Boolean, ForeignKey, Text
+from sqlalchemy import DDL, event, Column, Integer, String, Date, DateTime, Boolean, ForeignKey, Text, Index, UniqueConstraint
 from sqlalchemy.orm import validates, declared_attr
 from werkzeug.security import generate_password_hash, check_password_hash
+from .money import Money
 
 class User(db.Model):
     id = Column(Integer, primary_key=True)
@@ -16,6 +17,7 @@ class User(db.Model):
     savings = db.relationship('Saving', backref='user', lazy=True, cascade="all, delete-orphan")
     transactions = db.relationship('Transaction', backref='user', lazy=True)
     password_hash = Column(String(128), nullable=False)
+    data_version = Column(Integer, nullable=False, default=0, server_default='0')  # Bumped on every commit touching the user's data (ETags)
 
     def set_password(self, password):
         # Using pbkdf2:sha256 with reduced salt length
@@ -36,20 +38,21 @@ class CreditCard(db.Model):
     name = Column(String(100), nullable=False, unique=True)  # Added unique=True
     user_id = Column(Integer, ForeignKey('user.id'), nullable=False)  # user id
     billing_cycle_start = Column(Integer, nullable=False, default=1)  # Day of month when billing cycle starts
-    limit = Column(Float, nullable=False)  # CC limit
+    limit = Column(Money, nullable=False)  # CC limit
     
     # Track spending
-    used = Column(Float, nullable=False, default=0)  # total spends (all transactions)
+    used = Column(Money, nullable=False, default=0)  # total spends (all transactions)
     # Remove the outstanding field since it's deprecated
     # outstanding = Column(Float, nullable=False, default=0)  # Remove this line
     
     # Track payment status
     last_payment_date = Column(DateTime)
-    last_payment_amount = Column(Float)
+    last_payment_amount = Column(Money)
     
     # New columns
-    billed_unpaid = Column(Float, default=0)    # From last bill (definitely payable)
-    unbilled_spends = Column(Float, default=0)  # Current cycle spends (payable only if billing date passed)
+    billed_unpaid = Column(Money, default=0)    # From last bill (definitely payable)
+    unbilled_spends = Column(Money, default=0)  # Current cycle spends (payable only if billing date passed)
+    last_billed_on = Column(Date)               # Start of the last cycle rolled into billed_unpaid
     
     @property
     def available_limit(self):
@@ -64,17 +67,40 @@ class CreditCard(db.Model):
     # - outstanding ≈ unbilled_spends (will be removed)
 
     transactions = db.relationship('CreditCardTransaction', backref='credit_card', lazy=True)
+    statements = db.relationship('CreditCardStatement', backref='credit_card', lazy=True, cascade="all, delete-orphan")
 
     def __repr__(self):
         return f'<CreditCard {self.name} for User {self.user_id}>'
 
+class CreditCardStatement(db.Model):
+    """Closed billing cycle of a credit card"""
+    __tablename__ = 'credit_card_statement'
+
+    id = Column(Integer, primary_key=True)
+    credit_card_id = Column(Integer, ForeignKey('credit_card.id'), nullable=False)
+    user_id = Column(Integer, ForeignKey('user.id'), nullable=False)
+    cycle_start = Column(Date, nullable=False)
+    cycle_end = Column(Date, nullable=False)
+    opening_balance = Column(Money, nullable=False, default=0)  # closing_due of the previous statement
+    spends = Column(Money, nullable=False, default=0)
+    payments = Column(Money, nullable=False, default=0)
+    closing_due = Column(Money, nullable=False, default=0)      # opening_balance + spends - payments
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('credit_card_id', 'cycle_end', name='uq_credit_card_statement_card_cycle_end'),
+    )
+
+    def __repr__(self):
+        return f'<CreditCardStatement {self.cycle_start}..{self.cycle_end} for CreditCard {self.credit_card_id}>'
+
 class Asset(db.Model):
     id = Column(Integer, primary_key=True)
     name = Column(String(100), nullable=False, unique=True)  # Added unique=True
     user_id = Column(Integer, ForeignKey('user.id'), nullable=False)
     platform = Column(String(100), nullable=True)  # New column
     category = Column(String(50), nullable=True)    # New column
-    balance = Column(Float, nullable=False, default=0)
+    balance = Column(Money, nullable=False, default=0)
     transactions = db.relationship('AssetTransaction', backref='asset', lazy=True)
 
     def __repr__(self):
@@ -84,7 +110,7 @@ class Bank(db.Model):
     id = Column(Integer, primary_key=True)
     name = Column(String(100), nullable=False, unique=True)  # Added unique=True
     user_id = Column(Integer, ForeignKey('user.id'), nullable=False)
-    balance = Column(Float, nullable=False, default=0)
+    balance = Column(Money, nullable=False, default=0)
     transactions = db.relationship('BankTransaction', backref='bank', lazy=True)
     savings_accounts = db.relationship('Saving', backref='bank', lazy=True)
 
@@ -107,7 +133,7 @@ class Saving(db.Model):
     name = Column(String(100), nullable=False, unique=True)  # Added unique=True
     bank_id = Column(Integer, ForeignKey('bank.id'), nullable=True)
     user_id = Column(Integer, ForeignKey('user.id'), nullable=False)
-    balance = Column(Float, nullable=False, default=0)
+    balance = Column(Money, nullable=False, default=0)
     transactions = db.relationship('SavingTransaction', backref='saving', lazy=True)
 
     def __repr__(self):
@@ -115,16 +141,27 @@ class Saving(db.Model):
 
 # ========== TRANSACTION MODELS ==========
 
+class Category(db.Model):
+    """Canonical spending category shared by all users: lower(trim(text)) or 'uncategorized'"""
+    __tablename__ = 'category'
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50), nullable=False, unique=True)
+
+    def __repr__(self):
+        return f'<Category {self.name}>'
+
 class Transaction(db.Model):
     """Base transaction model"""
     __tablename__ = 'transaction'
     
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('user.id'), nullable=False)
-    amount = Column(Float, nullable=False)
+    amount = Column(Money, nullable=False)
     date = Column(DateTime, default=datetime.utcnow, nullable=False)
     description = Column(String(200))
-    category = Column(String(50))
+    category = Column(String(50))                             # as entered, for display
+    category_id = Column(Integer, ForeignKey('category.id'))  # canonical, set on write; used for grouping
     transaction_type = Column(String(20))
     
     # Polymorphic discriminator
@@ -140,7 +177,7 @@ class Transaction(db.Model):
 
 class BankTransaction(Transaction):
     bank_id = Column(Integer, ForeignKey('bank.id'))
-    bank_balance_after = Column(Float)  # Renamed to avoid conflict
+    bank_balance_after = Column(Money)  # Renamed to avoid conflict
     
     __mapper_args__ = {
         'polymorphic_identity': 'bank_transaction'
@@ -148,7 +185,7 @@ class BankTransaction(Transaction):
 
 class CreditCardTransaction(Transaction):
     credit_card_id = Column(Integer, ForeignKey('credit_card.id'))
-    card_balance_after = Column(Float)  # Renamed to avoid conflict
+    card_balance_after = Column(Money)  # Renamed to avoid conflict
     is_payment = Column(Boolean, default=False)
     is_billed = Column(Boolean, default=False)  # Add this line
     
@@ -158,7 +195,7 @@ class CreditCardTransaction(Transaction):
 
 class AssetTransaction(Transaction):
     asset_id = Column(Integer, ForeignKey('asset.id'))
-    asset_balance_after = Column(Float)  # Renamed to avoid conflict
+    asset_balance_after = Column(Money)  # Renamed to avoid conflict
     
     __mapper_args__ = {
         'polymorphic_identity': 'asset_transaction'
@@ -166,12 +203,99 @@ class AssetTransaction(Transaction):
 
 class SavingTransaction(Transaction):
     saving_id = Column(Integer, ForeignKey('saving.id'))
-    saving_balance_after = Column(Float)  # Renamed to avoid conflict
+    saving_balance_after = Column(Money)  # Renamed to avoid conflict
     
     __mapper_args__ = {
         'polymorphic_identity': 'saving_transaction'
     }
 
+# ========== TRANSACTION INDEXES ==========
+# Dashboard spending filters by user, transaction_type and date range.
+Index(
+    'ix_transaction_user_type_date',
+    Transaction.user_id,
+    Transaction.transaction_type,
+    Transaction.date
+)
+
+# Per-category filters and aggregates over a user's transactions.
+Index(
+    'ix_transaction_user_category',
+    Transaction.user_id,
+    Transaction.category_id
+)
+
+# Cross-account feed: a user's transactions newest first, keyset on (date, id).
+Index(
+    'ix_transaction_user_date_id',
+    Transaction.user_id,
+    Transaction.date,
+    Transaction.id
+)
+
+# Per-account history lookups; partial so each subtype only indexes its own rows.
+Index(
+    'ix_transaction_bank_date',
+    BankTransaction.bank_id,
+    Transaction.date.desc(),
+    postgresql_where=Transaction.type == 'bank_transaction',
+    sqlite_where=Transaction.type == 'bank_transaction'
+)
+
+Index(
+    'ix_transaction_credit_card_date',
+    CreditCardTransaction.credit_card_id,
+    Transaction.date.desc(),
+    postgresql_where=Transaction.type == 'credit_card_transaction',
+    sqlite_where=Transaction.type == 'credit_card_transaction'
+)
+
+Index(
+    'ix_transaction_asset_date',
+    AssetTransaction.asset_id,
+    Transaction.date.desc(),
+    postgresql_where=Transaction.type == 'asset_transaction',
+    sqlite_where=Transaction.type == 'asset_transaction'
+)
+
+Index(
+    'ix_transaction_saving_date',
+    SavingTransaction.saving_id,
+    Transaction.date.desc(),
+    postgresql_where=Transaction.type == 'saving_transaction',
+    sqlite_where=Transaction.type == 'saving_transaction'
+)
+
+# Description search (app/search.py). Postgres indexes expressions, so the
+# table has no extra column; SQLite keeps an FTS5 table in sync by trigger.
+# The same statements are applied by the add_transaction_search migration.
+TRANSACTION_SEARCH_DDL = {
+    'postgresql': [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        "CREATE INDEX ix_transaction_description_fts ON \"transaction\" "
+        "USING gin (to_tsvector('simple', coalesce(description, '')))",
+        "CREATE INDEX ix_transaction_description_trgm ON \"transaction\" "
+        "USING gin (description gin_trgm_ops)",
+    ],
+    'sqlite': [
+        "CREATE VIRTUAL TABLE transaction_fts USING fts5("
+        "description, content='transaction', content_rowid='id')",
+        "CREATE TRIGGER transaction_fts_ai AFTER INSERT ON \"transaction\" BEGIN "
+        "INSERT INTO transaction_fts(rowid, description) VALUES (new.id, new.description); END",
+        "CREATE TRIGGER transaction_fts_ad AFTER DELETE ON \"transaction\" BEGIN "
+        "INSERT INTO transaction_fts(transaction_fts, rowid, description) "
+        "VALUES ('delete', old.id, old.description); END",
+        "CREATE TRIGGER transaction_fts_au AFTER UPDATE OF description ON \"transaction\" BEGIN "
+        "INSERT INTO transaction_fts(transaction_fts, rowid, description) "
+        "VALUES ('delete', old.id, old.description); "
+        "INSERT INTO transaction_fts(rowid, description) VALUES (new.id, new.description); END",
+    ],
+}
+
+for dialect, statements in TRANSACTION_SEARCH_DDL.items():
+    for statement in statements:
+        event.listen(Transaction.__table__, 'after_create', DDL(statement).execute_if(dialect=dialect))
+
 class TransferTransaction(db.Model):
     """Special transaction to track transfers between accounts"""
     __tablename__ = 'transfer_transaction'
@@ -182,10 +306,97 @@ class TransferTransaction(db.Model):
     from_account_id = Column(Integer)
     to_account_type = Column(String(20))
     to_account_id = Column(Integer)
-    amount = Column(Float, nullable=False)
+    amount = Column(Money, nullable=False)
     date = Column(DateTime, default=datetime.utcnow, nullable=False)
     description = Column(String(200))
-    fee = Column(Float, default=0)
+    fee = Column(Money, default=0)
+
+    def __repr__(self):
+        return f'<Transfer {self.amount} from {self.from_account_type}:{self.from_account_id} to {self.to_account_type}:{self.from_account_id}>'
+
+# ========== JOURNAL MODELS ==========
+
+class JournalEntry(db.Model):
+    """One balance-moving operation; its postings always sum to zero"""
+    __tablename__ = 'journal_entry'
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey('user.id'), nullable=False)
+    kind = Column(String(30), nullable=False)          # 'opening', 'bank_transaction', 'transfer', ...
+    description = Column(String(200))
+    posted_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    postings = db.relationship('JournalPosting', backref='entry', lazy=True)
+
+    def __repr__(self):
+        return f'<JournalEntry {self.id} {self.kind} for User {self.user_id}>'
+
+class JournalPosting(db.Model):
+    """Signed movement on one account; account_id is NULL for the external world"""
+    __tablename__ = 'journal_posting'
+
+    id = Column(Integer, primary_key=True)
+    entry_id = Column(Integer, ForeignKey('journal_entry.id'), nullable=False)
+    user_id = Column(Integer, ForeignKey('user.id'), nullable=False)
+    account_type = Column(String(20), nullable=False)  # 'bank', 'asset', 'saving', 'credit_card', 'external'
+    account_id = Column(Integer)
+    amount = Column(Money, nullable=False)             # credit cards carry -used
+    posted_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index('ix_journal_posting_account', 'account_type', 'account_id', 'posted_at', 'id'),
+        Index('ix_journal_posting_entry_id', 'entry_id'),
+    )
+
+    def __repr__(self):
+        return f'<JournalPosting {self.amount} on {self.account_type}:{self.account_id}>'
+
+class BalanceCheckpoint(db.Model):
+    """Running balance of an account through one posting, written periodically"""
+    __tablename__ = 'balance_checkpoint'
+
+    account_type = Column(String(20), primary_key=True)
+    account_id = Column(Integer, primary_key=True)
+    posting_id = Column(Integer, primary_key=True)     # last posting included, in (posted_at, id) order
+    user_id = Column(Integer, ForeignKey('user.id'), nullable=False)
+    posted_at = Column(DateTime, nullable=False)
+    balance = Column(Money, nullable=False)
+
+    __table_args__ = (
+        Index('ix_balance_checkpoint_account_posted_at', 'account_type', 'account_id', 'posted_at'),
+    )
+
+    def __repr__(self):
+        return f'<BalanceCheckpoint {self.account_type}:{self.account_id} at {self.posted_at}>'
+
+# ========== ANALYTICS MODELS ==========
+
+class SpendingRollup(db.Model):
+    """Per-day totals of bank and credit card transactions, maintained on write"""
+    __tablename__ = 'spending_rollup'
+
+    user_id = Column(Integer, ForeignKey('user.id'), primary_key=True)
+    day = Column(Date, primary_key=True)                        # IST calendar day
+    category_id = Column(Integer, ForeignKey('category.id'), primary_key=True)
+    account_type = Column(String(20), primary_key=True)         # 'bank' or 'credit_card'
+    transaction_type = Column(String(20), primary_key=True)     # 'income', 'expense', 'payment'
+    total = Column(Money, nullable=False, default=0)            # sum of abs(amount)
+    txn_count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<SpendingRollup {self.day} category {self.category_id} for User {self.user_id}>'
+
+class NetWorthSnapshot(db.Model):
+    """End-of-day (IST) account totals per user, written by a daily job"""
+    __tablename__ = 'net_worth_snapshot'
+
+    user_id = Column(Integer, ForeignKey('user.id'), primary_key=True)
+    day = Column(Date, primary_key=True)                        # IST calendar day
+    assets = Column(Money, nullable=False, default=0)
+    bank = Column(Money, nullable=False, default=0)
+    savings = Column(Money, nullable=False, default=0)
+    card_debt = Column(Money, nullable=False, default=0)        # sum of credit card used
 
     def __repr__(self):
-        return f'<Transfer {self.amount} from {self.from_account_type}:{self.from_account_id} to {self.to_account_type}:{self.from_account_id}>'
\ No newline at end of file
+        return f'<NetWorthSnapshot {self.day} for User {self.user_id}>'
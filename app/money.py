@@ -0,0 +1,61 @@
+from sqlalchemy import BigInteger
+from sqlalchemy.types import TypeDecorator
+
+
+def to_paise(value):
+    """
+    Rupees (float, int or numeric string) to integer paise, rounding
+    half away from zero like the old Decimal quantize did.
+    """
+
+    if value is None:
+        return 0
+
+    if isinstance(value, int):
+        return value * 100
+
+    # The nudge absorbs binary noise, e.g. 1.005 * 100 == 100.49999999999999
+    paise = float(value) * 100
+
+    if paise >= 0:
+        return int(paise + 0.5000001)
+
+    return int(paise - 0.5000001)
+
+
+def from_paise(paise):
+    return paise / 100
+
+
+def money(value):
+    """Round a rupee amount to whole paise using integer arithmetic only."""
+
+    return to_paise(value) / 100
+
+
+class Money(TypeDecorator):
+    """
+    Rupee amount stored as BIGINT paise.
+
+    Python code keeps reading and writing rupees; the database only ever
+    sees exact integers, so SUM()s and balance arithmetic in SQL are exact.
+    Use type_coerce(column, BigInteger) to read raw paise on hot paths.
+    """
+
+    impl = BigInteger
+    cache_ok = True
+
+    @property
+    def python_type(self):
+        return float
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return to_paise(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        # int() because Postgres SUM(bigint) comes back as an integral Decimal
+        return int(value) / 100
@@ -0,0 +1,272 @@
+from sqlalchemy import insert, literal, select, update
+
+from . import db
+from .cache import result_cache
+from .dashboard_service import category_id, record_spending_batch
+from .journal import journal_entry, write_journal
+from .http_cache import bump_data_versions
+from .models import (User, Bank, Asset, Saving, Transaction, TransferTransaction,
+                     BankTransaction, AssetTransaction, SavingTransaction)
+
+# Account model -> (ledger subtype, account foreign key, balance-after column)
+POSTING_LEDGERS = {
+    Bank: (BankTransaction, "bank_id", "bank_balance_after"),
+    Asset: (AssetTransaction, "asset_id", "asset_balance_after"),
+    Saving: (SavingTransaction, "saving_id", "saving_balance_after"),
+}
+
+
+def balance_update(model, account_id, user_id, delta):
+    """
+    UPDATE ... SET balance = balance + :delta ... RETURNING balance.
+    Debits only match while the balance stays non-negative.
+    """
+
+    table = model.__table__
+
+    statement = (
+        update(table)
+        .where(
+            table.c.id == account_id,
+            table.c.user_id == user_id
+        )
+        .values(balance=table.c.balance + delta)
+    )
+
+    if delta < 0:
+        statement = statement.where(table.c.balance + delta >= 0)
+
+    return statement.returning(table.c.id, table.c.user_id, table.c.balance)
+
+
+def _ledger_values(model, transaction):
+    ledger_model, account_column, _ = POSTING_LEDGERS[model]
+    return {
+        **transaction,
+        "type": ledger_model.__mapper__.polymorphic_identity
+    }, account_column
+
+
+def _post_in_one_statement(model, posted, transaction):
+    """
+    Postgres: the balance update, the owner's data_version bump and the
+    ledger insert run as data-modifying CTEs of a single statement.
+    """
+
+    users = User.__table__
+    ledger = Transaction.__table__
+
+    posted = posted.cte("posted")
+    bumped = (
+        update(users)
+        .where(users.c.id.in_(select(posted.c.user_id)))
+        .values(data_version=users.c.data_version + 1)
+        .cte("bumped")
+    )
+
+    if transaction is None:
+        statement = select(posted.c.balance, literal(None).label("id")).add_cte(bumped)
+        return db.session.execute(statement).first()
+
+    values, account_column = _ledger_values(model, transaction)
+    balance_after = POSTING_LEDGERS[model][2]
+
+    source = select(
+        *[literal(value, ledger.c[name].type) for name, value in values.items()],
+        posted.c.id,
+        posted.c.balance
+    )
+
+    statement = (
+        insert(ledger)
+        .from_select([*values, account_column, balance_after], source)
+        .returning(ledger.c[balance_after].label("balance"), ledger.c.id)
+        .add_cte(bumped)
+    )
+
+    return db.session.execute(statement).first()
+
+
+def _post_in_steps(model, posted, transaction):
+    """Other dialects (SQLite): the same writes as separate statements."""
+
+    row = db.session.execute(posted).first()
+    if row is None:
+        return None
+
+    bump_data_versions(db.session.connection(), {row.user_id})
+
+    if transaction is None:
+        return row.balance, None
+
+    values, account_column = _ledger_values(model, transaction)
+    balance_after = POSTING_LEDGERS[model][2]
+    ledger = Transaction.__table__
+
+    transaction_id = db.session.execute(
+        insert(ledger)
+        .values(**values, **{account_column: row.id, balance_after: row.balance})
+        .returning(ledger.c.id)
+    ).scalar()
+
+    return row.balance, transaction_id
+
+
+def post_to_account(model, account_id, user_id, delta, transaction=None):
+    """
+    Atomically add delta (rupees; negative debits) to a bank, asset or
+    saving balance and insert its ledger row from `transaction` (a dict
+    of Transaction columns such as amount, transaction_type, date).
+
+    Nothing is read first, so concurrent postings to one account cannot
+    lose updates and a debit can never overdraw it.
+
+    Returns (balance_after, transaction_id), or (None, None) when the
+    account does not exist or lacks funds. Does not commit.
+    """
+
+    posted = balance_update(model, account_id, user_id, delta)
+
+    if db.session.get_bind().dialect.name == "postgresql":
+        row = _post_in_one_statement(model, posted, transaction)
+    else:
+        row = _post_in_steps(model, posted, transaction)
+
+    if row is None:
+        return None, None
+
+    result_cache.invalidate_on_commit(db.session, [user_id])
+    return row[0], row[1]
+
+
+def account_exists(model, account_id, user_id):
+    """Tells a missing account apart from insufficient funds after a failed posting."""
+
+    return db.session.query(
+        model.query.filter_by(id=account_id, user_id=user_id).exists()
+    ).scalar()
+
+
+# ========== TRANSFERS ==========
+
+TRANSFER_ACCOUNTS = {
+    "asset": Asset,
+    "bank": Bank,
+    "saving": Saving,
+}
+
+
+def lock_accounts(user_id, accounts):
+    """
+    SELECT ... FOR UPDATE every (type, id) in canonical sorted order, so
+    two transactions touching the same accounts always queue on the same
+    first row instead of deadlocking. Returns the set of accounts found.
+    """
+
+    found = set()
+    by_type = {}
+    for account_type, account_id in sorted(accounts):
+        by_type.setdefault(account_type, []).append(account_id)
+
+    row_locks = db.session.get_bind().dialect.name == "postgresql"
+
+    for account_type, account_ids in by_type.items():
+        table = TRANSFER_ACCOUNTS[account_type].__table__
+        accounts_of_user = (table.c.id.in_(account_ids), table.c.user_id == user_id)
+
+        if row_locks:
+            statement = select(table.c.id).where(*accounts_of_user).order_by(table.c.id).with_for_update()
+        else:
+            # SQLite has no FOR UPDATE, and a plain read would later have to
+            # upgrade to a write lock, which fails with "database is locked"
+            # under contention. A no-op UPDATE takes the write lock up front.
+            statement = update(table).where(*accounts_of_user).values(balance=table.c.balance).returning(table.c.id)
+
+        found.update((account_type, account_id) for account_id in db.session.execute(statement).scalars())
+
+    return found
+
+
+def apply_transfers(user_id, transfers):
+    """
+    Apply a list of transfers (validated dicts with from/to type and id,
+    amount, fee, description, date) in order, inside the caller's
+    transaction. Each one debits amount + fee, credits amount, writes a
+    ledger row on both accounts, a TransferTransaction and a journal entry.
+
+    Returns (results, error); error is (index, message) and the caller
+    must roll back. Does not commit.
+    """
+
+    accounts = set()
+    for transfer in transfers:
+        accounts.add((transfer["from_account_type"], transfer["from_account_id"]))
+        accounts.add((transfer["to_account_type"], transfer["to_account_id"]))
+
+    found = lock_accounts(user_id, accounts)
+    transfer_category_id = category_id("Transfer")
+    results = []
+    entries = []
+
+    for index, transfer in enumerate(transfers):
+        source = (transfer["from_account_type"], transfer["from_account_id"])
+        target = (transfer["to_account_type"], transfer["to_account_id"])
+
+        if source not in found or target not in found:
+            return None, (index, "Invalid account(s)")
+
+        amount, fee = transfer["amount"], transfer["fee"]
+        description = transfer.get("description") or f"Transfer {source[0]}:{source[1]} -> {target[0]}:{target[1]}"
+
+        legs = (
+            (source, -(amount + fee), "transfer_out", amount + fee),
+            (target, amount, "transfer_in", amount),
+        )
+        balances = {}
+
+        for (account_type, account_id), delta, transaction_type, leg_amount in legs:
+            ledger_row = {
+                "user_id": user_id,
+                "amount": leg_amount,
+                "description": description,
+                "category": "Transfer",
+                "category_id": transfer_category_id,
+                "transaction_type": transaction_type,
+                "date": transfer["date"]
+            }
+
+            balance, _ = post_to_account(
+                TRANSFER_ACCOUNTS[account_type], account_id, user_id, delta, ledger_row
+            )
+            if balance is None:
+                return None, (index, "Insufficient balance")
+
+            if account_type == "bank":
+                record_spending_batch(user_id, "bank", [ledger_row])
+            balances[transaction_type] = balance
+
+        db.session.add(TransferTransaction(
+            user_id=user_id,
+            from_account_type=source[0],
+            from_account_id=source[1],
+            to_account_type=target[0],
+            to_account_id=target[1],
+            amount=amount,
+            fee=fee,
+            description=transfer.get("description"),
+            date=transfer["date"]
+        ))
+
+        # The fee is what the two postings leave for the external account
+        entries.append(journal_entry(
+            user_id, "transfer", [(*source, -(amount + fee)), (*target, amount)],
+            transfer["date"], description
+        ))
+
+        results.append({
+            "from_balance": balances["transfer_out"],
+            "to_balance": balances["transfer_in"]
+        })
+
+    write_journal(entries)
+    return results, None
@@ -1,29 +1,32 @@
 from flask import Blueprint, request, jsonify
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, time, timedelta, timezone
 from dateutil.relativedelta import relativedelta
-from sqlalchemy import func
+from sqlalchemy import BigInteger, delete, exists, func, inspect, literal, select, tuple_, type_coerce
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import with_polymorphic
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from werkzeug.security import check_password_hash
-from decimal import Decimal, ROUND_HALF_UP
+import base64
+import binascii
+import calendar
 from . import db
-from .models import (User, CreditCard, Bank, Asset, Saving,
-                    Transaction, BankTransaction, CreditCardTransaction,
-                    AssetTransaction, SavingTransaction, TransferTransaction)
+from .models import (User, CreditCard, CreditCardStatement, Bank, Asset, Saving,
+                    Category, Transaction, BankTransaction, CreditCardTransaction,
+                    AssetTransaction, SavingTransaction, TransferTransaction,
+                    SpendingRollup, NetWorthSnapshot)
+from .dashboard_service import (record_spending, record_spending_batch, rebuild_spending_rollup,
+                                category_id, normalize_category)
+from .money import money, to_paise, from_paise
+from .posting import TRANSFER_ACCOUNTS, account_exists, apply_transfers, lock_accounts, post_to_account
+from .journal import (JOURNAL_ACCOUNTS, journal_entry, write_journal, balance_at,
+                      delete_account_journal, delete_user_journal)
+from .search import MAX_SEARCH_RESULTS, search_terms, search_transactions
+from .cache import result_cache
+from .http_cache import etag_cached
+from .sql_instrumentation import UNLIMITED, query_budget
 import pytz
 IST = pytz.timezone('Asia/Kolkata')
 
-def money(value):
-    if value is None:
-        return 0.0
-
-    return float(
-        Decimal(str(value)).quantize(
-            Decimal("0.01"),
-            rounding=ROUND_HALF_UP
-        )
-    )
-
 VALID_ASSET_CATEGORIES = {
     "Provident Fund",
     "Mutual Funds",
@@ -39,6 +42,64 @@ routes = Blueprint('routes', __name__)
 def parse_date(date_str):
     return datetime.strptime(date_str, "%Y-%m-%d").date()
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+def encode_cursor(transaction):
+    """Opaque keyset cursor pointing at (date, id) of the last row served"""
+    raw = f"{transaction.date.isoformat()}|{transaction.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor):
+    raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+    date_part, id_part = raw.split('|')
+    return datetime.fromisoformat(date_part), int(id_part)
+
+def paginate_transactions(query, model, serialize):
+    """
+    Keyset pagination on (date, id), newest first.
+    Pass ?all=true to get the legacy unpaginated list.
+    """
+    mapper = inspect(model).mapper
+    if mapper.inherits is not None:
+        # The ORM filters the subtype with a bound `type IN (?)`, which SQLite
+        # cannot match against the partial ix_transaction_*_date predicates;
+        # restate it as an inline literal so the index is used
+        query = query.filter(model.type == literal(mapper.polymorphic_identity, literal_execute=True))
+
+    if request.args.get('all', '').lower() == 'true':
+        return jsonify([serialize(t) for t in query.all()])
+
+    try:
+        limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        return jsonify({"error": f"limit must be between 1 and {MAX_PAGE_SIZE}"}), 400
+
+    query = query.order_by(None).order_by(model.date.desc(), model.id.desc())
+
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            cursor_date, cursor_id = decode_cursor(cursor)
+        except (ValueError, UnicodeDecodeError, binascii.Error):
+            return jsonify({"error": "Invalid cursor"}), 400
+
+        query = query.filter(
+            tuple_(model.date, model.id) < tuple_(cursor_date, cursor_id)
+        )
+
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    return jsonify({
+        "transactions": [serialize(t) for t in rows],
+        "next_cursor": encode_cursor(rows[-1]) if has_more else None
+    })
+
 # Home route
 @routes.route('/')
 def home():
@@ -140,6 +201,7 @@ def create_user():
 
 @routes.route('/users', methods=['GET'])
 @jwt_required()
+@etag_cached()
 def get_users():
     
     user_id = int(get_jwt_identity())
@@ -157,6 +219,7 @@ def get_users():
 
 @routes.route('/me', methods=['GET'])
 @jwt_required()
+@etag_cached()
 def get_current_user():
     user_id = int(get_jwt_identity())
     user = User.query.get(user_id)
@@ -222,6 +285,37 @@ def update_user(id):
         return jsonify({"error": f"Server error: {str(e)}"}), 500
 
 
+def balance_flags(user_id):
+    """Which kinds of account still hold a balance, in one query of EXISTS subqueries."""
+
+    row = db.session.execute(select(
+        exists().where(Bank.user_id == user_id, Bank.balance != 0).label('has_bank_balances'),
+        exists().where(Asset.user_id == user_id, Asset.balance != 0).label('has_asset_balances'),
+        exists().where(Saving.user_id == user_id, Saving.balance != 0).label('has_saving_balances'),
+        exists().where(CreditCard.user_id == user_id, CreditCard.used != 0).label('has_credit_balances')
+    )).one()
+    return {key: bool(value) for key, value in row._mapping.items()}
+
+
+# Children before parents; the journal goes first through delete_user_journal
+USER_OWNED_MODELS = (SpendingRollup, NetWorthSnapshot, CreditCardStatement, TransferTransaction,
+                     Transaction, Saving, Bank, Asset, CreditCard)
+
+
+def delete_user_rows(user_id):
+    """
+    One DELETE per table instead of the ORM cascade, which loaded every
+    account's transactions one relationship at a time (and tried to
+    null out transaction.user_id rather than delete the rows).
+    """
+
+    delete_user_journal(user_id)
+    for model in USER_OWNED_MODELS:
+        db.session.execute(delete(model.__table__).where(model.__table__.c.user_id == user_id))
+    db.session.execute(delete(User.__table__).where(User.__table__.c.id == user_id))
+    result_cache.invalidate_on_commit(db.session, [user_id])
+
+
 @routes.route('/users/<int:id>', methods=['DELETE'])
 @jwt_required()
 def delete_user(id):
@@ -229,28 +323,19 @@ def delete_user(id):
     if id != user_id:
         return jsonify({'error': 'Unauthorized'}), 403
         
-    user = User.query.get(id)
-    if not user:
+    if not db.session.get(User, id):
         return jsonify({'message': 'User not found'}), 404
     
     # Check balances before deletion
-    has_bank_balances = any(bank.balance != 0 for bank in user.banks)
-    has_asset_balances = any(asset.balance != 0 for asset in user.assets)
-    has_saving_balances = any(saving.balance != 0 for saving in user.savings)
-    has_credit_balances = any(card.used != 0 for card in user.credit_cards)
+    details = balance_flags(id)
     
-    if has_bank_balances or has_asset_balances or has_saving_balances or has_credit_balances:
+    if any(details.values()):
         return jsonify({
             'error': 'Cannot delete user with existing balances',
-            'details': {
-                'has_bank_balances': has_bank_balances,
-                'has_asset_balances': has_asset_balances,
-                'has_saving_balances': has_saving_balances,
-                'has_credit_balances': has_credit_balances
-            }
+            'details': details
         }), 400
     
-    db.session.delete(user)
+    delete_user_rows(id)
     db.session.commit()
     return jsonify({'message': 'User deleted successfully'}), 200
 
@@ -262,15 +347,15 @@ def can_delete_user(id):
     if id != user_id:
         return jsonify({'error': 'Unauthorized'}), 403
         
-    user = User.query.get(id)
-    if not user:
+    if not db.session.get(User, id):
         return jsonify({"error": "User not found"}), 404
     
     # Check all associated balances
-    has_bank_balances = any(bank.balance != 0 for bank in user.banks)
-    has_asset_balances = any(asset.balance != 0 for asset in user.assets)
-    has_saving_balances = any(saving.balance != 0 for saving in user.savings)
-    has_credit_balances = any(card.used != 0 for card in user.credit_cards)
+    details = balance_flags(id)
+    has_bank_balances = details['has_bank_balances']
+    has_asset_balances = details['has_asset_balances']
+    has_saving_balances = details['has_saving_balances']
+    has_credit_balances = details['has_credit_balances']
     
     can_delete = not (has_bank_balances or has_asset_balances or 
                      has_saving_balances or has_credit_balances)
@@ -342,7 +427,10 @@ def create_credit_card():
             billing_cycle_start=billing_cycle_start,
             used=0,
             billed_unpaid=0,
-            unbilled_spends=0
+            unbilled_spends=0,
+            last_billed_on=get_billing_cycle_range(
+                datetime.now(timezone.utc).date(), billing_cycle_start
+            )[0]
         )
         
         db.session.add(card)
@@ -377,6 +465,7 @@ def create_credit_card():
 
 @routes.route('/credit_cards', methods=['GET'])
 @jwt_required()
+@etag_cached()
 def get_credit_cards():
     user_id = int(get_jwt_identity())
     cards = CreditCard.query.filter_by(user_id=user_id).all()
@@ -397,6 +486,7 @@ def get_credit_cards():
 
 @routes.route('/credit_cards/<int:card_id>', methods=['GET'])
 @jwt_required()
+@etag_cached()
 def get_credit_card(card_id):
     user_id = int(get_jwt_identity())
     card = CreditCard.query.filter_by(id=card_id, user_id=user_id).first()
@@ -496,6 +586,12 @@ def update_credit_card(card_id):
         if billing_cycle_changed:
             current_cycle_start = calculate_current_cycle_start(card.billing_cycle_start)
 
+            # Statements overlapping the new cycle get re-closed on the next billing run
+            CreditCardStatement.query.filter(
+                CreditCardStatement.credit_card_id == card.id,
+                CreditCardStatement.cycle_end >= current_cycle_start.date()
+            ).delete(synchronize_session=False)
+
             card.unbilled_spends = db.session.query(
                 func.sum(func.abs(CreditCardTransaction.amount))
             ).filter(
@@ -513,6 +609,7 @@ def update_credit_card(card_id):
             ).scalar() or 0
 
             card.unbilled_spends = money(max(0,card.unbilled_spends - payments_applied))
+            card.last_billed_on = current_cycle_start.date()
 
         db.session.commit()
         return jsonify({
@@ -594,8 +691,11 @@ def delete_credit_card(card_id):
         if card.available_limit != card.limit:
             return jsonify({"error": "Cannot delete credit card with used credit"}), 400
             
-        # Delete all associated transactions first
+        # Delete all associated transactions and statements first
         CreditCardTransaction.query.filter_by(credit_card_id=card_id).delete()
+        CreditCardStatement.query.filter_by(credit_card_id=card_id).delete()
+        delete_account_journal('credit_card', card_id)
+        rebuild_spending_rollup(user_id)
         
         # Now delete the card
         db.session.delete(card)
@@ -615,9 +715,9 @@ def get_credit_card_transactions(card_id):
     if not card:
         return jsonify({"error": "Credit card not found"}), 404
         
-    transactions = CreditCardTransaction.query.filter_by(credit_card_id=card_id).order_by(CreditCardTransaction.date.desc()).all()
-    
-    return jsonify([{
+    query = CreditCardTransaction.query.filter_by(credit_card_id=card_id).order_by(CreditCardTransaction.date.desc())
+
+    return paginate_transactions(query, CreditCardTransaction, lambda t: {
         "id": t.id,
         "amount": t.amount,
         "date": t.date.astimezone(IST).strftime('%d-%m-%Y %H:%M:%S'),
@@ -626,7 +726,7 @@ def get_credit_card_transactions(card_id):
         "type": t.transaction_type,
         "is_payment": t.is_payment,
         "is_billed": t.is_billed
-    } for t in transactions])
+    })
 
 @routes.route('/credit_cards/<int:card_id>/transactions', methods=['POST'])
 @jwt_required()
@@ -696,23 +796,17 @@ def add_credit_card_transaction(card_id):
                     "error": "Transaction date must be on or after the last transaction's date."
                 }), 400
 
-        # Reject early payments if no expenses exist yet
-        if amount > 0 and (card.used == 0 or card.available_limit == card.limit):
+        # Closed statements are immutable
+        last_statement = get_last_statement(card.id)
+        if last_statement and transaction_date.date() <= last_statement.cycle_end:
             return jsonify({
-                "error": "Cannot add payment without any prior expenses."
+                "error": "Transaction date falls in an already closed statement."
             }), 400
 
-        # Check available limit for expenses
-        if amount < 0 and abs(amount) > card.available_limit:
-            return jsonify({"error": "Transaction would exceed available credit limit"}), 400
-
-        # Determine if this transaction is already past a billing cycle
         today = datetime.now(timezone.utc).date()
-        txn_date = transaction_date.date()
-        cycle_start, _ = get_billing_cycle_range(today, card.billing_cycle_start)
-
-        # True if this transaction is older than the current cycle
-        already_billed = amount < 0 and txn_date < cycle_start
+        is_billed, error = apply_card_posting(card, amount, transaction_date, today)
+        if error:
+            return jsonify({"error": error}), 400
 
         # Create transaction with correct is_billed
         transaction = CreditCardTransaction(
@@ -722,47 +816,19 @@ def add_credit_card_transaction(card_id):
             date=transaction_date,
             description=data.get('description'),
             category=data.get('category'),
+            category_id=category_id(data.get('category')),
             transaction_type='expense' if amount < 0 else 'payment',
             is_payment=data.get('is_payment', amount > 0),
-            is_billed=(already_billed if amount < 0 else True)
+            is_billed=is_billed,
+            card_balance_after=card.used
         )
 
-        # Update card balances
-        if amount < 0:  # Expense
-            card.used = money(card.used + abs(amount))
-
-            current_cycle_start, current_cycle_end = get_billing_cycle_range(today, card.billing_cycle_start)
-
-            if txn_date < current_cycle_start:
-                card.billed_unpaid = money(card.billed_unpaid + abs(amount))
-            else:
-                card.unbilled_spends = money(card.unbilled_spends + abs(amount))
-
-        else:  # Payment
-            total_owed = card.billed_unpaid + card.unbilled_spends
-            if amount > total_owed:
-                return jsonify({"error": "Payment amount exceeds total owed amount"}), 400
-
-            payment_remaining = amount
-
-            if card.billed_unpaid > 0:
-                paid = min(payment_remaining, card.billed_unpaid)
-                card.billed_unpaid = money(card.billed_unpaid - paid)
-                payment_remaining -= paid
-
-            if payment_remaining > 0 and card.unbilled_spends > 0:
-                paid = min(payment_remaining, card.unbilled_spends)
-                card.unbilled_spends = money(card.unbilled_spends - paid)
-                payment_remaining -= paid
-
-            total_paid = amount - payment_remaining
-            card.used = money(card.used - total_paid)
-
-            if total_paid > 0:
-                card.last_payment_date = transaction_date
-                card.last_payment_amount = money(amount)
-
         db.session.add(transaction)
+        record_spending(transaction, 'credit_card')
+        write_journal([journal_entry(
+            user_id, 'credit_card_transaction', [('credit_card', card_id, amount)],
+            transaction_date, data.get('description')
+        )])
         db.session.commit()
 
         return jsonify({
@@ -792,6 +858,76 @@ def add_credit_card_transaction(card_id):
 
 
 
+def apply_card_posting(card, amount, transaction_date, today):
+    """
+    Validate one card posting and apply it to the card balances in memory.
+    Returns (is_billed, error); the card is left untouched when error is set.
+    """
+    # All balance arithmetic below is in integer paise
+    amount_paise = to_paise(amount)
+    used = to_paise(card.used)
+    billed_unpaid = to_paise(card.billed_unpaid)
+    unbilled_spends = to_paise(card.unbilled_spends)
+
+    # Reject early payments if no expenses exist yet
+    if amount_paise > 0 and used == 0:
+        return None, "Cannot add payment without any prior expenses."
+
+    # Check available limit for expenses
+    if amount_paise < 0 and -amount_paise > to_paise(card.limit) - used:
+        return None, "Transaction would exceed available credit limit"
+
+    if amount_paise > 0 and amount_paise > billed_unpaid + unbilled_spends:
+        return None, "Payment amount exceeds total owed amount"
+
+    # Determine if this transaction is already past a billing cycle
+    txn_date = transaction_date.date()
+    cycle_start, _ = get_billing_cycle_range(today, card.billing_cycle_start)
+
+    # Roll last cycle's spends over before touching the new cycle
+    if card.last_billed_on and card.last_billed_on < cycle_start:
+        billed_unpaid += unbilled_spends
+        unbilled_spends = 0
+        card.last_billed_on = cycle_start
+
+    is_billed = True
+
+    if amount_paise < 0:  # Expense
+        used -= amount_paise
+
+        # Older than the current cycle means already billed
+        if txn_date < cycle_start:
+            billed_unpaid -= amount_paise
+        else:
+            unbilled_spends -= amount_paise
+            is_billed = False
+
+    else:  # Payment
+        payment_remaining = amount_paise
+
+        if billed_unpaid > 0:
+            paid = min(payment_remaining, billed_unpaid)
+            billed_unpaid -= paid
+            payment_remaining -= paid
+
+        if payment_remaining > 0 and unbilled_spends > 0:
+            paid = min(payment_remaining, unbilled_spends)
+            unbilled_spends -= paid
+            payment_remaining -= paid
+
+        total_paid = amount_paise - payment_remaining
+        used -= total_paid
+
+        if total_paid > 0:
+            card.last_payment_date = transaction_date
+            card.last_payment_amount = from_paise(amount_paise)
+
+    card.used = from_paise(used)
+    card.billed_unpaid = from_paise(billed_unpaid)
+    card.unbilled_spends = from_paise(unbilled_spends)
+
+    return is_billed, None
+
 #When to Call This Endpoint /process_billing
 #When a user views their statement (trigger it first)
 #When a payment is made (optional - to ensure correct payable amount)
@@ -805,72 +941,13 @@ def process_billing(card_id):
 
     try:
         today = datetime.now(timezone.utc).date()
-        billing_start, billing_end = get_billing_cycle_range(today, card.billing_cycle_start)
-
-        transactions = CreditCardTransaction.query.filter(
-            CreditCardTransaction.credit_card_id == card.id
-        ).order_by(CreditCardTransaction.date.asc()).all()
-
-        billed_expenses = []
-        unbilled_expenses = []
-        payments = []
-
-        for txn in transactions:
-            if txn.amount > 0:
-                txn.is_billed = True
-                payments.append(txn)
-            else:
-                if txn.date.date() < billing_start:
-                    txn.is_billed = True
-                    billed_expenses.append(txn)
-                else:
-                    txn.is_billed = False
-                    unbilled_expenses.append(txn)
-
-        # Reset values
-        card.billed_unpaid = money(
-            sum(abs(e.amount) for e in billed_expenses)
-        )
-
-        card.unbilled_spends = money(
-            sum(abs(e.amount) for e in unbilled_expenses)
-        )
-
-        card.used = money(
-            card.billed_unpaid + card.unbilled_spends
-        )
-
-        # Reapply payments
-        payments_applied = 0
-        payment_remaining = sum(p.amount for p in payments)
-
-        for p in payments:
-            apply_amt = p.amount
-
-            if card.billed_unpaid > 0:
-                paid = min(card.billed_unpaid, apply_amt)
-                card.billed_unpaid = money(card.billed_unpaid - paid)
-                card.used = money(card.used - paid)
-                apply_amt -= paid
-                payments_applied += paid
-
-            if apply_amt > 0 and card.unbilled_spends > 0:
-                paid = min(card.unbilled_spends, apply_amt)
-                card.unbilled_spends = money(card.unbilled_spends - paid)
-                card.used = money(card.used - paid)
-                apply_amt -= paid
-                payments_applied += paid
-
-        # Update last payment info
-        if payments:
-            last_payment = payments[-1]
-            card.last_payment_date = last_payment.date
-            card.last_payment_amount = last_payment.amount
+        closed_statements = close_billing_cycles(card, today)
 
         db.session.commit()
 
         return jsonify({
             "message": "Billing processed successfully",
+            "statements_closed": len(closed_statements),
             "card": {
                 "id": card.id,
                 "billed_unpaid": card.billed_unpaid,
@@ -886,6 +963,148 @@ def process_billing(card_id):
         return jsonify({"error": f"Server error: {str(e)}"}), 500
 
 
+def get_last_statement(card_id):
+    return CreditCardStatement.query.filter_by(
+        credit_card_id=card_id
+    ).order_by(CreditCardStatement.cycle_end.desc()).first()
+
+def close_billing_cycles(card, today):
+    """
+    Close every completed billing cycle since the last statement and
+    recompute billed_unpaid / unbilled_spends from the open cycle only.
+
+    Only transactions after the last closed statement are read, so the
+    cost depends on recent activity rather than the card's full history.
+    Returns the list of statements created.
+    """
+    current_start, _ = get_billing_cycle_range(today, card.billing_cycle_start)
+
+    last_statement = get_last_statement(card.id)
+    carried_due = to_paise(last_statement.closing_due) if last_statement else 0
+    window_start = last_statement.cycle_end + timedelta(days=1) if last_statement else None
+
+    # Amounts are read as raw paise and summed as integers
+    rows = db.session.query(
+        CreditCardTransaction.date,
+        type_coerce(CreditCardTransaction.amount, BigInteger)
+    ).filter(
+        CreditCardTransaction.credit_card_id == card.id
+    )
+    if window_start:
+        rows = rows.filter(CreditCardTransaction.date >= datetime.combine(window_start, time.min))
+    rows = rows.order_by(CreditCardTransaction.date.asc(), CreditCardTransaction.id.asc()).yield_per(1000)
+
+    closed = []
+    cycle = None  # [start, end, spends, payments] of the cycle being closed
+    current_spends = 0
+    current_payments = 0
+    last_payment = None
+
+    def close_cycle():
+        nonlocal carried_due
+        start, end, spends, payments = cycle
+        statement = CreditCardStatement(
+            credit_card_id=card.id,
+            user_id=card.user_id,
+            cycle_start=start,
+            cycle_end=end,
+            opening_balance=from_paise(carried_due),
+            spends=from_paise(spends),
+            payments=from_paise(payments),
+            closing_due=from_paise(carried_due + spends - payments)
+        )
+        db.session.add(statement)
+        closed.append(statement)
+        carried_due += spends - payments
+
+    def next_cycle(start):
+        _, end = get_billing_cycle_range(start, card.billing_cycle_start)
+        return [start, end, 0, 0]
+
+    for txn_date, amount in rows:
+        if amount > 0:
+            last_payment = (txn_date, amount)
+
+        day = txn_date.date()
+        if day >= current_start:
+            if amount < 0:
+                current_spends -= amount
+            else:
+                current_payments += amount
+            continue
+
+        if cycle is None:
+            cycle = next_cycle(window_start or get_billing_cycle_range(day, card.billing_cycle_start)[0])
+        while day > cycle[1]:
+            close_cycle()
+            cycle = next_cycle(cycle[1] + timedelta(days=1))
+
+        if amount < 0:
+            cycle[2] -= amount
+        else:
+            cycle[3] += amount
+
+    # Close the remaining completed cycles, including ones without activity
+    if cycle is None and window_start and window_start < current_start:
+        cycle = next_cycle(window_start)
+    while cycle is not None and cycle[0] < current_start:
+        close_cycle()
+        cycle = next_cycle(cycle[1] + timedelta(days=1))
+
+    # Flag the processed window in bulk instead of row by row
+    window = CreditCardTransaction.query.filter(
+        CreditCardTransaction.credit_card_id == card.id
+    )
+    if window_start:
+        window = window.filter(CreditCardTransaction.date >= datetime.combine(window_start, time.min))
+    current_start_dt = datetime.combine(current_start, time.min)
+    window.filter(
+        (CreditCardTransaction.date < current_start_dt) | (CreditCardTransaction.amount > 0)
+    ).update({CreditCardTransaction.is_billed: True}, synchronize_session=False)
+    window.filter(
+        CreditCardTransaction.date >= current_start_dt,
+        CreditCardTransaction.amount < 0
+    ).update({CreditCardTransaction.is_billed: False}, synchronize_session=False)
+
+    # Payments in the open cycle settle the carried due first, then current spends
+    overflow = max(0, current_payments - carried_due)
+    billed_unpaid = max(0, carried_due - current_payments)
+    unbilled_spends = max(0, current_spends - overflow)
+    card.billed_unpaid = from_paise(billed_unpaid)
+    card.unbilled_spends = from_paise(unbilled_spends)
+    card.used = from_paise(billed_unpaid + unbilled_spends)
+    card.last_billed_on = current_start
+
+    if last_payment:
+        card.last_payment_date = last_payment[0]
+        card.last_payment_amount = from_paise(last_payment[1])
+
+    return closed
+
+@routes.route('/credit_cards/<int:card_id>/statements', methods=['GET'])
+@jwt_required()
+@etag_cached()
+def get_credit_card_statements(card_id):
+    user_id = int(get_jwt_identity())
+    card = CreditCard.query.filter_by(id=card_id, user_id=user_id).first()
+    if not card:
+        return jsonify({"error": "Credit card not found"}), 404
+
+    statements = CreditCardStatement.query.filter_by(
+        credit_card_id=card_id
+    ).order_by(CreditCardStatement.cycle_end.desc()).all()
+
+    return jsonify([{
+        "id": st.id,
+        "cycle_start": st.cycle_start.strftime('%Y-%m-%d'),
+        "cycle_end": st.cycle_end.strftime('%Y-%m-%d'),
+        "opening_balance": st.opening_balance,
+        "spends": st.spends,
+        "payments": st.payments,
+        "closing_due": st.closing_due
+    } for st in statements])
+
+
 def is_in_current_billing_cycle(transaction_date, cycle_start_day):
     """Check if transaction falls in current billing cycle based on CURRENT DATE"""
     today = datetime.now(timezone.utc)
@@ -915,33 +1134,33 @@ def is_in_current_billing_cycle(transaction_date, cycle_start_day):
     
     return transaction_date >= cycle_start
 
-def process_billing_date_transition(card):
+def process_billing_date_transition(card, cycle_start):
     """Call this when a card's billing date arrives"""
     # Move unbilled spends to billed_unpaid
-    card.billed_unpaid = money(card.billed_unpaid + card.unbilled_spends)
+    card.billed_unpaid = from_paise(to_paise(card.billed_unpaid) + to_paise(card.unbilled_spends))
     card.unbilled_spends = 0
-    db.session.commit()
+    card.last_billed_on = cycle_start
 
 def get_billing_cycle_range(reference_date, billing_day):
     """
     Given a reference date and billing cycle start day, 
     return the current cycle's start and end date.
     """
-    if reference_date.day >= billing_day:
-        cycle_start = reference_date.replace(day=billing_day)
+    def clamp(month_date):
+        # Billing day 29-31 falls on the last day of shorter months
+        last_day = calendar.monthrange(month_date.year, month_date.month)[1]
+        return month_date.replace(day=min(billing_day, last_day))
+
+    if reference_date >= clamp(reference_date):
+        cycle_start = clamp(reference_date)
     else:
         # Move to previous month
         prev_month = reference_date.replace(day=1) - timedelta(days=1)
-        cycle_start = prev_month.replace(day=billing_day)
+        cycle_start = clamp(prev_month)
 
     # Calculate end as one day before next cycle start
-    try:
-        next_cycle_start = cycle_start + relativedelta(months=1)
-        cycle_end = next_cycle_start - timedelta(days=1)
-    except ValueError:
-        # Handle overflow (e.g., February 30)
-        last_day = (cycle_start + relativedelta(months=1)).replace(day=1) - timedelta(days=1)
-        cycle_end = last_day
+    next_cycle_start = clamp(cycle_start.replace(day=1) + relativedelta(months=1))
+    cycle_end = next_cycle_start - timedelta(days=1)
 
     return cycle_start, cycle_end
 
@@ -958,6 +1177,9 @@ def create_bank():
             balance=money(data.get('balance', 0))
         )
         db.session.add(bank)
+        db.session.flush()
+        if bank.balance:
+            write_journal([journal_entry(user_id, 'opening', [('bank', bank.id, bank.balance)])])
         db.session.commit()
         return jsonify({
             "id": bank.id,
@@ -976,6 +1198,7 @@ def create_bank():
 
 @routes.route('/banks', methods=['GET'])
 @jwt_required()
+@etag_cached()
 def get_banks():
     user_id = int(get_jwt_identity())
     banks = Bank.query.filter_by(user_id=user_id).all()
@@ -1034,68 +1257,88 @@ def delete_bank(bank_id):
             "linked_savings_count": linked_savings
         }), 400
     
+    delete_account_journal('bank', bank_id)
     db.session.delete(bank)
     db.session.commit()
     return jsonify({"message": "Bank deleted successfully"}), 200
 
 
+def apply_bank_posting(bank, amount, transaction_type):
+    """
+    Validate one bank posting and apply it to bank.balance in memory.
+    Returns (new_balance, error); the bank is left untouched when error is set.
+    """
+    if transaction_type not in ('income', 'expense'):
+        return None, "Invalid transaction type"
+
+    delta = to_paise(amount) if transaction_type == 'income' else -to_paise(amount)
+    balance = to_paise(bank.balance) + delta
+
+    if transaction_type == 'expense' and balance < 0:
+        return None, "Insufficient balance"
+
+    bank.balance = from_paise(balance)
+    return bank.balance, None
+
 @routes.route('/banks/<int:bank_id>/transactions', methods=['POST'])
 @jwt_required()
 def add_bank_transaction(bank_id):
     user_id = int(get_jwt_identity())
-    bank = Bank.query.filter_by(id=bank_id, user_id=user_id).first()
-    if not bank:
-        return jsonify({"error": "Bank not found"}), 404
-    
-    data = request.json
+    data = request.get_json(silent=True) or {}
+    if 'amount' not in data:
+        return jsonify({"error": "Amount is required"}), 400
+
     try:
-        amount = float(data['amount'])
-        transaction_type = data.get('type', 'income')
-        description = data.get('description', '')
-        category = data.get('category', '')
-        
-        if transaction_type not in ('income', 'expense'):
-            return jsonify({"error": "Invalid transaction type"}), 400
-            
-        if transaction_type == 'expense' and bank.balance < amount:
-            return jsonify({"error": "Insufficient balance"}), 400
-            
-        if transaction_type == 'income':
-            new_balance = money(bank.balance + amount)
-        else:
-            new_balance = money(bank.balance - amount)
-        
-        transaction = BankTransaction(
-            bank_id=bank_id,
-            user_id=user_id,
-            amount=amount,
-            description=description,
-            category=category,
-            transaction_type=transaction_type,
-            bank_balance_after=new_balance,
-            date=datetime.now(timezone.utc)
-        )
-        
-        bank.balance = money(new_balance)
-        db.session.add(transaction)
-        db.session.commit()
-        
-        return jsonify({
-            "message": "Transaction added",
-            "balance": new_balance,
-            "transaction": {
-                "id": transaction.id,
-                "amount": transaction.amount,
-                "type": transaction.transaction_type,
-                "description": transaction.description,
-                "category": transaction.category,
-                "date": transaction.date.isoformat(),
-                "balance_after": new_balance
-            }
-        }), 201
-    except ValueError:
+        amount = money(float(data['amount']))
+    except (TypeError, ValueError, OverflowError):
         return jsonify({"error": "Invalid amount"}), 400
 
+    if amount <= 0:
+        return jsonify({"error": "Amount must be greater than zero"}), 400
+
+    transaction_type = data.get('type', 'income')
+    if transaction_type not in ('income', 'expense'):
+        return jsonify({"error": "Invalid transaction type"}), 400
+
+    transaction = {
+        "user_id": user_id,
+        "amount": amount,
+        "description": data.get('description', ''),
+        "category": data.get('category', ''),
+        "category_id": category_id(data.get('category')),
+        "transaction_type": transaction_type,
+        "date": datetime.now(timezone.utc)
+    }
+
+    delta = amount if transaction_type == 'income' else -amount
+    new_balance, transaction_id = post_to_account(Bank, bank_id, user_id, delta, transaction)
+    if new_balance is None:
+        db.session.rollback()
+        if not account_exists(Bank, bank_id, user_id):
+            return jsonify({"error": "Bank not found"}), 404
+        return jsonify({"error": "Insufficient balance"}), 400
+
+    record_spending_batch(user_id, 'bank', [transaction])
+    write_journal([journal_entry(
+        user_id, 'bank_transaction', [('bank', bank_id, delta)],
+        transaction["date"], transaction["description"]
+    )])
+    db.session.commit()
+    
+    return jsonify({
+        "message": "Transaction added",
+        "balance": new_balance,
+        "transaction": {
+            "id": transaction_id,
+            "amount": amount,
+            "type": transaction_type,
+            "description": transaction["description"],
+            "category": transaction["category"],
+            "date": transaction["date"].isoformat(),
+            "balance_after": new_balance
+        }
+    }), 201
+
 @routes.route('/banks/<int:bank_id>/transactions', methods=['GET'])
 @jwt_required()
 def get_bank_transactions(bank_id):
@@ -1104,8 +1347,8 @@ def get_bank_transactions(bank_id):
     if not bank:
         return jsonify({"error": "Bank not found"}), 404
 
-    transactions = BankTransaction.query.filter_by(bank_id=bank_id).order_by(BankTransaction.date.desc()).all()
-    return jsonify([{
+    query = BankTransaction.query.filter_by(bank_id=bank_id).order_by(BankTransaction.date.desc())
+    return paginate_transactions(query, BankTransaction, lambda tx: {
         "id": tx.id,
         "amount": tx.amount,
         "description": tx.description or '',
@@ -1113,7 +1356,7 @@ def get_bank_transactions(bank_id):
         "transaction_type": tx.transaction_type,
         "date": tx.date.astimezone(IST).strftime("%Y-%m-%d %H:%M:%S"),
         "bank_balance_after": tx.bank_balance_after
-    } for tx in transactions])
+    })
 
 # ========== ASSET ROUTES ==========
 @routes.route('/assets', methods=['POST'])
@@ -1147,6 +1390,9 @@ def create_asset():
     )
     try:
         db.session.add(asset)
+        db.session.flush()
+        if asset.balance:
+            write_journal([journal_entry(user_id, 'opening', [('asset', asset.id, asset.balance)])])
         db.session.commit()
         return jsonify({"message": "Asset created!"}), 201
     except IntegrityError as e:
@@ -1160,6 +1406,7 @@ def create_asset():
 
 @routes.route('/assets', methods=['GET'])
 @jwt_required()
+@etag_cached()
 def get_assets():
     user_id = int(get_jwt_identity())
     assets = Asset.query.filter_by(user_id=user_id).all()
@@ -1243,32 +1490,44 @@ def update_asset(asset_id):
 @jwt_required()
 def add_asset_transaction(asset_id):
     user_id = int(get_jwt_identity())
-    asset = Asset.query.filter_by(id=asset_id, user_id=user_id).first()
-    if not asset:
-        return jsonify({"error": "Asset not found"}), 404
-    
-    data = request.json
-    amount = float(data['amount'])
+    data = request.get_json(silent=True) or {}
+    if 'amount' not in data:
+        return jsonify({"error": "Amount is required"}), 400
+
+    try:
+        amount = money(float(data['amount']))
+    except (TypeError, ValueError, OverflowError):
+        return jsonify({"error": "Invalid amount"}), 400
+
+    if amount <= 0:
+        return jsonify({"error": "Amount must be greater than zero"}), 400
+
     transaction_type = data.get('type', 'deposit')
-    
-    if transaction_type == 'withdraw' and asset.balance < amount:
+    if transaction_type not in ('deposit', 'withdraw'):
+        return jsonify({"error": "Invalid transaction type"}), 400
+
+    delta = amount if transaction_type == 'deposit' else -amount
+    posted_at = datetime.now(timezone.utc)
+    new_balance, _ = post_to_account(Asset, asset_id, user_id, delta, {
+        "user_id": user_id,
+        "amount": amount,
+        "description": data.get('description'),
+        "category": data.get('category'),
+        "category_id": category_id(data.get('category')),
+        "transaction_type": transaction_type,
+        "date": posted_at
+    })
+
+    if new_balance is None:
+        db.session.rollback()
+        if not account_exists(Asset, asset_id, user_id):
+            return jsonify({"error": "Asset not found"}), 404
         return jsonify({"error": "Insufficient balance"}), 400
-    
-    new_balance = money(asset.balance + amount if transaction_type == 'deposit' else asset.balance - amount)
-    
-    transaction = AssetTransaction(
-        asset_id=asset_id,
-        user_id=user_id,
-        amount=amount,
-        description=data.get('description'),
-        category=data.get('category'),
-        transaction_type=transaction_type,
-        asset_balance_after=new_balance,
-        date=datetime.now(timezone.utc)
-    )
-    
-    asset.balance = money(new_balance)
-    db.session.add(transaction)
+
+    write_journal([journal_entry(
+        user_id, 'asset_transaction', [('asset', asset_id, delta)],
+        posted_at, data.get('description')
+    )])
     db.session.commit()
     return jsonify({"message": "Transaction added", "balance": new_balance}), 201
 
@@ -1280,19 +1539,16 @@ def get_asset_transactions(asset_id):
     if not asset:
         return jsonify({"error": "Asset not found"}), 404
 
-    transactions = AssetTransaction.query.filter_by(asset_id=asset_id).all()
-    return jsonify([
-        {
-            "id": tx.id,
-            "amount": tx.amount,
-            "description": tx.description or '',
-            "category": tx.category or '',
-            "transaction_type": tx.transaction_type,
-            "date": tx.date.astimezone(IST).strftime("%Y-%m-%d %H:%M:%S"),
-            "asset_balance_after": tx.asset_balance_after
-        }
-        for tx in transactions
-    ])
+    query = AssetTransaction.query.filter_by(asset_id=asset_id)
+    return paginate_transactions(query, AssetTransaction, lambda tx: {
+        "id": tx.id,
+        "amount": tx.amount,
+        "description": tx.description or '',
+        "category": tx.category or '',
+        "transaction_type": tx.transaction_type,
+        "date": tx.date.astimezone(IST).strftime("%Y-%m-%d %H:%M:%S"),
+        "asset_balance_after": tx.asset_balance_after
+    })
 
 @routes.route('/assets/<int:asset_id>', methods=['DELETE'])
 @jwt_required()
@@ -1305,6 +1561,7 @@ def delete_asset(asset_id):
     if asset.balance != 0:
         return jsonify({'error': 'Asset cannot be deleted because its balance is not zero.'}), 400
 
+    delete_account_journal('asset', asset_id)
     db.session.delete(asset)
     db.session.commit()
     return jsonify({'message': 'Asset deleted successfully'}), 200
@@ -1367,19 +1624,26 @@ def create_saving():
 
 @routes.route('/savings', methods=['GET'])
 @jwt_required()
+@etag_cached()
 def get_savings():
     user_id = int(get_jwt_identity())
-    savings = Saving.query.filter_by(user_id=user_id).all()
+    # Bank names come from the same query, not one lazy load per bank
+    savings = (
+        db.session.query(Saving, Bank.name)
+        .outerjoin(Bank, Bank.id == Saving.bank_id)
+        .filter(Saving.user_id == user_id)
+        .all()
+    )
     return jsonify([
         {
             "id": saving.id,
             "name": saving.name,
             "user_id": saving.user_id,
             "bank_id": saving.bank_id,
-            "bank_name": saving.bank.name if saving.bank else None,
+            "bank_name": bank_name,
             "balance": saving.balance
         } 
-        for saving in savings
+        for saving, bank_name in savings
     ])
 
 @routes.route('/savings/<int:saving_id>', methods=['PUT'])
@@ -1392,6 +1656,12 @@ def update_saving(saving_id):
     
     data = request.json
 
+    # Explicitly prevent balance updates
+    if 'balance' in data:
+        return jsonify({
+            "error": "Balance cannot be updated directly. Use transactions instead."
+        }), 400
+
     # Savings must always remain linked to a bank
     if 'bank_id' in data:
         if not data['bank_id']:
@@ -1401,41 +1671,65 @@ def update_saving(saving_id):
     
     # Handle bank_id change carefully
     if 'bank_id' in data and data['bank_id'] != saving.bank_id:
-        new_bank_id = data['bank_id']
-        
-        # Validate new bank if provided
-        if new_bank_id:
-            new_bank = Bank.query.filter_by(id=new_bank_id, user_id=user_id).first()
-            if not new_bank:
-                return jsonify({"error": "New bank not found"}), 404
-            
-            # If there's a balance, we need to handle the bank transfer
-            if saving.balance > 0:
-                # If currently linked to a bank, return funds to it
-                if saving.bank_id:
-                    old_bank = Bank.query.filter_by(id=saving.bank_id,user_id=user_id).first()
-                    old_bank.balance = money(old_bank.balance + saving.balance)
-                
-                # Withdraw funds from new bank
-                if new_bank.balance < saving.balance:
+        try:
+            new_bank_id = int(data['bank_id'])
+        except (TypeError, ValueError):
+            return jsonify({"error": "New bank not found"}), 404
+
+        # Lock the saving and both banks in canonical order, then re-read
+        # the saving: its balance moves from the new bank to the old one
+        accounts = {('bank', new_bank_id), ('saving', saving.id)}
+        if saving.bank_id:
+            accounts.add(('bank', saving.bank_id))
+
+        found = lock_accounts(user_id, accounts)
+        if ('bank', new_bank_id) not in found:
+            db.session.rollback()
+            return jsonify({"error": "New bank not found"}), 404
+        db.session.refresh(saving)
+
+        if saving.balance > 0 and new_bank_id != saving.bank_id:
+            legs = [(new_bank_id, -saving.balance, 'transfer_out')]
+            if saving.bank_id:
+                legs.append((saving.bank_id, saving.balance, 'transfer_in'))
+
+            posted_at = datetime.now(timezone.utc)
+            description = f"Saving {saving.name} moved to bank {new_bank_id}"
+            transfer_category_id = category_id("Transfer")
+            ledger_rows = []
+            postings = []
+
+            for bank_id, delta, transaction_type in legs:
+                ledger_row = {
+                    "user_id": user_id,
+                    "amount": saving.balance,
+                    "description": description,
+                    "category": "Transfer",
+                    "category_id": transfer_category_id,
+                    "transaction_type": transaction_type,
+                    "date": posted_at
+                }
+
+                balance, _ = post_to_account(Bank, bank_id, user_id, delta, ledger_row)
+                if balance is None:
+                    db.session.rollback()
                     return jsonify({
                         "error": "New bank has insufficient funds for this transfer"
                     }), 400
-                new_bank.balance = money(new_bank.balance - saving.balance)
-        
+
+                ledger_rows.append(ledger_row)
+                postings.append(('bank', bank_id, delta))
+
+            record_spending_batch(user_id, 'bank', ledger_rows)
+            write_journal([journal_entry(user_id, 'saving_relink', postings, posted_at, description)])
+
         # Update the bank link
         saving.bank_id = new_bank_id
-    
+
     # Update allowed fields
     if 'name' in data:
         saving.name = data['name']
     
-    # Explicitly prevent balance updates
-    if 'balance' in data:
-        return jsonify({
-            "error": "Balance cannot be updated directly. Use transactions instead."
-        }), 400
-    
     try:
         db.session.commit()
         return jsonify({
@@ -1461,25 +1755,26 @@ def update_saving(saving_id):
 @jwt_required()
 def add_saving_transaction(saving_id):
     user_id = int(get_jwt_identity())
-    saving = Saving.query.filter_by(id=saving_id, user_id=user_id).first()
+    saving = db.session.query(Saving.bank_id, Saving.name).filter_by(id=saving_id, user_id=user_id).first()
     if not saving:
         return jsonify({"error": "Saving account not found"}), 404
-    
+    bank_id, saving_name = saving
+
     # Safety check - savings must be linked to a bank
-    if not saving.bank_id:
+    if not bank_id:
         return jsonify({
             "error": "Savings account is not linked to a bank"
         }), 400
     
-    data = request.json
+    data = request.get_json(silent=True) or {}
     if 'amount' not in data:
         return jsonify({
             "error": "Amount is required"
         }), 400
 
     try:
-        amount = float(data['amount'])
-    except ValueError:
+        amount = money(float(data['amount']))
+    except (TypeError, ValueError, OverflowError):
         return jsonify({
             "error": "Invalid amount"
         }), 400
@@ -1496,54 +1791,54 @@ def add_saving_transaction(saving_id):
             "error": "Transaction type must be deposit or withdrawal"
         }), 400
     
-    if transaction_type == 'withdrawal' and saving.balance < amount:
-        return jsonify({"error": "Insufficient balance"}), 400
-    
-    # Update saving balance
-    new_saving_balance = money(saving.balance + amount if transaction_type == 'deposit' else saving.balance - amount)
-    
-    # If linked to a bank, update bank balance as well
-    bank_balance_update = None
-    if saving.bank_id:
-        bank = Bank.query.filter_by(id=saving.bank_id, user_id=user_id).first()
-        if not bank:
+    saving_delta = amount if transaction_type == 'deposit' else -amount
+    posted_at = datetime.now(timezone.utc)
+
+    # Reverse operation for bank (deposit to saving = withdrawal from bank),
+    # posted as the bank's own ledger row like a transfer leg.
+    # Bank row before saving row: (type, id) order, so two-account writes can't deadlock.
+    bank_row = {
+        "user_id": user_id,
+        "amount": amount,
+        "description": data.get('description') or f"Saving {saving_name} {transaction_type}",
+        "category": "Transfer",
+        "category_id": category_id("Transfer"),
+        "transaction_type": 'transfer_out' if transaction_type == 'deposit' else 'transfer_in',
+        "date": posted_at
+    }
+    new_bank_balance, _ = post_to_account(Bank, bank_id, user_id, -saving_delta, bank_row)
+    if new_bank_balance is None:
+        db.session.rollback()
+        if not account_exists(Bank, bank_id, user_id):
             return jsonify({"error": "Linked bank account not found"}), 404
-        
-        # Reverse operation for bank (deposit to saving = withdrawal from bank)
-        bank_amount = -amount if transaction_type == 'deposit' else amount
-        new_bank_balance = money(bank.balance + bank_amount)
-        
-        if transaction_type == 'deposit' and bank.balance < amount:
-            return jsonify({"error": "Insufficient bank balance"}), 400
-        
-        bank.balance = money(new_bank_balance)
-        bank_balance_update = new_bank_balance
-    
-    # Create saving transaction
-    transaction = SavingTransaction(
-        saving_id=saving_id,
-        user_id=user_id,
-        amount=amount,
-        description=data.get('description'),
-        category=data.get('category'),
-        transaction_type=transaction_type,
-        saving_balance_after=new_saving_balance,
-        date=datetime.now(timezone.utc)
-    )
-    
-    saving.balance = money(new_saving_balance)
-    db.session.add(transaction)
+        return jsonify({"error": "Insufficient bank balance"}), 400
+
+    new_saving_balance, _ = post_to_account(Saving, saving_id, user_id, saving_delta, {
+        "user_id": user_id,
+        "amount": amount,
+        "description": data.get('description'),
+        "category": data.get('category'),
+        "category_id": category_id(data.get('category')),
+        "transaction_type": transaction_type,
+        "date": posted_at
+    })
+    if new_saving_balance is None:
+        db.session.rollback()
+        return jsonify({"error": "Insufficient balance"}), 400
+
+    record_spending_batch(user_id, 'bank', [bank_row])
+    write_journal([journal_entry(
+        user_id, 'saving_transaction',
+        [('bank', bank_id, -saving_delta), ('saving', saving_id, saving_delta)],
+        posted_at, data.get('description')
+    )])
     db.session.commit()
-    
-    response = {
+
+    return jsonify({
         "message": "Transaction added",
-        "saving_balance": new_saving_balance
-    }
-    
-    if bank_balance_update is not None:
-        response["bank_balance"] = bank_balance_update
-    
-    return jsonify(response), 201
+        "saving_balance": new_saving_balance,
+        "bank_balance": new_bank_balance
+    }), 201
 
 @routes.route('/savings/<int:saving_id>/transactions', methods=['GET'])
 @jwt_required()
@@ -1553,19 +1848,16 @@ def get_saving_transactions(saving_id):
     if not saving:
         return jsonify({"error": "Saving account not found"}), 404
 
-    transactions = SavingTransaction.query.filter_by(saving_id=saving_id).all()
-    return jsonify([
-        {
-            "id": tx.id,
-            "amount": tx.amount,
-            "description": tx.description or '',
-            "category": tx.category or '',
-            "transaction_type": tx.transaction_type,
-            "date": tx.date.astimezone(IST).strftime("%Y-%m-%d %H:%M:%S"),
-            "saving_balance_after": tx.saving_balance_after
-        }
-        for tx in transactions
-    ])
+    query = SavingTransaction.query.filter_by(saving_id=saving_id)
+    return paginate_transactions(query, SavingTransaction, lambda tx: {
+        "id": tx.id,
+        "amount": tx.amount,
+        "description": tx.description or '',
+        "category": tx.category or '',
+        "transaction_type": tx.transaction_type,
+        "date": tx.date.astimezone(IST).strftime("%Y-%m-%d %H:%M:%S"),
+        "saving_balance_after": tx.saving_balance_after
+    })
 
 @routes.route('/savings/<int:saving_id>', methods=['DELETE'])
 @jwt_required()
@@ -1578,86 +1870,274 @@ def delete_saving(saving_id):
     if saving.balance != 0:
         return jsonify({'error': 'Saving account cannot be deleted because its balance is not zero.'}), 400
 
+    delete_account_journal('saving', saving_id)
     db.session.delete(saving)
     db.session.commit()
     return jsonify({'message': 'Saving account deleted successfully'}), 200
 
 # ========== TRANSFER ROUTES ==========
+MAX_TRANSFERS_PER_REQUEST = 500
+
+def parse_transfer(data):
+    """Validate one transfer payload. Returns (transfer, error)."""
+    try:
+        transfer = {
+            "from_account_type": data['from_account_type'],
+            "from_account_id": int(data['from_account_id']),
+            "to_account_type": data['to_account_type'],
+            "to_account_id": int(data['to_account_id']),
+            "amount": money(float(data['amount'])),
+            "fee": money(float(data.get('fee') or 0)),
+            "description": data.get('description'),
+            "date": datetime.now(timezone.utc)
+        }
+    except (KeyError, TypeError):
+        return None, "from_account_type, from_account_id, to_account_type, to_account_id and amount are required"
+    except ValueError:
+        return None, "Invalid amount or account id"
+
+    for key in ('from_account_type', 'to_account_type'):
+        if transfer[key] not in TRANSFER_ACCOUNTS:
+            return None, f"{key} must be one of: {', '.join(TRANSFER_ACCOUNTS)}"
+
+    if transfer['amount'] <= 0 or transfer['fee'] < 0:
+        return None, "Amount must be greater than zero and fee cannot be negative"
+
+    if (transfer['from_account_type'], transfer['from_account_id']) == \
+            (transfer['to_account_type'], transfer['to_account_id']):
+        return None, "Cannot transfer to the same account"
+
+    return transfer, None
+
 @routes.route('/transfers', methods=['POST'])
+@jwt_required()
+@query_budget(UNLIMITED, repeats=UNLIMITED)
 def create_transfer():
-    data = request.json
-    user_id = data['user_id']
-    
-    # Validate accounts
-    from_account = get_account(data['from_account_type'], data['from_account_id'])
-    to_account = get_account(data['to_account_type'], data['to_account_id'])
-    
-    if not from_account or not to_account:
-        return jsonify({"error": "Invalid account(s)"}), 400
-    
-    amount = float(data['amount'])
-    fee = float(data.get('fee', 0))
-    
-    # Check sufficient balance
-    if from_account.balance < amount + fee:
-        return jsonify({"error": "Insufficient balance"}), 400
-    
-    # Perform transfer
-    from_account.balance = money(
-        from_account.balance - (amount + fee)
-    )
+    """
+    Body is one transfer, or {"transfers": [...]} to apply several in
+    order as a single all-or-nothing database transaction.
+    """
+    user_id = int(get_jwt_identity())
+    data = request.json or {}
+
+    payloads = data['transfers'] if isinstance(data.get('transfers'), list) else [data]
+    if not payloads or len(payloads) > MAX_TRANSFERS_PER_REQUEST:
+        return jsonify({"error": f"Send between 1 and {MAX_TRANSFERS_PER_REQUEST} transfers"}), 400
+
+    transfers = []
+    for index, payload in enumerate(payloads):
+        transfer, error = parse_transfer(payload if isinstance(payload, dict) else {})
+        if error:
+            return jsonify({"error": error, "index": index}), 400
+        transfers.append(transfer)
+
+    results, error = apply_transfers(user_id, transfers)
+    if error:
+        db.session.rollback()
+        index, message = error
+        status = 404 if message == "Invalid account(s)" else 400
+        return jsonify({"error": message, "index": index}), status
 
-    to_account.balance = money(
-        to_account.balance + amount
-    )
-    
-    transfer = TransferTransaction(
-        user_id=user_id,
-        from_account_type=data['from_account_type'],
-        from_account_id=data['from_account_id'],
-        to_account_type=data['to_account_type'],
-        to_account_id=data['to_account_id'],
-        amount=amount,
-        fee=fee,
-        description=data.get('description'),
-        date=datetime.now(timezone.utc)
-    )
-    
-    db.session.add(transfer)
     db.session.commit()
-    return jsonify({"message": "Transfer completed"}), 201
-
-def get_account(account_type, account_id):
-    if account_type == 'bank':
-        return Bank.query.get(account_id)
-    elif account_type == 'credit_card':
-        return CreditCard.query.get(account_id)
-    elif account_type == 'asset':
-        return Asset.query.get(account_id)
-    elif account_type == 'saving':
-        return Saving.query.get(account_id)
-    return None
+    return jsonify({"message": "Transfer completed", "transfers": results}), 201
+
+# ========== TRANSACTION FEED ==========
+# account_type -> (ledger subtype, account column, balance-after column)
+FEED_ACCOUNTS = {
+    'bank': (BankTransaction, 'bank_id', 'bank_balance_after'),
+    'credit_card': (CreditCardTransaction, 'credit_card_id', 'card_balance_after'),
+    'asset': (AssetTransaction, 'asset_id', 'asset_balance_after'),
+    'saving': (SavingTransaction, 'saving_id', 'saving_balance_after'),
+}
 
-# ========== UTILITY ROUTES ==========
-@routes.route('/users/dropdown', methods=['GET'])
+FEED_ACCOUNT_TYPES = {
+    model.__mapper__.polymorphic_identity: account_type
+    for account_type, (model, _, _) in FEED_ACCOUNTS.items()
+}
+
+def ist_day_start(day):
+    """Naive UTC timestamp of IST midnight starting `day`, as stored in transaction.date"""
+    return IST.localize(datetime.combine(day, time.min)).astimezone(pytz.utc).replace(tzinfo=None)
+
+def serialize_feed_transaction(tx):
+    account_type = FEED_ACCOUNT_TYPES[tx.type]
+    _, account_column, balance_after = FEED_ACCOUNTS[account_type]
+    return {
+        "id": tx.id,
+        "account_type": account_type,
+        "account_id": getattr(tx, account_column),
+        "amount": tx.amount,
+        "description": tx.description or '',
+        "category": tx.category or '',
+        "transaction_type": tx.transaction_type,
+        "date": tx.date.astimezone(IST).strftime("%Y-%m-%d %H:%M:%S"),
+        "balance_after": getattr(tx, balance_after)
+    }
+
+@routes.route('/transactions', methods=['GET'])
 @jwt_required()
-def get_users_dropdown():
+@etag_cached()
+def get_transactions():
+    """
+    Bank, card, asset and saving transactions in one keyset-paginated feed.
+
+    Filters: from / to (YYYY-MM-DD, IST, inclusive), category,
+    transaction_type and account_type (comma-separated lists), and
+    min_amount / max_amount on the absolute amount.
+    """
+    user_id = int(get_jwt_identity())
+    args = request.args
+
+    def csv_arg(name):
+        return [value.strip() for value in args.get(name, '').split(',') if value.strip()]
+
+    account_types = csv_arg('account_type')
+    unknown = set(account_types) - set(FEED_ACCOUNTS)
+    if unknown:
+        return jsonify({"error": f"account_type must be one of: {', '.join(FEED_ACCOUNTS)}"}), 400
+
+    try:
+        date_from = parse_date(args['from']) if args.get('from') else None
+        date_to = parse_date(args['to']) if args.get('to') else None
+    except ValueError:
+        return jsonify({"error": "from and to must be YYYY-MM-DD"}), 400
+
+    try:
+        min_amount = to_paise(float(args['min_amount'])) if args.get('min_amount') else None
+        max_amount = to_paise(float(args['max_amount'])) if args.get('max_amount') else None
+    except ValueError:
+        return jsonify({"error": "min_amount and max_amount must be numbers"}), 400
+
+    # One SELECT over the transaction table with every subtype's columns
+    models = [FEED_ACCOUNTS[account_type][0] for account_type in account_types or FEED_ACCOUNTS]
+    feed = with_polymorphic(Transaction, models)
+
+    query = db.session.query(feed).filter(
+        feed.user_id == user_id,
+        feed.type.in_([model.__mapper__.polymorphic_identity for model in models])
+    ).order_by(feed.date.desc(), feed.id.desc())
+
+    if date_from:
+        query = query.filter(feed.date >= ist_day_start(date_from))
+    if date_to:
+        query = query.filter(feed.date < ist_day_start(date_to + timedelta(days=1)))
+
+    if csv_arg('category'):
+        names = {normalize_category(category) for category in csv_arg('category')}
+        query = query.filter(feed.category_id.in_(select(Category.id).where(Category.name.in_(names))))
+    if csv_arg('transaction_type'):
+        query = query.filter(feed.transaction_type.in_(csv_arg('transaction_type')))
+
+    # Card amounts are signed; compare magnitudes in raw paise
+    magnitude = func.abs(type_coerce(feed.amount, BigInteger))
+    if min_amount is not None:
+        query = query.filter(magnitude >= min_amount)
+    if max_amount is not None:
+        query = query.filter(magnitude <= max_amount)
+
+    return paginate_transactions(query, feed, serialize_feed_transaction)
+
+@routes.route('/transactions/search', methods=['GET'])
+@jwt_required()
+@etag_cached()
+def search_user_transactions():
+    """
+    Ranked description search across all accounts: ?q=amazon&limit=&offset=.
+    Every word matches as a prefix; on Postgres misspellings also match.
+    """
+    user_id = int(get_jwt_identity())
+    q = request.args.get('q', '').strip()
+
+    if not search_terms(q):
+        return jsonify({"error": "q must contain at least one word"}), 400
+
+    try:
+        limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+        offset = int(request.args.get('offset', 0))
+    except ValueError:
+        return jsonify({"error": "limit and offset must be integers"}), 400
+
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        return jsonify({"error": f"limit must be between 1 and {MAX_PAGE_SIZE}"}), 400
+
+    if not 0 <= offset < MAX_SEARCH_RESULTS:
+        return jsonify({"error": f"offset must be between 0 and {MAX_SEARCH_RESULTS - 1}"}), 400
+
+    limit = min(limit, MAX_SEARCH_RESULTS - offset)
+    rows = search_transactions(user_id, q, limit + 1, offset)
+    has_more = len(rows) > limit and offset + limit < MAX_SEARCH_RESULTS
+
+    return jsonify({
+        "transactions": [
+            {**serialize_feed_transaction(tx), "rank": rank}
+            for tx, rank in rows[:limit]
+        ],
+        "next_offset": offset + limit if has_more else None
+    })
+
+# ========== JOURNAL ROUTES ==========
+@routes.route('/accounts/<account_type>/<int:account_id>/balance', methods=['GET'])
+@jwt_required()
+def get_balance_at(account_type, account_id):
+    """
+    Balance from the journal as of ?at= (ISO date or datetime, naive
+    values read as IST; default now). Credit cards report -used.
+    """
     user_id = int(get_jwt_identity())
+
+    model = JOURNAL_ACCOUNTS.get(account_type)
+    if model is None:
+        return jsonify({"error": f"account_type must be one of: {', '.join(JOURNAL_ACCOUNTS)}"}), 400
+
+    if not account_exists(model, account_id, user_id):
+        return jsonify({"error": "Account not found"}), 404
+
+    try:
+        at = datetime.fromisoformat(request.args['at']) if request.args.get('at') else datetime.now(timezone.utc)
+    except ValueError:
+        return jsonify({"error": "at must be an ISO date or datetime"}), 400
+
+    if at.tzinfo is None:
+        at = IST.localize(at)
+    at = at.astimezone(pytz.utc).replace(tzinfo=None)
+
+    return jsonify({
+        "account_type": account_type,
+        "account_id": account_id,
+        "at": at.isoformat() + "Z",
+        "balance": balance_at(account_type, account_id, at)
+    }), 200
+
+# ========== UTILITY ROUTES ==========
+@result_cache.memoize("users_dropdown")
+def users_dropdown_options(user_id):
     user = User.query.get(user_id)
     if not user:
-        return jsonify([])
+        return []
 
-    return jsonify([{
+    return [{
         'id': user.id,
         'name': user.name
-    }])
+    }]
+
+@result_cache.memoize("banks_dropdown")
+def banks_dropdown_options(user_id):
+    banks = Bank.query.filter_by(user_id=user_id).all()
+    return [{'id': bank.id, 'name': bank.name} for bank in banks]
+
+@routes.route('/users/dropdown', methods=['GET'])
+@jwt_required()
+@etag_cached(max_age=60)
+def get_users_dropdown():
+    user_id = int(get_jwt_identity())
+    return jsonify(users_dropdown_options(user_id))
 
 @routes.route('/banks/dropdown', methods=['GET'])
 @jwt_required()
+@etag_cached()
 def get_banks_dropdown():
     user_id = int(get_jwt_identity())
-    banks = Bank.query.filter_by(user_id=user_id).all()
-    return jsonify([{'id': bank.id, 'name': bank.name} for bank in banks])
+    return jsonify(banks_dropdown_options(user_id))
 
 @routes.route('/bank_balance', methods=['GET'])
 def get_bank_balance():
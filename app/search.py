@@ -0,0 +1,95 @@
+import re
+
+from sqlalchemy import column, func, literal, literal_column, or_, table, text
+from sqlalchemy.orm import with_polymorphic
+
+from . import db
+from .models import (Transaction, BankTransaction, CreditCardTransaction,
+                     AssetTransaction, SavingTransaction)
+
+# Must match the indexed expression in TRANSACTION_SEARCH_DDL exactly
+TEXT_SEARCH_CONFIG = literal_column("'simple'")
+
+# Ranked results are paged by offset; deeper pages mean a worse query
+MAX_SEARCH_RESULTS = 1000
+
+# External-content FTS5 table, SQLite only
+transaction_fts = table("transaction_fts", column("rowid"))
+
+
+def search_terms(q):
+    """Lower-cased words of the query; punctuation never reaches a query parser."""
+
+    return re.findall(r"\w+", (q or "").lower())
+
+
+def _searchable():
+    return with_polymorphic(
+        Transaction,
+        [BankTransaction, CreditCardTransaction, AssetTransaction, SavingTransaction]
+    )
+
+
+def _postgres_search(feed, q, terms):
+    """
+    Every term as a prefix match against the tsvector GIN index, OR the
+    whole query as a fuzzy pg_trgm word match (typos, partial merchant
+    names). Ranked by the better of the two scores.
+    """
+
+    description = func.coalesce(feed.description, "")
+    vector = func.to_tsvector(TEXT_SEARCH_CONFIG, description)
+    query = func.to_tsquery(TEXT_SEARCH_CONFIG, " & ".join(f"{term}:*" for term in terms))
+
+    rank = func.greatest(
+        func.ts_rank(vector, query),
+        func.word_similarity(q, feed.description)
+    )
+
+    condition = or_(
+        vector.op("@@")(query),
+        literal(q).op("<%")(feed.description)
+    )
+
+    return condition, rank
+
+
+def _sqlite_search(feed, terms):
+    """FTS5 prefix match on every term, ranked by bm25 (lower is better, so negated)."""
+
+    match = " ".join(f'"{term}"*' for term in terms)
+    condition = text("transaction_fts MATCH :match").bindparams(match=match)
+    rank = -func.bm25(literal_column("transaction_fts"))
+
+    return condition, rank
+
+
+def search_transactions(user_id, q, limit, offset=0):
+    """
+    Returns [(transaction, rank)] for the user's transactions whose
+    description matches q, best match first. Does one query.
+    """
+
+    terms = search_terms(q)
+    if not terms:
+        return []
+
+    feed = _searchable()
+    query = db.session.query(feed)
+
+    if db.session.get_bind().dialect.name == "postgresql":
+        condition, rank = _postgres_search(feed, q, terms)
+    else:
+        condition, rank = _sqlite_search(feed, terms)
+        query = query.join(transaction_fts, transaction_fts.c.rowid == feed.id)
+
+    rank = rank.label("rank")
+
+    return (
+        query.add_columns(rank)
+        .filter(feed.user_id == user_id, condition)
+        .order_by(rank.desc(), feed.date.desc(), feed.id.desc())
+        .limit(limit)
+        .offset(offset)
+        .all()
+    )
@@ -0,0 +1,261 @@
+import json
+import logging
+import math
+import os
+import re
+import sys
+import sysconfig
+import time
+from collections import Counter
+from functools import wraps
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger("ppa.sql")
+
+# Longest statement text kept for the log line
+STATEMENT_PREVIEW_CHARS = 300
+
+QUERY_GUARD_MODES = ("off", "warn", "raise")
+
+# For @query_budget on bulk routes whose query count grows with their input
+UNLIMITED = math.inf
+
+# Frames from these are never reported as a call site
+LIBRARY_DIRECTORIES = tuple(
+    {sysconfig.get_paths()[name] for name in ("stdlib", "platstdlib", "purelib", "platlib")}
+)
+
+
+class QueryGuardError(Exception):
+    """A request ran a statement shape or made lazy loads too often, or went over its query budget."""
+
+
+class RequestQueryStats:
+    """Queries run while serving one request."""
+
+    def __init__(self, guard=False):
+        self.started = time.perf_counter()
+        self.count = 0
+        self.total = 0.0
+        self.slowest = 0.0
+        self.slowest_statement = None
+
+        # Query guard only: statement executions (an executemany that the
+        # driver runs row by row counts once), executions and last call
+        # site per statement shape, and the lazy relationship loads
+        self.guard = guard
+        self.executions = 0
+        self._last_context = None
+        self.shapes = Counter()
+        self.shape_sites = {}
+        self.lazy_loads = []
+
+    def record(self, statement, seconds, context=None):
+        self.count += 1
+        self.total += seconds
+        if seconds >= self.slowest:
+            self.slowest = seconds
+            self.slowest_statement = statement
+
+        if self.guard and (context is None or context is not self._last_context):
+            self._last_context = context
+            self.executions += 1
+            shape = statement_shape(statement)
+            self.shapes[shape] += 1
+            self.shape_sites[shape] = call_site()
+
+    def record_lazy_load(self, description):
+        self.lazy_loads.append(f"{description} at {call_site()}")
+
+    def server_timing(self):
+        elapsed = time.perf_counter() - self.started
+        return (
+            f'db;dur={self.total * 1000:.1f};desc="{self.count} queries", '
+            f'app;dur={elapsed * 1000:.1f}'
+        )
+
+    def log_fields(self):
+        return {
+            "queries": self.count,
+            "db_ms": round(self.total * 1000, 1),
+            "slowest_ms": round(self.slowest * 1000, 1),
+            "slowest": statement_preview(self.slowest_statement),
+        }
+
+    def violations(self, repeat_limit, budget):
+        problems = []
+
+        for shape, count in self.shapes.most_common():
+            if count <= repeat_limit:
+                break
+            problems.append(
+                f"ran {count} times (limit {repeat_limit}), last at {self.shape_sites[shape]}: "
+                f"{statement_preview(shape)}"
+            )
+
+        if len(self.lazy_loads) > repeat_limit:
+            problems.append(
+                f"{len(self.lazy_loads)} lazy relationship loads (limit {repeat_limit}): "
+                + "; ".join(self.lazy_loads)
+            )
+
+        if self.executions > budget:
+            problems.append(f"{self.executions} queries (budget {budget})")
+
+        return problems
+
+
+def statement_preview(statement):
+    if statement is None:
+        return None
+    statement = re.sub(r"\s+", " ", statement).strip()
+    if len(statement) > STATEMENT_PREVIEW_CHARS:
+        return statement[:STATEMENT_PREVIEW_CHARS] + "..."
+    return statement
+
+
+def statement_shape(statement):
+    """Statement text with IN-lists of any length folded, so they compare equal."""
+
+    return re.sub(r"\((?:\?|%\(\w+\)s)(?:, (?:\?|%\(\w+\)s))+\)", "(...)", statement)
+
+
+def call_site():
+    """file:line in function of the innermost frame outside libraries (and this module)."""
+
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename != __file__ and not filename.startswith(LIBRARY_DIRECTORIES) and not filename.startswith("<"):
+            return f"{os.path.relpath(filename)}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "unknown"
+
+
+def current_stats():
+    """Stats of the request being served, or None outside requests / when disabled."""
+
+    if not has_request_context():
+        return None
+    return g.get("sql_stats")
+
+
+def query_budget(queries=None, repeats=None):
+    """
+    Override QUERY_GUARD_BUDGET and/or QUERY_GUARD_REPEAT_LIMIT for one
+    route; UNLIMITED for bulk routes whose statements repeat per batch
+    or per item of their input.
+    """
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if queries is not None:
+                g.query_budget = queries
+            if repeats is not None:
+                g.query_repeat_limit = repeats
+            return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    if current_stats() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _stop_timer(conn, cursor, statement, parameters, context, executemany):
+    stats = current_stats()
+    started = conn.info.get("query_started")
+    if stats is not None and started:
+        stats.record(statement, time.perf_counter() - started.pop(), context)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _note_lazy_load(orm_execute_state):
+    stats = current_stats()
+    if stats is None or not stats.guard or not orm_execute_state.is_select:
+        return
+
+    parent = orm_execute_state.lazy_loaded_from
+    if parent is not None:
+        mapper = orm_execute_state.bind_mapper
+        stats.record_lazy_load(f"{parent.class_.__name__} -> {mapper.class_.__name__ if mapper else '?'}")
+
+
+def init_sql_instrumentation(app):
+    """
+    Count the queries, total DB time and slowest statement of every
+    request, on the primary and the replica alike. They are returned as
+    a Server-Timing header (shown in the browser's network panel) and
+    logged as one JSON line on the "ppa.sql" logger.
+
+    Streamed responses (exports) are measured up to their first byte.
+    Off when SQL_INSTRUMENTATION_ENABLED is false.
+
+    QUERY_GUARD (warn/raise; on by default in development) also flags
+    requests that run one statement shape, or make lazy relationship
+    loads, more than QUERY_GUARD_REPEAT_LIMIT times, or that run more
+    than QUERY_GUARD_BUDGET queries (@query_budget raises it per route).
+    "warn" logs the offending call sites; "raise" fails the request
+    with QueryGuardError, so tests catch the regression.
+    """
+
+    instrumented = app.config.get("SQL_INSTRUMENTATION_ENABLED", True)
+    guard = app.config.get("QUERY_GUARD", "off")
+
+    if guard not in QUERY_GUARD_MODES:
+        raise ValueError(f"QUERY_GUARD must be one of {', '.join(QUERY_GUARD_MODES)}, not {guard!r}")
+
+    if not instrumented and guard == "off":
+        return
+
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+    @app.before_request
+    def start_query_stats():
+        g.sql_stats = RequestQueryStats(guard=guard != "off")
+
+    @app.after_request
+    def report_query_stats(response):
+        stats = g.pop("sql_stats", None)
+        if stats is None:
+            return response
+
+        request_fields = {
+            "method": request.method,
+            "path": request.path,
+            "endpoint": request.endpoint,
+            "status": response.status_code,
+        }
+
+        if instrumented:
+            response.headers["Server-Timing"] = stats.server_timing()
+            logger.info(json.dumps({"event": "request_sql", **request_fields, **stats.log_fields()}))
+
+        if stats.guard:
+            problems = stats.violations(
+                g.get("query_repeat_limit", current_app.config.get("QUERY_GUARD_REPEAT_LIMIT", 3)),
+                g.get("query_budget", current_app.config.get("QUERY_GUARD_BUDGET", 20))
+            )
+            if problems:
+                logger.warning(json.dumps({"event": "query_guard", **request_fields, "problems": problems}))
+                if guard == "raise":
+                    raise QueryGuardError(
+                        f"{request.method} {request.path}:\n  " + "\n  ".join(problems)
+                    )
+
+        return response
@@ -0,0 +1,118 @@
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from alembic.config import Config as AlembicConfig
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy.orm import configure_mappers
+
+from . import db
+
+
+class StartupTimer:
+    """Wall-clock time of consecutive startup steps, for one log line."""
+
+    def __init__(self, started=None):
+        self._started = self._last = started or time.perf_counter()
+        self.steps = {}
+
+    def mark(self, name):
+        """Ends step `name` (everything since the previous mark)."""
+
+        now = time.perf_counter()
+        self.steps[name] = now - self._last
+        self._last = now
+
+    def summary(self):
+        steps = " ".join(f"{name}={seconds * 1000:.0f}ms" for name, seconds in self.steps.items())
+        return f"{steps} total={(self._last - self._started) * 1000:.0f}ms"
+
+
+def migrations_directory(app):
+    directory = app.extensions["migrate"].directory
+    if os.path.isabs(directory):
+        return directory
+    return os.path.join(os.path.dirname(app.root_path), directory)
+
+
+def schema_revisions(app):
+    """
+    (revisions in alembic_version, head revisions of the scripts).
+    Neither loads migrations/env.py: one small query and a scan of
+    migrations/versions.
+    """
+
+    config = AlembicConfig()
+    config.set_main_option("script_location", migrations_directory(app))
+    heads = set(ScriptDirectory.from_config(config).get_heads())
+
+    with db.engine.connect() as connection:
+        current = set(MigrationContext.configure(connection).get_current_heads())
+
+    return current, heads
+
+
+def upgrade_if_needed(app):
+    """
+    Runs `flask db upgrade` unless the database is already at the
+    scripts' head. Returns the revisions it upgraded from, or None.
+
+    The upgrade runs in a child process: env.py reconfigures logging
+    from alembic.ini, which would silence the server's own loggers.
+    """
+
+    with app.app_context():
+        current, heads = schema_revisions(app)
+    if current == heads:
+        return None
+
+    subprocess.run(
+        [sys.executable, "-m", "flask", "--app", "run", "db", "upgrade",
+         "--directory", migrations_directory(app)],
+        cwd=os.path.dirname(app.root_path),
+        check=True
+    )
+    return current
+
+
+def warm_connections(app, count=None):
+    """
+    Open `count` pooled connections to every database in parallel, so
+    the first requests don't pay for TCP/TLS setup. Capped at the pool
+    size; anything more would be closed again on check-in.
+    """
+
+    count = app.config.get("DB_WARM_CONNECTIONS", 0) if count is None else count
+    opened = 0
+
+    with app.app_context():
+        for engine in db.engines.values():
+            # Pools without a size (NullPool) keep nothing to warm
+            workers = min(count, getattr(engine.pool, "size", lambda: 0)())
+            if workers <= 0:
+                continue
+
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                connections = list(executor.map(lambda _: engine.raw_connection(), range(workers)))
+
+            for connection in connections:
+                connection.close()  # back to the pool, still open
+            opened += len(connections)
+
+    return opened
+
+
+def warm_routes(app):
+    """
+    Do the work that otherwise lands on the first requests: configure
+    the ORM mappers (~100ms, on the first query) and serve one request
+    in-process (URL matcher, request/response setup).
+    """
+
+    configure_mappers()
+
+    with app.test_client() as client:
+        client.get("/")
@@ -0,0 +1,78 @@
+"""
+Shared setup for the scripts in bench/: the app on a scratch database
+with the migrated schema.
+
+The database is BENCH_DATABASE_URL (Postgres, or an SQLite file), or a
+new SQLite file in the temp directory. DATABASE_URL (and .env) are
+never used: every run wipes the database it is given.
+"""
+import os
+import sys
+import tempfile
+from datetime import date
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def scratch_app(name):
+    """
+    create_app() on an emptied BENCH_DATABASE_URL (or /tmp/ppa-bench-<name>.db),
+    upgraded to the head migration. Request logging and the query guard
+    are off unless set in the environment.
+    """
+
+    url = os.environ.get("BENCH_DATABASE_URL") or "sqlite:///" + os.path.join(
+        tempfile.gettempdir(), f"ppa-bench-{name}.db"
+    )
+
+    sqlite_path = url[len("sqlite:///"):] if url.startswith("sqlite:///") else None
+    if sqlite_path and os.path.exists(sqlite_path):
+        os.remove(sqlite_path)
+
+    # Set before the app loads .env, which never overrides existing variables
+    os.environ["DATABASE_URL"] = url
+    os.environ["DATABASE_REPLICA_URL"] = ""
+    os.environ.setdefault("JWT_SECRET_KEY", "bench-" + "x" * 32)
+    os.environ.setdefault("SQL_INSTRUMENTATION_ENABLED", "false")
+    os.environ.setdefault("QUERY_GUARD", "off")
+
+    import config
+
+    if sqlite_path:
+        # Threads queue on SQLite's single writer instead of failing with "database is locked"
+        config.Config.SQLALCHEMY_ENGINE_OPTIONS = {
+            **config.Config.SQLALCHEMY_ENGINE_OPTIONS,
+            "connect_args": {"timeout": 60}
+        }
+
+    from flask_migrate import upgrade
+    from sqlalchemy import text
+
+    from app import create_app, db
+
+    app = create_app()
+
+    with app.app_context():
+        if db.engine.dialect.name == "postgresql":
+            with db.engine.begin() as connection:
+                connection.execute(text("DROP SCHEMA public CASCADE"))
+                connection.execute(text("CREATE SCHEMA public"))
+
+        upgrade(directory=os.path.join(ROOT, "migrations"))
+        db.engine.dispose()
+
+    return app
+
+
+def create_user(name="bench"):
+    """A user row to own the benchmark accounts. Needs an app context."""
+
+    from app import db
+    from app.models import User
+
+    user = User(name=name, age=30, dob=date(1990, 1, 1), place="bench")
+    user.set_password(name)
+    db.session.add(user)
+    db.session.commit()
+    return user.id
@@ -0,0 +1,175 @@
+"""
+Concurrent postings to one bank account: the old read-modify-write
+against post_to_account's single guarded UPDATE.
+
+THREADS threads each post POSTS credits of 1 to the same bank, first the
+old way (read the balance, write balance + 1), then through
+post_to_account. Then they race withdrawals against a balance that
+covers only some of them. Exits 1 if post_to_account loses an update,
+its ledger chain disagrees with the balance, or a debit overdraws the
+account. The read-modify-write numbers are printed for comparison only:
+it loses updates whenever threads interleave.
+
+    python bench/concurrent_postings.py --threads 8 --posts 250
+    BENCH_DATABASE_URL=postgresql://.../ppa_bench python bench/concurrent_postings.py
+"""
+import argparse
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+from common import create_user, scratch_app
+
+
+def legacy_post(bank_id, user_id, amount):
+    """The pre-user-012 route body: read the balance, add in Python, write it back."""
+
+    from app import db
+    from app.models import Bank, BankTransaction
+    from app.money import money
+
+    bank = db.session.get(Bank, bank_id)
+    new_balance = money(bank.balance + amount)
+    db.session.add(BankTransaction(
+        bank_id=bank_id, user_id=user_id, amount=abs(amount),
+        transaction_type="income" if amount > 0 else "expense",
+        bank_balance_after=new_balance, date=datetime.now(timezone.utc)
+    ))
+    bank.balance = new_balance
+    db.session.commit()
+    return True
+
+
+def atomic_post(bank_id, user_id, amount):
+    from app import db
+    from app.models import Bank
+    from app.posting import post_to_account
+
+    balance, _ = post_to_account(Bank, bank_id, user_id, amount, {
+        "user_id": user_id,
+        "amount": abs(amount),
+        "transaction_type": "income" if amount > 0 else "expense",
+        "date": datetime.now(timezone.utc)
+    })
+    if balance is None:
+        db.session.rollback()
+        return False
+
+    db.session.commit()
+    return True
+
+
+def reset(bank_id, balance):
+    from app import db
+    from app.models import Bank, BankTransaction
+
+    db.session.execute(db.update(Bank).where(Bank.id == bank_id).values(balance=balance))
+    db.session.execute(db.delete(BankTransaction).where(BankTransaction.bank_id == bank_id))
+    db.session.commit()
+
+
+def race(app, post, bank_id, user_id, amount, threads, posts):
+    """Run post() from every thread; returns (seconds, applied, errors)."""
+
+    applied = [0]
+    errors = []
+    lock = threading.Lock()
+
+    def worker():
+        with app.app_context():
+            from app import db
+
+            for _ in range(posts):
+                try:
+                    ok = post(bank_id, user_id, amount)
+                except Exception as e:
+                    db.session.rollback()
+                    errors.append(type(e).__name__)
+                    continue
+                if ok:
+                    with lock:
+                        applied[0] += 1
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    return time.perf_counter() - started, applied[0], errors
+
+
+def ledger_state(bank_id):
+    """(balance, ledger rows, last balance-after), straight from the database."""
+
+    from app import db
+    from app.models import Bank, BankTransaction
+
+    db.session.expire_all()
+    balance = db.session.get(Bank, bank_id).balance
+    rows = BankTransaction.query.filter_by(bank_id=bank_id).count()
+    last = (
+        BankTransaction.query.filter_by(bank_id=bank_id)
+        .order_by(BankTransaction.id.desc()).first()
+    )
+    return balance, rows, last.bank_balance_after if last else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--posts", type=int, default=250, help="Postings per thread.")
+    args = parser.parse_args()
+
+    app = scratch_app("postings")
+    failures = []
+
+    with app.app_context():
+        from app import db
+        from app.models import Bank
+
+        user_id = create_user()
+        bank = Bank(name="bench-bank", user_id=user_id, balance=0)
+        db.session.add(bank)
+        db.session.commit()
+        bank_id = bank.id
+
+        for post in (legacy_post, atomic_post):
+            reset(bank_id, 0)
+            seconds, applied, errors = race(app, post, bank_id, user_id, 1, args.threads, args.posts)
+            balance, rows, last_after = ledger_state(bank_id)
+            lost = applied - balance
+
+            print(
+                f"{post.__name__}: {applied} credits in {seconds:.2f}s = {applied / seconds:.0f}/s, "
+                f"balance {balance:g} (expected {applied}), lost updates {lost:g}, "
+                f"ledger rows {rows}, errors {len(errors)}"
+            )
+
+            if post is atomic_post and (lost or errors or rows != applied or last_after != balance):
+                failures.append(f"{post.__name__}: lost {lost:g}, errors {set(errors)}, "
+                                f"rows {rows}, last balance-after {last_after}")
+
+        # Withdrawals racing for a balance that covers only half of them
+        covered = args.threads * args.posts // 2
+        reset(bank_id, covered)
+        seconds, applied, errors = race(app, atomic_post, bank_id, user_id, -1, args.threads, args.posts)
+        balance, rows, _ = ledger_state(bank_id)
+
+        print(
+            f"atomic_post withdrawals: {applied} of {args.threads * args.posts} applied "
+            f"against {covered}, balance {balance:g}, errors {len(errors)}"
+        )
+
+        if balance < 0 or applied != covered or rows != applied or errors:
+            failures.append(f"withdrawals: balance {balance:g}, applied {applied}, rows {rows}, errors {set(errors)}")
+
+    if failures:
+        print("\n".join(["FAILED:", *failures]))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Dashboard page loads: the three per-widget routes against /dashboard/bundle.
+
+Seeds a database like bench/explain_plans.py, then loads the dashboard
+LOADS times each way through the test client with the result cache
+off, counting the statements each page load sends to the database (apart
+from each request's data_version read for its ETag).
+The per-widget page is /dashboard/summary, /dashboard/spending and
+/dashboard/asset-allocation, the bundle is one /dashboard/bundle call.
+Exits 1 if the two disagree or the bundle needs more than one statement.
+
+    python bench/dashboard_bundle.py --loads 200
+    BENCH_DATABASE_URL=postgresql://.../ppa_bench python bench/dashboard_bundle.py
+"""
+import argparse
+import os
+import sys
+import time
+
+from common import scratch_app
+from explain_plans import seed
+
+WIDGET_URLS = [
+    "/dashboard/summary",
+    "/dashboard/spending?range={range}",
+    "/dashboard/asset-allocation",
+]
+
+BUNDLE_URL = "/dashboard/bundle?range={range}"
+
+
+def load_page(client, headers, urls):
+    """GET every url; returns their JSON bodies, or exits on an error status."""
+
+    bodies = []
+    for url in urls:
+        response = client.get(url, headers=headers)
+        if response.status_code != 200:
+            sys.exit(f"GET {url}: HTTP {response.status_code} {response.get_data(as_text=True)[:200]}")
+        bodies.append(response.get_json())
+    return bodies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--loads", type=int, default=200, help="Page loads per variant.")
+    parser.add_argument("--rows", type=int, default=20000, help="Ledger rows to seed.")
+    parser.add_argument("--range", default="30d", help="Spending range of the page.")
+    args = parser.parse_args()
+
+    # Every load must reach the database, not the memoized results
+    os.environ.setdefault("RESULT_CACHE_ENABLED", "false")
+    app = scratch_app("dashboard")
+
+    from flask_jwt_extended import create_access_token
+    from sqlalchemy import event
+
+    from app import db
+
+    with app.app_context():
+        user_id, _ = seed(users=1, accounts_per_type=4, rows=args.rows)
+        headers = {"Authorization": f"Bearer {create_access_token(identity=str(user_id))}"}
+        engine = db.engine
+
+    statements = [0, 0]
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        # etag_cached reads the owner's data_version once per request
+        statements["data_version" in statement and "FROM user" in statement] += 1
+
+    client = app.test_client()
+    variants = {
+        "per-widget": [url.format(range=args.range) for url in WIDGET_URLS],
+        "bundle": [BUNDLE_URL.format(range=args.range)],
+    }
+    results = {}
+
+    for name, urls in variants.items():
+        # Warm up connections and compiled statement caches
+        load_page(client, headers, urls)
+
+        event.listen(engine, "before_cursor_execute", count)
+        statements[:] = [0, 0]
+        started = time.perf_counter()
+        for _ in range(args.loads):
+            bodies = load_page(client, headers, urls)
+        elapsed = time.perf_counter() - started
+        event.remove(engine, "before_cursor_execute", count)
+
+        results[name] = bodies
+        per_load = statements[0] / args.loads
+        print(f"{name}: {len(urls)} request(s), {per_load:g} statement(s) "
+              f"(+{statements[1] / args.loads:g} data_version) and "
+              f"{elapsed / args.loads * 1000:.2f} ms per page load")
+
+        if name == "bundle" and per_load > 1:
+            print(f"FAILED: the bundle sent {per_load:g} statements per page load")
+            sys.exit(1)
+
+    summary, spending, allocation = results["per-widget"]
+    bundle, = results["bundle"]
+
+    if (bundle["summary"], bundle["spending"], bundle["asset_allocation"]) != (summary, spending, allocation):
+        print("FAILED: the bundle does not match the per-widget routes")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Delete a bank after saving activity, with foreign keys enforced.
+
+Opens a bank and a saving linked to it through the API, deposits into
+and withdraws from the saving, deletes the saving, drains the bank and
+deletes it. SQLite foreign keys are switched on, as Postgres always
+enforces them. Exits 1 if the ledger does not verify before the delete
+or the delete does not succeed.
+
+    python bench/delete_bank_after_savings.py
+    BENCH_DATABASE_URL=postgresql://.../ppa_bench python bench/delete_bank_after_savings.py
+"""
+import argparse
+import sys
+
+from common import create_user, scratch_app
+
+
+def enforce_foreign_keys(engine):
+    from sqlalchemy import event
+
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def connect(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--cycles", type=int, default=3, help="Deposit/withdraw pairs on the saving.")
+    args = parser.parse_args()
+
+    app = scratch_app("delete-bank")
+
+    from flask_jwt_extended import create_access_token
+
+    from app import db
+    from app.ledger import verify_ledger
+
+    with app.app_context():
+        enforce_foreign_keys(db.engine)
+        user_id = create_user()
+        headers = {"Authorization": f"Bearer {create_access_token(identity=str(user_id))}"}
+
+    client = app.test_client()
+    failures = []
+
+    def call(method, url, expected, **kwargs):
+        response = client.open(url, method=method, headers=headers, **kwargs)
+        print(f"{method} {url}: HTTP {response.status_code}")
+        if response.status_code != expected:
+            failures.append(f"{method} {url}: HTTP {response.status_code} "
+                            f"{response.get_data(as_text=True)[:200]}")
+        return response.get_json()
+
+    bank_id = call("POST", "/banks", 201, json={"name": "bench-bank", "balance": 1000})["id"]
+    saving_id = call("POST", "/savings", 201, json={"name": "bench-saving", "bank_id": bank_id})["saving"]["id"]
+
+    for _ in range(args.cycles):
+        call("POST", f"/savings/{saving_id}/transactions", 201, json={"amount": 300, "type": "deposit"})
+        call("POST", f"/savings/{saving_id}/transactions", 201, json={"amount": 300, "type": "withdrawal"})
+
+    call("DELETE", f"/savings/{saving_id}", 200)
+    call("POST", f"/banks/{bank_id}/transactions", 201, json={"amount": 1000, "type": "expense"})
+
+    with app.app_context():
+        for divergence in verify_ledger(workers=1):
+            failures.append(f"ledger {divergence['check']}: {divergence['account_type']} "
+                            f"{divergence['account_id']} expected {divergence['expected']}, "
+                            f"found {divergence['actual']}")
+
+    call("DELETE", f"/banks/{bank_id}", 200)
+
+    if failures:
+        print("\n".join(["FAILED:", *failures]))
+        sys.exit(1)
+
+    print("Bank deleted after saving activity.")
+
+
+if __name__ == "__main__":
+    main()
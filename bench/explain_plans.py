@@ -0,0 +1,191 @@
+"""
+EXPLAIN every statement the history, feed and search endpoints run
+against the transaction table, on a seeded database.
+
+Each endpoint is called through the test client. The statements it
+runs are captured and explained with their real parameters. Exits 1
+if any of them scans the whole table instead of using an index:
+"SCAN transaction" without an index on SQLite, "Seq Scan" on Postgres.
+
+    python bench/explain_plans.py --rows 1000000
+    BENCH_DATABASE_URL=postgresql://.../ppa_bench python bench/explain_plans.py
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from common import create_user, scratch_app
+
+ACCOUNT_TYPES = {
+    # subtype: (account foreign key, balance-after column, transaction types)
+    "bank_transaction": ("bank_id", "bank_balance_after", ("income", "expense")),
+    "credit_card_transaction": ("credit_card_id", "card_balance_after", ("expense", "payment")),
+    "asset_transaction": ("asset_id", "asset_balance_after", ("deposit", "withdraw")),
+    "saving_transaction": ("saving_id", "saving_balance_after", ("deposit", "withdraw")),
+}
+
+CATEGORIES = ["food", "rent", "fuel", "travel", "bills", "health", "salary", "groceries"]
+WORDS = ["coffee", "uber", "amazon", "rent", "swiggy", "electricity", "salary", "pharmacy", "flight", "book"]
+
+
+def seed(users, accounts_per_type, rows, batch_size=10000):
+    """Users with one account of each type, and `rows` ledger rows spread over two years."""
+
+    from app import db
+    from app.dashboard_service import category_ids, rebuild_spending_rollup
+    from app.models import Asset, Bank, CreditCard, Saving, Transaction
+
+    rng = random.Random(1)
+    user_ids = [create_user(f"bench{n}") for n in range(users)]
+    accounts = {subtype: [] for subtype in ACCOUNT_TYPES}
+
+    for user_id in user_ids:
+        for n in range(accounts_per_type):
+            bank = Bank(name=f"bank-{user_id}-{n}", user_id=user_id, balance=10 ** 6)
+            card = CreditCard(name=f"card-{user_id}-{n}", user_id=user_id, limit=10 ** 6)
+            asset = Asset(name=f"asset-{user_id}-{n}", category="Stocks", user_id=user_id, balance=10 ** 6)
+            db.session.add_all([bank, card, asset])
+            db.session.flush()
+
+            saving = Saving(name=f"saving-{user_id}-{n}", user_id=user_id, bank_id=bank.id, balance=10 ** 6)
+            db.session.add(saving)
+            db.session.flush()
+
+            for subtype, account in zip(ACCOUNT_TYPES, (bank, card, asset, saving)):
+                accounts[subtype].append((user_id, account.id))
+
+    ids = category_ids(CATEGORIES)
+    now = datetime.now(timezone.utc)
+    batch = []
+
+    for n in range(rows):
+        subtype = rng.choice(list(ACCOUNT_TYPES))
+        account_column, balance_after, transaction_types = ACCOUNT_TYPES[subtype]
+        user_id, account_id = rng.choice(accounts[subtype])
+        category = rng.choice(CATEGORIES)
+
+        row = dict.fromkeys(column for columns in ACCOUNT_TYPES.values() for column in columns[:2])
+        row.update({
+            "type": subtype,
+            "user_id": user_id,
+            account_column: account_id,
+            balance_after: rng.randint(0, 10 ** 5),
+            "amount": rng.randint(1, 5000),
+            "transaction_type": rng.choice(transaction_types),
+            "category": category,
+            "category_id": ids[category],
+            "description": " ".join(rng.sample(WORDS, 3)),
+            "date": now - timedelta(minutes=rng.randint(0, 2 * 365 * 24 * 60)),
+        })
+        batch.append(row)
+
+        if len(batch) >= batch_size:
+            db.session.execute(Transaction.__table__.insert(), batch)
+            batch.clear()
+
+    if batch:
+        db.session.execute(Transaction.__table__.insert(), batch)
+
+    rebuild_spending_rollup()
+    db.session.commit()
+    db.session.execute(db.text("ANALYZE"))
+    db.session.commit()
+
+    return user_ids[0], {subtype: accounts[subtype][0][1] for subtype in ACCOUNT_TYPES}
+
+
+def endpoints(account_ids):
+    return [
+        f"/banks/{account_ids['bank_transaction']}/transactions",
+        f"/credit_cards/{account_ids['credit_card_transaction']}/transactions",
+        f"/assets/{account_ids['asset_transaction']}/transactions",
+        f"/savings/{account_ids['saving_transaction']}/transactions",
+        "/transactions",
+        "/transactions?account_type=bank",
+        "/transactions/search?q=coffee",
+        "/dashboard/spending?range=3m",
+        "/dashboard/trends",
+    ]
+
+
+def explain(connection, statement, parameters):
+    """(plan lines, full table scan?) for one captured statement."""
+
+    if connection.dialect.name == "postgresql":
+        lines = [row[0] for row in connection.exec_driver_sql("EXPLAIN " + statement, parameters)]
+        return lines, any('Seq Scan on "transaction"' in line or "Seq Scan on transaction" in line
+                          for line in lines)
+
+    lines = [row[-1] for row in connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)]
+    return lines, any(
+        line.startswith("SCAN transaction") and "INDEX" not in line
+        for line in lines
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000, help="Ledger rows to seed.")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--accounts", type=int, default=4, help="Accounts of each type per user.")
+    args = parser.parse_args()
+
+    app = scratch_app("explain")
+
+    from flask_jwt_extended import create_access_token
+    from sqlalchemy import event
+
+    from app import db
+
+    with app.app_context():
+        started = time.perf_counter()
+        user_id, account_ids = seed(args.users, args.accounts, args.rows)
+        print(f"Seeded {args.rows} ledger rows in {time.perf_counter() - started:.1f}s")
+
+        headers = {"Authorization": f"Bearer {create_access_token(identity=str(user_id))}"}
+        engine = db.engine
+
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if '"transaction"' in statement or "transaction." in statement:
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    client = app.test_client()
+    full_scans = 0
+
+    for url in endpoints(account_ids):
+        captured.clear()
+        started = time.perf_counter()
+        response = client.get(url, headers=headers)
+        elapsed = (time.perf_counter() - started) * 1000
+
+        if response.status_code != 200:
+            print(f"\n{url}: HTTP {response.status_code} {response.get_data(as_text=True)[:200]}")
+            full_scans += 1
+            continue
+
+        print(f"\nGET {url}  {elapsed:.1f} ms, {len(captured)} statement(s) on transaction")
+
+        statements = list(captured)
+        with engine.connect() as connection:
+            for statement, parameters in statements:
+                lines, full_scan = explain(connection, statement, parameters)
+                full_scans += full_scan
+                for line in lines:
+                    print(f"  {'!! ' if full_scan else ''}{line}")
+
+    event.remove(engine, "before_cursor_execute", capture)
+
+    if full_scans:
+        print(f"\n{full_scans} statement(s) scan the whole transaction table (or failed)")
+        sys.exit(1)
+
+    print("\nEvery statement uses an index.")
+
+
+if __name__ == "__main__":
+    main()
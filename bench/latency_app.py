@@ -0,0 +1,27 @@
+"""
+run:app with a sleep before every SQL statement, standing in for the
+network round trip to a remote database (BENCH_SQL_LATENCY_MS, default
+0). Served by bench/load_test.py; `python bench/latency_app.py` runs it
+on the Werkzeug server like run.py.
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from run import app
+
+LATENCY = float(os.environ.get("BENCH_SQL_LATENCY_MS", 0)) / 1000
+
+if LATENCY:
+    @event.listens_for(Engine, "before_cursor_execute")
+    def simulate_round_trip(conn, cursor, statement, parameters, context, executemany):
+        time.sleep(LATENCY)
+
+
+if __name__ == "__main__":
+    app.run(host="127.0.0.1", port=int(os.environ.get("PORT", 5000)))
@@ -0,0 +1,231 @@
+"""
+HTTP load test of the three ways to serve the app.
+
+Seeds USERS users with TRANSACTIONS bank transactions each, starts the
+server as a subprocess and drives it with CONCURRENCY threads for
+DURATION seconds: 45% GET /dashboard/summary, 25% GET /transactions,
+20% GET /banks and 10% POST /banks/<id>/transactions. Every SQL
+statement sleeps --latency-ms first, standing in for the round trip to
+a hosted database (bench/latency_app.py). Prints requests per second,
+p50/p95 latency, non-2xx responses and the server's total PSS
+(proportional set size, Linux only).
+
+Modes:
+    werkzeug       python run.py
+    gunicorn-sync  gunicorn run:app, one sync worker, no gunicorn.conf.py
+    gunicorn       gunicorn run:app with gunicorn.conf.py (gthread, preload)
+
+    python bench/load_test.py --mode gunicorn --concurrency 8 --duration 20
+    for mode in werkzeug gunicorn-sync gunicorn; do python bench/load_test.py --mode $mode; done
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from common import ROOT, create_user, scratch_app
+
+BENCH_DIR = os.path.join(ROOT, "bench")
+
+REQUEST_MIX = [
+    # (weight, method, path); {bank_id} is the user's bank
+    (45, "GET", "/dashboard/summary"),
+    (25, "GET", "/transactions"),
+    (20, "GET", "/banks"),
+    (10, "POST", "/banks/{bank_id}/transactions"),
+]
+
+SERVER_COMMANDS = {
+    "werkzeug": [sys.executable, os.path.join(BENCH_DIR, "latency_app.py")],
+    "gunicorn-sync": ["gunicorn", "--config", os.devnull, "--workers", "1", "--bind", "127.0.0.1:{port}",
+                      "--pythonpath", BENCH_DIR, "latency_app:app"],
+    "gunicorn": ["gunicorn", "--config", "gunicorn.conf.py", "--bind", "127.0.0.1:{port}",
+                 "--pythonpath", BENCH_DIR, "latency_app:app"],
+}
+
+
+def seed(app, users, transactions):
+    """Users with one bank each and `transactions` postings; returns [(token, bank_id)]."""
+
+    from flask_jwt_extended import create_access_token
+
+    client = app.test_client()
+    accounts = []
+
+    for n in range(users):
+        with app.app_context():
+            user_id = create_user(f"load{n}")
+            token = create_access_token(identity=str(user_id))
+
+        headers = {"Authorization": f"Bearer {token}"}
+        bank_id = client.post("/banks", json={"name": f"load-bank-{n}", "balance": 10 ** 6},
+                              headers=headers).get_json()["id"]
+
+        for k in range(transactions):
+            client.post(f"/banks/{bank_id}/transactions", headers=headers, json={
+                "amount": random.randint(1, 5000),
+                "type": "expense" if k % 3 else "income",
+                "category": random.choice(["Food", "Rent", "Fuel", "Salary"]),
+                "description": f"seed {k}"
+            })
+
+        accounts.append((token, bank_id))
+
+    return accounts
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(mode, port, latency_ms):
+    env = {
+        **os.environ,
+        "PORT": str(port),
+        "BENCH_SQL_LATENCY_MS": str(latency_ms),
+        "MIGRATE_ON_START": "false",
+    }
+    env.pop("FLASK_ENV", None)
+
+    command = [part.format(port=port) for part in SERVER_COMMANDS[mode]]
+    server = subprocess.Popen(command, cwd=ROOT, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            sys.exit(f"{mode} server exited with status {server.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return server
+        except OSError:
+            time.sleep(0.2)
+
+    server.terminate()
+    sys.exit(f"{mode} server did not start listening within 60s")
+
+
+def process_tree(pid):
+    pids = [pid]
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as children:
+            for child in children.read().split():
+                pids.extend(process_tree(int(child)))
+    except OSError:
+        pass
+    return pids
+
+
+def pss_mb(pid):
+    """Total PSS of the server and its workers in MB, or None off Linux."""
+
+    total = 0
+    for process in process_tree(pid):
+        try:
+            with open(f"/proc/{process}/smaps_rollup") as rollup:
+                for line in rollup:
+                    if line.startswith("Pss:"):
+                        total += int(line.split()[1])
+        except OSError:
+            return None
+    return total / 1024
+
+
+def drive(port, accounts, concurrency, duration):
+    """Returns (latencies in ms, non-2xx or failed requests)."""
+
+    latencies = []
+    failures = []
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    weights = [weight for weight, _, _ in REQUEST_MIX]
+
+    def worker(n):
+        rng = random.Random(n)
+        token, bank_id = accounts[n % len(accounts)]
+        headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        mine, failed = [], []
+
+        while time.monotonic() < stop_at:
+            _, method, path = rng.choices(REQUEST_MIX, weights)[0]
+            body = json.dumps({"amount": 1, "type": "income"}) if method == "POST" else None
+
+            started = time.perf_counter()
+            try:
+                connection.request(method, path.format(bank_id=bank_id), body=body, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                status = response.status
+            except (OSError, http.client.HTTPException) as e:
+                connection.close()
+                connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                failed.append(f"{method} {path}: {type(e).__name__}")
+                continue
+
+            mine.append((time.perf_counter() - started) * 1000)
+            if not 200 <= status < 300:
+                failed.append(f"{method} {path}: HTTP {status}")
+
+        connection.close()
+        with lock:
+            latencies.extend(mine)
+            failures.extend(failed)
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    return latencies, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mode", choices=SERVER_COMMANDS, default="gunicorn")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=20, help="Seconds of load.")
+    parser.add_argument("--latency-ms", type=float, default=3, help="Simulated round trip per SQL statement.")
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--transactions", type=int, default=300, help="Seeded bank transactions per user.")
+    args = parser.parse_args()
+
+    app = scratch_app("load")
+    accounts = seed(app, args.users, args.transactions)
+
+    port = free_port()
+    server = start_server(args.mode, port, args.latency_ms)
+
+    try:
+        latencies, failures = drive(port, accounts, args.concurrency, args.duration)
+        memory = pss_mb(server.pid)
+    finally:
+        server.terminate()
+        server.wait(timeout=60)
+
+    if not latencies:
+        sys.exit("No request completed")
+
+    quantiles = statistics.quantiles(latencies, n=20)
+    print(
+        f"{args.mode}: concurrency {args.concurrency}, {len(latencies) / args.duration:.0f} rps, "
+        f"p50 {quantiles[9]:.0f}ms, p95 {quantiles[18]:.0f}ms, "
+        f"PSS {'n/a' if memory is None else f'{memory:.0f}MB'}, "
+        f"{len(failures)} failed"
+        + (f" ({', '.join(sorted(set(failures))[:5])})" if failures else "")
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Money arithmetic and post_to_account throughput.
+
+In memory, POSTINGS random amounts are added to a balance the old way
+(Decimal quantize per posting, as money() did before paise) and the
+integer way (to_paise), and summed as raw paise like the billing loop.
+Then DB_POSTINGS postings go through post_to_account on a scratch
+database: as separate statements, and on Postgres also as the
+single-statement CTE. Exits 1 if the two arithmetic paths end on
+different balances, round a sampled amount differently, or a database
+run's balance and ledger disagree with what was posted.
+
+    python bench/money_postings.py --postings 1000000 --db-postings 10000
+    BENCH_DATABASE_URL=postgresql://.../ppa_bench python bench/money_postings.py
+"""
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from decimal import ROUND_HALF_UP, Decimal
+
+from common import create_user, scratch_app
+
+
+def decimal_money(value):
+    """money() before user-011: round through Decimal(str(value))."""
+
+    if value is None:
+        return 0.0
+
+    return float(Decimal(str(value)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP))
+
+
+def timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - started, result
+
+
+def decimal_postings(amounts):
+    balance = 0.0
+    for amount in amounts:
+        balance = decimal_money(balance + amount)
+    return balance
+
+
+def paise_postings(amounts):
+    from app.money import from_paise, to_paise
+
+    balance = 0
+    for amount in amounts:
+        balance += to_paise(amount)
+    return from_paise(balance)
+
+
+def arithmetic(postings, failures):
+    from app.money import money
+
+    rng = random.Random(1)
+    amounts = [rng.randint(1, 10 ** 7) / 100 for _ in range(postings)]
+    paise = [round(amount * 100) for amount in amounts]
+
+    seconds, decimal_balance = timed(decimal_postings, amounts)
+    print(f"Decimal money() per posting: {postings} postings in {seconds:.2f}s")
+
+    seconds, paise_balance = timed(paise_postings, amounts)
+    print(f"Integer paise per posting:   {postings} postings in {seconds:.2f}s")
+
+    seconds, _ = timed(sum, paise)
+    print(f"Billing loop on raw paise:   {postings} amounts in {seconds:.3f}s")
+
+    if decimal_balance != paise_balance:
+        failures.append(f"final balances differ: Decimal {decimal_balance}, paise {paise_balance}")
+
+    # Three decimals, so half-paise ties are exercised
+    samples = [rng.randint(-10 ** 8, 10 ** 8) / 1000 for _ in range(200000)]
+    mismatches = [value for value in samples if money(value) != decimal_money(value)]
+    print(f"Rounding: {len(mismatches)} of {len(samples)} sampled amounts differ from Decimal")
+
+    if mismatches:
+        failures.append(f"rounding differs for {len(mismatches)} amounts, e.g. {mismatches[:5]}")
+
+
+def database_postings(app, post, postings, failures):
+    """post() postings of 0.01 to a fresh bank, committing each like a route does."""
+
+    from app import db
+    from app.models import Bank, BankTransaction
+    from app.posting import balance_update
+
+    with app.app_context():
+        user_id = create_user(f"bench-{post.__name__}")
+        bank = Bank(name=f"bank-{post.__name__}", user_id=user_id, balance=0)
+        db.session.add(bank)
+        db.session.commit()
+        bank_id = bank.id
+
+        started = time.perf_counter()
+        for _ in range(postings):
+            post(Bank, balance_update(Bank, bank_id, user_id, 0.01), {
+                "user_id": user_id,
+                "amount": 0.01,
+                "transaction_type": "income",
+                "date": datetime.now(timezone.utc)
+            })
+            db.session.commit()
+        seconds = time.perf_counter() - started
+
+        db.session.expire_all()
+        balance = db.session.get(Bank, bank_id).balance
+        rows = BankTransaction.query.filter_by(bank_id=bank_id).count()
+
+    print(f"post_to_account {post.__name__}: {postings} postings in {seconds:.2f}s "
+          f"= {postings / seconds:.0f}/s, balance {balance:g}, ledger rows {rows}")
+
+    if balance != postings / 100 or rows != postings:
+        failures.append(f"{post.__name__}: balance {balance:g}, rows {rows}, expected {postings / 100:g} and {postings}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--postings", type=int, default=1000000, help="In-memory postings.")
+    parser.add_argument("--db-postings", type=int, default=10000, help="post_to_account calls per variant.")
+    args = parser.parse_args()
+
+    app = scratch_app("money")
+    failures = []
+
+    arithmetic(args.postings, failures)
+
+    from app import db
+    from app.posting import _post_in_one_statement, _post_in_steps
+
+    with app.app_context():
+        postgres = db.engine.dialect.name == "postgresql"
+
+    database_postings(app, _post_in_steps, args.db_postings, failures)
+    if postgres:
+        database_postings(app, _post_in_one_statement, args.db_postings, failures)
+    else:
+        print("post_to_account _post_in_one_statement: Postgres only (SQLite has no DML in CTEs)")
+
+    if failures:
+        print("\n".join(["FAILED:", *failures]))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
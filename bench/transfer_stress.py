@@ -0,0 +1,165 @@
+"""
+Opposing batch transfers between the same three accounts, in parallel.
+
+Two banks and an asset start with 10000 each. THREADS threads each
+apply BATCHES batches of two transfers through apply_transfers: even
+threads move A -> B -> S, odd threads S -> B -> A, so every pair of
+threads locks the same accounts from opposite ends. Exits 1 if any
+batch fails with a database error (a deadlock or lock timeout), money
+is created or lost, a committed batch is missing transfer rows, or
+`flask ledger verify` would report a divergence.
+
+    python bench/transfer_stress.py --threads 8 --batches 200
+    BENCH_DATABASE_URL=postgresql://.../ppa_bench python bench/transfer_stress.py
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+from common import create_user, scratch_app
+
+OPENING_BALANCE = 10000
+
+
+def open_accounts(app, user_id):
+    """Two banks and an asset, opened through the API so their ledger starts consistent."""
+
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        headers = {"Authorization": f"Bearer {create_access_token(identity=str(user_id))}"}
+
+    client = app.test_client()
+
+    for url, payload in (
+        ("/banks", {"name": "bench-a"}),
+        ("/banks", {"name": "bench-b"}),
+        ("/assets", {"name": "bench-s", "category": "Stocks"}),
+    ):
+        response = client.post(url, json={**payload, "balance": OPENING_BALANCE}, headers=headers)
+        if response.status_code != 201:
+            sys.exit(f"POST {url}: HTTP {response.status_code} {response.get_data(as_text=True)[:200]}")
+
+    with app.app_context():
+        from app.models import Asset, Bank
+
+        # POST /assets does not return the new id
+        return [
+            ("bank", Bank.query.filter_by(user_id=user_id, name="bench-a").one().id),
+            ("bank", Bank.query.filter_by(user_id=user_id, name="bench-b").one().id),
+            ("asset", Asset.query.filter_by(user_id=user_id, name="bench-s").one().id),
+        ]
+
+
+def transfer(source, target, amount):
+    return {
+        "from_account_type": source[0],
+        "from_account_id": source[1],
+        "to_account_type": target[0],
+        "to_account_id": target[1],
+        "amount": amount,
+        "fee": 0,
+        "date": datetime.now(timezone.utc)
+    }
+
+
+def race(app, user_id, accounts, threads, batches):
+    """Run the batches from every thread; returns (seconds, outcome counts, error names)."""
+
+    outcomes = Counter()
+    errors = []
+    lock = threading.Lock()
+
+    def worker(n):
+        from app import db
+        from app.posting import apply_transfers
+
+        rng = random.Random(n)
+        path = accounts if n % 2 == 0 else accounts[::-1]
+
+        with app.app_context():
+            for _ in range(batches):
+                batch = [
+                    transfer(path[0], path[1], rng.randint(1, 50)),
+                    transfer(path[1], path[2], rng.randint(1, 50)),
+                ]
+                try:
+                    _, error = apply_transfers(user_id, batch)
+                    if error:
+                        db.session.rollback()
+                        outcome = "insufficient"
+                    else:
+                        db.session.commit()
+                        outcome = "committed"
+                except Exception as e:
+                    db.session.rollback()
+                    errors.append(type(e).__name__)
+                    outcome = "errors"
+
+                with lock:
+                    outcomes[outcome] += 1
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    return time.perf_counter() - started, outcomes, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--batches", type=int, default=200, help="Two-transfer batches per thread.")
+    args = parser.parse_args()
+
+    app = scratch_app("transfers")
+
+    with app.app_context():
+        user_id = create_user()
+
+    accounts = open_accounts(app, user_id)
+    seconds, outcomes, errors = race(app, user_id, accounts, args.threads, args.batches)
+    failures = []
+
+    with app.app_context():
+        from app import db
+        from app.ledger import verify_ledger
+        from app.models import Asset, Bank, TransferTransaction
+
+        models = {"bank": Bank, "asset": Asset}
+        total = sum(db.session.get(models[account_type], account_id).balance
+                    for account_type, account_id in accounts)
+        transfers = TransferTransaction.query.filter_by(user_id=user_id).count()
+        divergences = list(verify_ledger(workers=1))
+
+    print(
+        f"{args.threads} threads x {args.batches} batches in {seconds:.2f}s: "
+        f"{outcomes['committed']} committed, {outcomes['insufficient']} rejected for funds, "
+        f"{outcomes['errors']} errors; total {total:g} (expected {3 * OPENING_BALANCE}), "
+        f"transfer rows {transfers}, ledger divergences {len(divergences)}"
+    )
+
+    if errors:
+        failures.append(f"database errors: {dict(Counter(errors))}")
+    if total != 3 * OPENING_BALANCE:
+        failures.append(f"total balance {total:g}, expected {3 * OPENING_BALANCE}")
+    if transfers != 2 * outcomes["committed"]:
+        failures.append(f"{transfers} transfer rows for {outcomes['committed']} committed batches")
+    for divergence in divergences[:10]:
+        failures.append(f"{divergence['check']}: {divergence['account_type']} {divergence['account_id']} "
+                        f"expected {divergence['expected']}, found {divergence['actual']}")
+
+    if failures:
+        print("\n".join(["FAILED:", *failures]))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
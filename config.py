@@ -4,12 +4,54 @@ from datetime import timedelta
 
 load_dotenv()
 
+# ✅ Named SQLALCHEMY_ENGINE_OPTIONS, picked with DB_ENGINE_PROFILE.
+# Pools are per process: every gunicorn worker opens up to
+# pool_size + max_overflow connections to each database.
+ENGINE_PROFILES = {
+    # Direct connection to a single Postgres (or SQLite) with defaults
+    'default': {
+        'pool_pre_ping': True,
+        'pool_recycle': 1800,
+    },
+    # Supabase pooler (Supavisor/pgbouncer, port 6543): it owns the real
+    # server connections, so keep few client connections per worker and
+    # drop them before the pooler's idle timeout closes them under us
+    'supabase-pooler': {
+        'pool_size': 3,
+        'max_overflow': 2,
+        'pool_timeout': 10,
+        'pool_recycle': 300,
+        'pool_pre_ping': True,
+        'pool_use_lifo': True,  # surplus idle connections age out instead of being rotated
+    },
+    # docker-compose Postgres on the same host: cheap connections, no idle timeouts
+    'local': {
+        'pool_size': 10,
+        'max_overflow': 10,
+        'pool_pre_ping': False,
+    },
+}
+
 class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SECRET_KEY = os.environ.get('SECRET_KEY', os.urandom(24))
     
     SQLALCHEMY_DATABASE_URI = os.environ["DATABASE_URL"]
 
+    # ✅ Connection pool settings, see ENGINE_PROFILES
+    DB_ENGINE_PROFILE = os.environ.get('DB_ENGINE_PROFILE', 'default')
+    SQLALCHEMY_ENGINE_OPTIONS = dict(ENGINE_PROFILES[DB_ENGINE_PROFILE])
+
+    # ✅ Optional read replica for authenticated GET requests (see app/db_routing.py);
+    # writes and everything else stay on DATABASE_URL
+    DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL')
+    SQLALCHEMY_BINDS = {'replica': DATABASE_REPLICA_URL} if DATABASE_REPLICA_URL else {}
+
+    # ✅ gunicorn startup (see gunicorn.conf.py): upgrade the schema only when it
+    # is behind the migration scripts, and open this many connections per worker
+    MIGRATE_ON_START = os.environ.get('MIGRATE_ON_START', 'true').lower() == 'true'
+    DB_WARM_CONNECTIONS = int(os.environ.get('DB_WARM_CONNECTIONS', 2))
+
     # ✅ JWT configuration
     JWT_SECRET_KEY = os.environ["JWT_SECRET_KEY"]  # Pull from .env
     JWT_TOKEN_LOCATION = ['headers']
@@ -17,6 +59,21 @@ class Config:
     JWT_HEADER_TYPE = 'Bearer'                  # ✅ Required
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(days=1)
 
+    # ✅ Per-user result cache (dashboard, dropdowns)
+    RESULT_CACHE_ENABLED = os.environ.get('RESULT_CACHE_ENABLED', 'true').lower() == 'true'
+    RESULT_CACHE_TTL = int(os.environ.get('RESULT_CACHE_TTL', 30))                  # seconds
+    RESULT_CACHE_MAX_ENTRIES = int(os.environ.get('RESULT_CACHE_MAX_ENTRIES', 1024))
+    RESULT_CACHE_URL = os.environ.get('RESULT_CACHE_URL')                           # e.g. redis://... to share across workers
+    RESULT_CACHE_STATS_ENABLED = os.environ.get('RESULT_CACHE_STATS_ENABLED', 'false').lower() == 'true'  # process-wide counters at /dashboard/cache-stats
+
+    # ✅ Per-request query count / DB time: Server-Timing header + one log line per request
+    SQL_INSTRUMENTATION_ENABLED = os.environ.get('SQL_INSTRUMENTATION_ENABLED', 'true').lower() == 'true'
+
+    # ✅ N+1 / query budget guard (off | warn | raise), see app/sql_instrumentation.py
+    QUERY_GUARD = os.environ.get('QUERY_GUARD', 'warn' if os.environ.get('FLASK_ENV') == 'development' else 'off')
+    QUERY_GUARD_REPEAT_LIMIT = int(os.environ.get('QUERY_GUARD_REPEAT_LIMIT', 3))   # same statement / lazy loads per request
+    QUERY_GUARD_BUDGET = int(os.environ.get('QUERY_GUARD_BUDGET', 20))              # queries per request, @query_budget overrides
+
 class DevelopmentConfig(Config):
     DEBUG = True
 
@@ -0,0 +1,107 @@
+"""
+Production gunicorn settings, read automatically by `gunicorn run:app`
+from the working directory (start.sh, Procfile).
+
+Every value can be overridden from the environment, e.g. on Render:
+WEB_CONCURRENCY=3 GUNICORN_THREADS=8 gunicorn run:app
+"""
+import gc
+import multiprocessing
+import os
+import time
+
+# Start of the startup timing breakdown: the app is preloaded right after this file
+CONFIG_LOADED_AT = time.perf_counter()
+
+# ✅ Listen where Render / Docker expect us
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+
+# ✅ Threaded workers: requests mostly wait on the database, so threads
+# overlap that I/O while processes use the cores
+worker_class = "gthread"
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+# ✅ Import the app once in the master and fork it, so the workers
+# share its memory copy-on-write and start instantly
+preload_app = True
+
+# ✅ Timeouts (seconds). Exports stream for a while, so allow 60s per request;
+# on SIGTERM in-flight requests get graceful_timeout to finish
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 60))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = 5
+
+# ✅ Recycle workers now and then to cap slow memory growth; jitter keeps
+# them from all restarting at once
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = 200
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
+
+
+def on_starting(server):
+    """
+    Once, in the master, before the port is bound: bring the schema to
+    head if it is behind (a single query when it isn't) and warm the
+    routes, so the forked workers inherit all of it.
+    """
+
+    from run import app
+    from app import db
+    from app.startup import StartupTimer, upgrade_if_needed, warm_routes
+
+    timer = StartupTimer(CONFIG_LOADED_AT)
+    timer.mark("load_app")
+
+    if app.config["MIGRATE_ON_START"]:
+        upgraded_from = upgrade_if_needed(app)
+        if upgraded_from is not None:
+            server.log.info("Upgraded database schema from %s", ", ".join(sorted(upgraded_from)) or "empty")
+    timer.mark("schema")
+
+    warm_routes(app)
+    timer.mark("warm_routes")
+
+    # The master never serves requests; don't keep its connections open
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+
+    server.log.info("Master startup: %s", timer.summary())
+
+
+def pre_fork(server, worker):
+    """
+    Move everything the preloaded app allocated out of the garbage
+    collector's reach, so collections in the workers don't write to
+    (and un-share) those copy-on-write pages.
+    """
+
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """
+    Connections the master opened while loading the app must not be
+    shared with the children. Drop the inherited pools (without closing
+    the parent's sockets) so each worker opens its own, then open
+    DB_WARM_CONNECTIONS of them before the worker accepts requests.
+    """
+
+    from run import app
+    from app import db
+    from app.startup import StartupTimer, warm_connections
+
+    timer = StartupTimer()
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+    opened = warm_connections(app)
+    timer.mark(f"warm_pool({opened})")
+
+    server.log.info("Worker %s startup: %s", worker.pid, timer.summary())
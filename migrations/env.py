@@ -90,9 +90,19 @@ def run_migrations_online():
                 directives[:] = []
                 logger.info('No changes in schema detected.')
 
+    # Search objects come from raw DDL (TRANSACTION_SEARCH_DDL in app/models.py)
+    # and are not in the metadata; keep autogenerate from dropping them
+    def include_object(object, name, type_, reflected, compare_to):
+        if reflected and compare_to is None and name and name.startswith(
+                ('transaction_fts', 'ix_transaction_description_')):
+            return False
+        return True
+
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    if conf_args.get("include_object") is None:
+        conf_args["include_object"] = include_object
 
     connectable = get_engine()
 
@@ -0,0 +1,56 @@
+"""Add spending_rollup table
+
+Revision ID: 0f6d2a8c9b13
+Revises: e3b9d41a7c20
+Create Date: 2026-10-18 12:30:44.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0f6d2a8c9b13'
+down_revision = 'e3b9d41a7c20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('spending_rollup',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('category', sa.String(length=50), nullable=False),
+    sa.Column('account_type', sa.String(length=20), nullable=False),
+    sa.Column('transaction_type', sa.String(length=20), nullable=False),
+    sa.Column('total', sa.Float(), nullable=False),
+    sa.Column('txn_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'day', 'category', 'account_type', 'transaction_type')
+    )
+
+    if op.get_bind().dialect.name == 'postgresql':
+        day = "CAST(timezone('Asia/Kolkata', timezone('UTC', date)) AS DATE)"
+    else:
+        day = "date(date, '+330 minutes')"
+
+    category = "COALESCE(NULLIF(lower(trim(category)), ''), 'uncategorized')"
+    account_type = (
+        "CASE type WHEN 'bank_transaction' THEN 'bank' "
+        "WHEN 'credit_card_transaction' THEN 'credit_card' END"
+    )
+
+    op.execute(f"""
+        INSERT INTO spending_rollup
+            (user_id, day, category, account_type, transaction_type, total, txn_count)
+        SELECT user_id, {day}, {category}, {account_type}, transaction_type,
+               SUM(ABS(amount)), COUNT(*)
+        FROM "transaction"
+        WHERE type IN ('bank_transaction', 'credit_card_transaction')
+          AND transaction_type IS NOT NULL
+        GROUP BY user_id, {day}, {category}, {account_type}, transaction_type
+    """)
+
+
+def downgrade():
+    op.drop_table('spending_rollup')
@@ -0,0 +1,90 @@
+"""Store money columns as BIGINT paise
+
+Revision ID: 3d8e5b71c4a6
+Revises: 7a4c2e91d5f8
+Create Date: 2026-10-18 15:02:44.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3d8e5b71c4a6'
+down_revision = '7a4c2e91d5f8'
+branch_labels = None
+depends_on = None
+
+
+MONEY_COLUMNS = {
+    'credit_card': ['limit', 'used', 'last_payment_amount', 'billed_unpaid', 'unbilled_spends'],
+    'credit_card_statement': ['opening_balance', 'spends', 'payments', 'closing_due'],
+    'asset': ['balance'],
+    'bank': ['balance'],
+    'saving': ['balance'],
+    'transaction': ['amount', 'bank_balance_after', 'card_balance_after',
+                    'asset_balance_after', 'saving_balance_after'],
+    'transfer_transaction': ['amount', 'fee'],
+    'spending_rollup': ['total'],
+}
+
+# The SQLite table rebuild reflects these without their DESC ordering
+ACCOUNT_DATE_INDEXES = {
+    'ix_transaction_bank_date': ('bank_id', 'bank_transaction'),
+    'ix_transaction_credit_card_date': ('credit_card_id', 'credit_card_transaction'),
+    'ix_transaction_asset_date': ('asset_id', 'asset_transaction'),
+    'ix_transaction_saving_date': ('saving_id', 'saving_transaction'),
+}
+
+
+def rebuild_money_columns(from_type, to_type):
+    for table, columns in MONEY_COLUMNS.items():
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for column in columns:
+                batch_op.alter_column(column, existing_type=from_type, type_=to_type)
+
+    for name, (account_column, discriminator) in ACCOUNT_DATE_INDEXES.items():
+        op.drop_index(name, table_name='transaction')
+        op.create_index(
+            name, 'transaction', [account_column, sa.text('date DESC')],
+            sqlite_where=sa.text(f"type = '{discriminator}'")
+        )
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        for table, columns in MONEY_COLUMNS.items():
+            for column in columns:
+                op.alter_column(
+                    table, column,
+                    existing_type=sa.Float(),
+                    type_=sa.BigInteger(),
+                    postgresql_using=f'round("{column}" * 100)::bigint'
+                )
+        return
+
+    # SQLite: scale in place, then rebuild each table with the new column types
+    for table, columns in MONEY_COLUMNS.items():
+        assignments = ', '.join(f'"{column}" = round("{column}" * 100)' for column in columns)
+        op.execute(f'UPDATE "{table}" SET {assignments}')
+
+    rebuild_money_columns(sa.Float(), sa.BigInteger())
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        for table, columns in MONEY_COLUMNS.items():
+            for column in columns:
+                op.alter_column(
+                    table, column,
+                    existing_type=sa.BigInteger(),
+                    type_=sa.Float(),
+                    postgresql_using=f'"{column}" / 100.0'
+                )
+        return
+
+    rebuild_money_columns(sa.BigInteger(), sa.Float())
+
+    for table, columns in MONEY_COLUMNS.items():
+        assignments = ', '.join(f'"{column}" = "{column}" / 100.0' for column in columns)
+        op.execute(f'UPDATE "{table}" SET {assignments}')
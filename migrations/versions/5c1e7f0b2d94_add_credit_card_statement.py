@@ -0,0 +1,39 @@
+"""Add credit_card_statement table
+
+Revision ID: 5c1e7f0b2d94
+Revises: a932323d18dc
+Create Date: 2026-10-18 11:02:17.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c1e7f0b2d94'
+down_revision = 'a932323d18dc'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('credit_card_statement',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('credit_card_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('cycle_start', sa.Date(), nullable=False),
+    sa.Column('cycle_end', sa.Date(), nullable=False),
+    sa.Column('opening_balance', sa.Float(), nullable=False),
+    sa.Column('spends', sa.Float(), nullable=False),
+    sa.Column('payments', sa.Float(), nullable=False),
+    sa.Column('closing_due', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['credit_card_id'], ['credit_card.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('credit_card_id', 'cycle_end', name='uq_credit_card_statement_card_cycle_end')
+    )
+
+
+def downgrade():
+    op.drop_table('credit_card_statement')
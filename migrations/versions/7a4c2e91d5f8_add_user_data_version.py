@@ -0,0 +1,26 @@
+"""Add user.data_version for ETags
+
+Revision ID: 7a4c2e91d5f8
+Revises: 0f6d2a8c9b13
+Create Date: 2026-10-18 13:21:09.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a4c2e91d5f8'
+down_revision = '0f6d2a8c9b13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('data_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('data_version')
@@ -0,0 +1,102 @@
+"""Add double-entry journal and balance checkpoints
+
+Revision ID: 9c2f4a6e1b57
+Revises: 3d8e5b71c4a6
+Create Date: 2026-10-18 16:40:12.000000
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c2f4a6e1b57'
+down_revision = '3d8e5b71c4a6'
+branch_labels = None
+depends_on = None
+
+
+# account_type -> (table, balance expression in paise); cards carry -used
+OPENING_BALANCES = {
+    'bank': ('bank', 'balance'),
+    'asset': ('asset', 'balance'),
+    'saving': ('saving', 'balance'),
+    'credit_card': ('credit_card', '-"used"'),
+}
+
+
+def upgrade():
+    journal_entry = op.create_table('journal_entry',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=30), nullable=False),
+    sa.Column('description', sa.String(length=200), nullable=True),
+    sa.Column('posted_at', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    journal_posting = op.create_table('journal_posting',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('entry_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('account_type', sa.String(length=20), nullable=False),
+    sa.Column('account_id', sa.Integer(), nullable=True),
+    sa.Column('amount', sa.BigInteger(), nullable=False),
+    sa.Column('posted_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['entry_id'], ['journal_entry.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_journal_posting_account', 'journal_posting',
+                    ['account_type', 'account_id', 'posted_at', 'id'], unique=False)
+    op.create_index('ix_journal_posting_entry_id', 'journal_posting', ['entry_id'], unique=False)
+
+    op.create_table('balance_checkpoint',
+    sa.Column('account_type', sa.String(length=20), nullable=False),
+    sa.Column('account_id', sa.Integer(), nullable=False),
+    sa.Column('posting_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('posted_at', sa.DateTime(), nullable=False),
+    sa.Column('balance', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('account_type', 'account_id', 'posting_id')
+    )
+    op.create_index('ix_balance_checkpoint_account_posted_at', 'balance_checkpoint',
+                    ['account_type', 'account_id', 'posted_at'], unique=False)
+
+    # Existing balances become opening entries against the external account;
+    # the older ledger rows cannot be replayed because the starting balances
+    # they were applied to were never recorded.
+    connection = op.get_bind()
+    now = datetime.utcnow()
+
+    for account_type, (table, balance) in OPENING_BALANCES.items():
+        accounts = connection.execute(sa.text(
+            f'SELECT id, user_id, {balance} AS balance FROM "{table}" WHERE {balance} <> 0 ORDER BY id'
+        )).all()
+
+        for account in accounts:
+            entry_id = connection.execute(
+                journal_entry.insert().returning(journal_entry.c.id),
+                {'user_id': account.user_id, 'kind': 'opening', 'description': None,
+                 'posted_at': now, 'created_at': now}
+            ).scalar()
+
+            connection.execute(journal_posting.insert(), [
+                {'entry_id': entry_id, 'user_id': account.user_id, 'account_type': account_type,
+                 'account_id': account.id, 'amount': account.balance, 'posted_at': now},
+                {'entry_id': entry_id, 'user_id': account.user_id, 'account_type': 'external',
+                 'account_id': None, 'amount': -account.balance, 'posted_at': now},
+            ])
+
+
+def downgrade():
+    op.drop_index('ix_balance_checkpoint_account_posted_at', table_name='balance_checkpoint')
+    op.drop_table('balance_checkpoint')
+    op.drop_index('ix_journal_posting_entry_id', table_name='journal_posting')
+    op.drop_index('ix_journal_posting_account', table_name='journal_posting')
+    op.drop_table('journal_posting')
+    op.drop_table('journal_entry')
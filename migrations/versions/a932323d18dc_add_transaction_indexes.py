@@ -0,0 +1,51 @@
+"""Add composite and partial indexes on transaction
+
+Revision ID: a932323d18dc
+Revises: 8489c496e290
+Create Date: 2026-10-18 10:12:41.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a932323d18dc'
+down_revision = '8489c496e290'
+branch_labels = None
+depends_on = None
+
+
+PARTIAL_INDEXES = [
+    ('ix_transaction_bank_date', 'bank_id', 'bank_transaction'),
+    ('ix_transaction_credit_card_date', 'credit_card_id', 'credit_card_transaction'),
+    ('ix_transaction_asset_date', 'asset_id', 'asset_transaction'),
+    ('ix_transaction_saving_date', 'saving_id', 'saving_transaction'),
+]
+
+
+def upgrade():
+    op.create_index(
+        'ix_transaction_user_type_date',
+        'transaction',
+        ['user_id', 'transaction_type', 'date'],
+        unique=False
+    )
+
+    for index_name, account_column, polymorphic_type in PARTIAL_INDEXES:
+        where = sa.text(f"type = '{polymorphic_type}'")
+        op.create_index(
+            index_name,
+            'transaction',
+            [account_column, sa.text('date DESC')],
+            unique=False,
+            postgresql_where=where,
+            sqlite_where=where
+        )
+
+
+def downgrade():
+    for index_name, _, _ in reversed(PARTIAL_INDEXES):
+        op.drop_index(index_name, table_name='transaction')
+
+    op.drop_index('ix_transaction_user_type_date', table_name='transaction')
@@ -0,0 +1,29 @@
+"""Add (user_id, date, id) index for the unified transaction feed
+
+Revision ID: b6d13e8f2a90
+Revises: 9c2f4a6e1b57
+Create Date: 2026-10-18 17:25:03.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6d13e8f2a90'
+down_revision = '9c2f4a6e1b57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_transaction_user_date_id',
+        'transaction',
+        ['user_id', 'date', 'id'],
+        unique=False
+    )
+
+
+def downgrade():
+    op.drop_index('ix_transaction_user_date_id', table_name='transaction')
@@ -0,0 +1,63 @@
+"""Add full-text and trigram search on transaction.description
+
+Revision ID: c4a7e2d9f031
+Revises: b6d13e8f2a90
+Create Date: 2026-10-18 18:02:37.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4a7e2d9f031'
+down_revision = 'b6d13e8f2a90'
+branch_labels = None
+depends_on = None
+
+
+# Kept in step with TRANSACTION_SEARCH_DDL in app/models.py
+POSTGRES_UPGRADE = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX ix_transaction_description_fts ON \"transaction\" "
+    "USING gin (to_tsvector('simple', coalesce(description, '')))",
+    "CREATE INDEX ix_transaction_description_trgm ON \"transaction\" "
+    "USING gin (description gin_trgm_ops)",
+]
+
+SQLITE_UPGRADE = [
+    "CREATE VIRTUAL TABLE transaction_fts USING fts5("
+    "description, content='transaction', content_rowid='id')",
+    "CREATE TRIGGER transaction_fts_ai AFTER INSERT ON \"transaction\" BEGIN "
+    "INSERT INTO transaction_fts(rowid, description) VALUES (new.id, new.description); END",
+    "CREATE TRIGGER transaction_fts_ad AFTER DELETE ON \"transaction\" BEGIN "
+    "INSERT INTO transaction_fts(transaction_fts, rowid, description) "
+    "VALUES ('delete', old.id, old.description); END",
+    "CREATE TRIGGER transaction_fts_au AFTER UPDATE OF description ON \"transaction\" BEGIN "
+    "INSERT INTO transaction_fts(transaction_fts, rowid, description) "
+    "VALUES ('delete', old.id, old.description); "
+    "INSERT INTO transaction_fts(rowid, description) VALUES (new.id, new.description); END",
+    # Index the rows that already exist
+    "INSERT INTO transaction_fts(transaction_fts) VALUES ('rebuild')",
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        for statement in POSTGRES_UPGRADE:
+            op.execute(statement)
+        return
+
+    for statement in SQLITE_UPGRADE:
+        op.execute(statement)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_transaction_description_trgm', table_name='transaction')
+        op.drop_index('ix_transaction_description_fts', table_name='transaction')
+        return
+
+    for trigger in ('transaction_fts_au', 'transaction_fts_ad', 'transaction_fts_ai'):
+        op.execute(f"DROP TRIGGER {trigger}")
+    op.execute("DROP TABLE transaction_fts")
@@ -0,0 +1,112 @@
+"""Add category table and key spending_rollup by category_id
+
+Revision ID: d85b3f0c6e24
+Revises: c4a7e2d9f031
+Create Date: 2026-10-18 18:47:15.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd85b3f0c6e24'
+down_revision = 'c4a7e2d9f031'
+branch_labels = None
+depends_on = None
+
+
+def normalized(column):
+    """Same normalization as app.dashboard_service.normalize_category"""
+    return f"COALESCE(NULLIF(lower(trim({column})), ''), 'uncategorized')"
+
+
+ACCOUNT_TYPE = (
+    "CASE type WHEN 'bank_transaction' THEN 'bank' "
+    "WHEN 'credit_card_transaction' THEN 'credit_card' END"
+)
+
+
+def ist_day():
+    if op.get_bind().dialect.name == 'postgresql':
+        return "CAST(timezone('Asia/Kolkata', timezone('UTC', date)) AS DATE)"
+    return "date(date, '+330 minutes')"
+
+
+def create_spending_rollup(category_column):
+    op.create_table('spending_rollup',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    category_column,
+    sa.Column('account_type', sa.String(length=20), nullable=False),
+    sa.Column('transaction_type', sa.String(length=20), nullable=False),
+    sa.Column('total', sa.BigInteger(), nullable=False),
+    sa.Column('txn_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'day', category_column.name, 'account_type', 'transaction_type')
+    )
+
+
+def fill_spending_rollup(category_column, category_expression, joins=''):
+    day = ist_day()
+    op.execute(f"""
+        INSERT INTO spending_rollup
+            (user_id, day, {category_column}, account_type, transaction_type, total, txn_count)
+        SELECT t.user_id, {day}, {category_expression}, {ACCOUNT_TYPE}, t.transaction_type,
+               SUM(ABS(t.amount)), COUNT(*)
+        FROM "transaction" t {joins}
+        WHERE t.type IN ('bank_transaction', 'credit_card_transaction')
+          AND t.transaction_type IS NOT NULL
+        GROUP BY t.user_id, {day}, {category_expression}, {ACCOUNT_TYPE}, t.transaction_type
+    """)
+
+
+def upgrade():
+    op.create_table('category',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+
+    op.execute(f"""
+        INSERT INTO category (name)
+        SELECT DISTINCT {normalized('category')} FROM "transaction"
+        UNION
+        SELECT 'uncategorized'
+    """)
+
+    # SQLite cannot later drop a column that carries a foreign key, and
+    # does not enforce them by default, so the constraint is Postgres only
+    if op.get_bind().dialect.name == 'postgresql':
+        category_id = sa.Column('category_id', sa.Integer(), sa.ForeignKey('category.id'), nullable=True)
+    else:
+        category_id = sa.Column('category_id', sa.Integer(), nullable=True)
+
+    op.add_column('transaction', category_id)
+    op.execute(f"""
+        UPDATE "transaction"
+        SET category_id = (
+            SELECT id FROM category WHERE category.name = {normalized('"transaction".category')}
+        )
+    """)
+    op.create_index('ix_transaction_user_category', 'transaction', ['user_id', 'category_id'], unique=False)
+
+    # The rollup is derived data: rebuild it keyed by category_id
+    op.drop_table('spending_rollup')
+    create_spending_rollup(sa.Column('category_id', sa.Integer(), sa.ForeignKey('category.id'), nullable=False))
+    fill_spending_rollup('category_id', 't.category_id')
+
+
+def downgrade():
+    op.drop_table('spending_rollup')
+    create_spending_rollup(sa.Column('category', sa.String(length=50), nullable=False))
+    fill_spending_rollup('category', 'c.name', 'JOIN category c ON c.id = t.category_id')
+
+    op.drop_index('ix_transaction_user_category', table_name='transaction')
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_column('transaction', 'category_id')
+    else:
+        op.execute('ALTER TABLE "transaction" DROP COLUMN category_id')
+
+    op.drop_table('category')
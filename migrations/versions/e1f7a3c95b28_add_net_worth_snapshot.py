@@ -0,0 +1,35 @@
+"""Add net_worth_snapshot table
+
+Revision ID: e1f7a3c95b28
+Revises: d85b3f0c6e24
+Create Date: 2026-10-18 19:34:52.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1f7a3c95b28'
+down_revision = 'd85b3f0c6e24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Filled by `flask analytics rebuild-net-worth` (backfill) and
+    # `flask analytics snapshot-net-worth` (daily)
+    op.create_table('net_worth_snapshot',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('assets', sa.BigInteger(), nullable=False),
+    sa.Column('bank', sa.BigInteger(), nullable=False),
+    sa.Column('savings', sa.BigInteger(), nullable=False),
+    sa.Column('card_debt', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+
+
+def downgrade():
+    op.drop_table('net_worth_snapshot')
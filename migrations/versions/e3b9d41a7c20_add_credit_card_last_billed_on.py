@@ -0,0 +1,53 @@
+"""Add credit_card.last_billed_on for scheduled billing rollover
+
+Revision ID: e3b9d41a7c20
+Revises: 5c1e7f0b2d94
+Create Date: 2026-10-18 11:48:05.000000
+
+"""
+import calendar
+from datetime import date, timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3b9d41a7c20'
+down_revision = '5c1e7f0b2d94'
+branch_labels = None
+depends_on = None
+
+
+def current_cycle_start(today, billing_day):
+    def clamp(month_date):
+        last_day = calendar.monthrange(month_date.year, month_date.month)[1]
+        return month_date.replace(day=min(billing_day, last_day))
+
+    if today >= clamp(today):
+        return clamp(today)
+    return clamp(today.replace(day=1) - timedelta(days=1))
+
+
+def upgrade():
+    with op.batch_alter_table('credit_card', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('last_billed_on', sa.Date(), nullable=True))
+
+    # Existing unbilled_spends belong to the cycle that is open today
+    credit_card = sa.table(
+        'credit_card',
+        sa.column('billing_cycle_start', sa.Integer),
+        sa.column('last_billed_on', sa.Date)
+    )
+    today = date.today()
+    for billing_day in range(1, 32):
+        op.execute(
+            credit_card.update()
+            .where(credit_card.c.billing_cycle_start == billing_day)
+            .values(last_billed_on=current_cycle_start(today, billing_day))
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('credit_card', schema=None) as batch_op:
+        batch_op.drop_column('last_billed_on')
@@ -0,0 +1,30 @@
+"""Detach the bank leg from saving transaction rows
+
+Revision ID: f2c8d14a7e63
+Revises: e1f7a3c95b28
+Create Date: 2026-10-18 21:12:05.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2c8d14a7e63'
+down_revision = 'e1f7a3c95b28'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Saving deposits and withdrawals now post their bank leg as a
+    # bank_transaction row. Rows written before that carried bank_id,
+    # whose foreign key blocked deleting the bank.
+    op.execute(
+        "UPDATE \"transaction\" SET bank_id = NULL, bank_balance_after = NULL "
+        "WHERE type = 'saving_transaction' AND bank_id IS NOT NULL"
+    )
+
+
+def downgrade():
+    # The cleared columns were a copy of the bank leg; nothing to restore
+    pass
@@ -1,11 +1,7 @@
 // src/pages/Dashboard.js
 import React, { useEffect, useState, useCallback } from 'react';
 import './Dashboard.css';
-import {
-  getDashboardSummary,
-  getDashboardSpending,
-  getDashboardAssetAllocation
-} from '../services/api';
+import { getDashboardBundle } from '../services/api';
 import {
   BarChart, Bar, PieChart, Pie,
   XAxis, YAxis, Tooltip, ResponsiveContainer, Legend, Cell
@@ -37,55 +33,26 @@ export default function Dashboard() {
 
   const fetchData = useCallback(async () => {
     try {
-      setLoading(true);
-
-      const summaryResp =
-        await getDashboardSummary();
+      const bundle =
+        await getDashboardBundle(spendRange);
 
-      setSummary(summaryResp);
+      setSummary(bundle.summary);
+      setSpendingData(bundle.spending);
+      setAssetAllocation(bundle.asset_allocation);
     } catch (err) {
       console.error('Dashboard fetchData error', err);
     } finally {
       setLoading(false);
     }
-  }, []);
-
-  const loadAssetAllocation = useCallback(async () => {
-    try {
-      const data =
-        await getDashboardAssetAllocation();
-
-      setAssetAllocation(data);
-    } catch (error) {
-      console.error(
-        'Error loading asset allocation',
-        error
-      );
-    }
-  }, []);
+  }, [spendRange]);
 
   useEffect(() => {
     fetchData();
-    loadAssetAllocation();
   }, [
     fetchData,
-    loadAssetAllocation,
     refreshKey
   ]);
 
-  useEffect(() => {
-    const loadSpending = async () => {
-      try {
-        const data = await getDashboardSpending(spendRange);
-        setSpendingData(data);
-      } catch (error) {
-        console.error('Error loading spending data', error);
-      }
-    };
-
-    loadSpending();
-  }, [spendRange]);
-
   const formatINR = (amount) =>
     new Intl.NumberFormat('en-IN', { style: 'currency', currency: 'INR', maximumFractionDigits: 0 }).format(amount || 0);
 
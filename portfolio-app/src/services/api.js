@@ -129,7 +129,7 @@ export const addBankTransaction = async (bankId, transactionData) => {
 
 export const getBankTransactions = async (bankId) => {
   try {
-    const response = await api.get(`/banks/${bankId}/transactions`);
+    const response = await api.get(`/banks/${bankId}/transactions?all=true`);
     return { data: response.data };
   } catch (error) {
     const errorMsg = error.response?.data?.error || 'Failed to fetch bank transactions';
@@ -222,7 +222,7 @@ export const createAssetTransaction = async (assetId, transactionData) => {
 };
 
 export const getAssetTransactions = async (assetId) => {
-  return api.get(`/assets/${assetId}/transactions`);
+  return api.get(`/assets/${assetId}/transactions?all=true`);
 };
 
 // Credit Card API calls
@@ -295,7 +295,7 @@ export const deleteCreditCard = async (cardId) => {
 
 export const getCreditCardTransactions = async (cardId) => {
   try {
-    const response = await api.get(`/credit_cards/${cardId}/transactions`);
+    const response = await api.get(`/credit_cards/${cardId}/transactions?all=true`);
     return response.data;
   } catch (error) {
     const errorMessage = error.response?.data?.error || error.message;
@@ -396,7 +396,7 @@ export const deleteSaving = async (savingId) => {
 
 export const getSavingTransactions = async (savingId) => {
   try {
-    const response = await api.get(`/savings/${savingId}/transactions`);
+    const response = await api.get(`/savings/${savingId}/transactions?all=true`);
     return response.data;
   } catch (error) {
     const errorMessage = error.response?.data?.error || error.message;
@@ -483,4 +483,19 @@ export const getDashboardAssetAllocation = async () => {
       `Failed to fetch asset allocation: ${errorMessage}`
     );
   }
-};
\ No newline at end of file
+};
+
+export const getDashboardBundle = async (range = '30d') => {
+  try {
+    const response = await api.get(`/dashboard/bundle?range=${range}`);
+    return response.data;
+  } catch (error) {
+    const errorMessage =
+      error.response?.data?.error ||
+      error.message;
+
+    throw new Error(
+      `Failed to fetch dashboard: ${errorMessage}`
+    );
+  }
+};
@@ -1,7 +1,13 @@
 #!/bin/sh
 
-echo "Applying database migrations..."
-flask db upgrade
+if [ "$FLASK_ENV" = "development" ]; then
+    echo "Applying database migrations..."
+    flask db upgrade
 
-echo "Starting Flask application..."
-python run.py
\ No newline at end of file
+    echo "Starting Flask development server..."
+    exec python run.py
+fi
+
+# gunicorn.conf.py upgrades the schema in-process only when it is behind
+echo "Starting gunicorn (see gunicorn.conf.py)..."
+exec gunicorn run:app